@@ -0,0 +1,269 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from models.schemas import (
+    BacktestStatus, WalkForwardRequest, PortfolioRequest, BackfillRequest, SensitivityRequest, HyperbandRequest,
+    ParetoRequest, ParetoSessionRequest, ParetoPointsRequest
+)
+from utils.storage import active_backtests, analysis_results, pareto_sessions, get_job_queue
+from core.analysis_runner import run_analysis
+from core.job_scheduler import PRIORITY_BATCH, PRIORITY_INTERACTIVE
+from core.backfill import GRANULARITIES, PAGE_FETCHERS
+from core.simulation import PARAM_NAMES
+from core.pareto import ParetoArchive, non_dominated_ranks, objective_costs, pareto_front, point_values
+from api.backtest import submit_scheduled_job, enqueue_shared_job, get_shared_job, get_backtest_status, stop_backtest
+import core.walk_forward  # noqa: F401 - enregistre l'analyse "walk_forward"
+import core.portfolio  # noqa: F401 - enregistre l'analyse "portfolio"
+import core.backfill  # noqa: F401 - enregistre l'analyse "backfill"
+import core.sensitivity  # noqa: F401 - enregistre l'analyse "sensitivity"
+import core.hyperband  # noqa: F401 - enregistre l'analyse "hyperband"
+from core.walk_forward import OBJECTIVES
+from datetime import datetime
+from typing import Optional
+import asyncio
+import json
+import uuid
+
+analysis_router = APIRouter()
+
+STREAM_POLL_INTERVAL = 0.5
+TERMINAL_STATUSES = ("completed", "failed", "stopped", "timeout")
+
+async def start_analysis_job(kind: str, analysis_request, request: Request, priority: str, message: str):
+    """Crée le status et confie l'analyse à l'ordonnanceur local ou à la file partagée"""
+    job_id = str(uuid.uuid4())
+    status = BacktestStatus(
+        id=job_id,
+        status="queued",
+        progress=0.0,
+        message=message,
+        started_at=datetime.now()
+    )
+
+    job_queue = get_job_queue()
+    if job_queue is not None:
+        await asyncio.to_thread(enqueue_shared_job, job_queue, job_id, kind, analysis_request.dict(), priority, status)
+    else:
+        active_backtests[job_id] = status
+        submit_scheduled_job(
+            job_id,
+            lambda token: run_analysis(job_id, kind, analysis_request, token),
+            request,
+            priority
+        )
+
+    return {
+        "job_id": job_id,
+        "type": kind,
+        "status": status.status,
+        "priority": priority
+    }
+
+@analysis_router.post("/analysis/walk-forward")
+async def start_walk_forward(walk_forward: WalkForwardRequest, request: Request, priority: str = PRIORITY_BATCH):
+    """Lance une analyse walk-forward (optimisation IS glissante + évaluation OOS)"""
+    if walk_forward.in_sample_months < 1 or walk_forward.out_of_sample_months < 1:
+        raise HTTPException(status_code=400, detail="Fenêtres in-sample et out-of-sample d'au moins 1 mois")
+    if not walk_forward.stop_loss_values or not walk_forward.tp_scale_values:
+        raise HTTPException(status_code=400, detail="Grille de paramètres vide")
+
+    return await start_analysis_job(
+        "walk_forward", walk_forward, request, priority,
+        "⏳ Walk-forward en attente d'un slot d'exécution..."
+    )
+
+@analysis_router.post("/analysis/portfolio")
+async def start_portfolio(portfolio: PortfolioRequest, request: Request, priority: str = PRIORITY_INTERACTIVE):
+    """Lance un backtest multi-positions (positions chevauchantes, valorisation quotidienne)"""
+    if portfolio.max_open_positions < 1:
+        raise HTTPException(status_code=400, detail="max_open_positions doit être d'au moins 1")
+    if portfolio.days_per_month < 1:
+        raise HTTPException(status_code=400, detail="days_per_month doit être d'au moins 1")
+
+    return await start_analysis_job(
+        "portfolio", portfolio, request, priority,
+        "⏳ Backtest portefeuille en attente d'un slot d'exécution..."
+    )
+
+@analysis_router.post("/analysis/sensitivity")
+async def start_sensitivity(sensitivity: SensitivityRequest, request: Request, priority: str = PRIORITY_INTERACTIVE):
+    """Lance une analyse de sensibilité (gradients et élasticités par métrique)"""
+    unknown = [name for name in sensitivity.parameters if name not in PARAM_NAMES]
+    if unknown or not sensitivity.parameters:
+        raise HTTPException(status_code=400, detail=f"Paramètres inconnus: {', '.join(unknown) or 'aucun'} (valeurs: {', '.join(PARAM_NAMES)})")
+    if sensitivity.relative_step <= 0 or sensitivity.min_step <= 0:
+        raise HTTPException(status_code=400, detail="relative_step et min_step doivent être positifs")
+    if sensitivity.replications < 1:
+        raise HTTPException(status_code=400, detail="replications doit être d'au moins 1")
+
+    return await start_analysis_job(
+        "sensitivity", sensitivity, request, priority,
+        "⏳ Analyse de sensibilité en attente d'un slot d'exécution..."
+    )
+
+@analysis_router.post("/analysis/hyperband")
+async def start_hyperband(hyperband: HyperbandRequest, request: Request, priority: str = PRIORITY_BATCH):
+    """Lance une recherche Hyperband (classement suivi via /analysis/{job_id}/stream)"""
+    if hyperband.objective not in OBJECTIVES:
+        raise HTTPException(status_code=400, detail=f"Objectif inconnu: {hyperband.objective} (valeurs: {', '.join(OBJECTIVES)})")
+    if not hyperband.search_space or any(len(bounds) != 2 for bounds in hyperband.search_space.values()):
+        raise HTTPException(status_code=400, detail="search_space: [min, max] pour chaque paramètre")
+    if len(hyperband.pareto_objectives) < 2 or any(o not in OBJECTIVES for o in hyperband.pareto_objectives):
+        raise HTTPException(status_code=400, detail=f"pareto_objectives: au moins 2 parmi {', '.join(OBJECTIVES)}")
+    if hyperband.eta < 2 or hyperband.n_configs < 1 or hyperband.min_months < 1:
+        raise HTTPException(status_code=400, detail="eta >= 2, n_configs >= 1 et min_months >= 1")
+
+    return await start_analysis_job(
+        "hyperband", hyperband, request, priority,
+        "⏳ Recherche Hyperband en attente d'un slot d'exécution..."
+    )
+
+def compute_pareto(pareto: ParetoRequest) -> dict:
+    costs = objective_costs(point_values(pareto.points, pareto.objectives), pareto.objectives)
+    front = pareto_front(costs)
+    result = {
+        "objectives": pareto.objectives,
+        "evaluated": len(pareto.points),
+        "front_size": len(front),
+        "front_indices": front.tolist(),
+        "front": [pareto.points[index] for index in front[costs[front, 0].argsort(kind='stable')]]
+    }
+    if pareto.max_fronts:
+        result["ranks"] = non_dominated_ranks(costs, pareto.max_fronts).tolist()
+    return result
+
+@analysis_router.post("/analysis/pareto")
+async def compute_pareto_front(pareto: ParetoRequest):
+    """Front de Pareto d'un ensemble de configs évaluées (tri non dominé, hors boucle d'événements)"""
+    if len(pareto.objectives) < 2 or any(o not in OBJECTIVES for o in pareto.objectives):
+        raise HTTPException(status_code=400, detail=f"objectives: au moins 2 parmi {', '.join(OBJECTIVES)}")
+    try:
+        return await asyncio.to_thread(compute_pareto, pareto)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@analysis_router.post("/analysis/pareto/sessions")
+async def create_pareto_session(session: ParetoSessionRequest):
+    """Ouvre un front incrémental (alimenté par lots via /points, suivi via /stream)"""
+    try:
+        archive = ParetoArchive(session.objectives)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    session_id = str(uuid.uuid4())
+    pareto_sessions[session_id] = archive
+    return {"session_id": session_id, "objectives": archive.objectives}
+
+def get_pareto_session(session_id: str) -> ParetoArchive:
+    archive = pareto_sessions.get(session_id)
+    if archive is None:
+        raise HTTPException(status_code=404, detail="Session Pareto non trouvée")
+    return archive
+
+@analysis_router.post("/analysis/pareto/sessions/{session_id}/points")
+async def add_pareto_points(session_id: str, batch: ParetoPointsRequest):
+    """Ajoute un lot de résultats; seuls les points non dominés du lot sont fusionnés avec le front"""
+    archive = get_pareto_session(session_id)
+    try:
+        values = point_values(batch.points, archive.objectives)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    added, removed = await asyncio.to_thread(archive.add, values, batch.points)
+    return {
+        "added": added,
+        "removed": removed,
+        "front_size": len(archive.points),
+        "evaluated": archive.seen,
+        "version": archive.version
+    }
+
+@analysis_router.get("/analysis/pareto/sessions/{session_id}")
+async def get_pareto_session_front(session_id: str, limit: Optional[int] = None):
+    """Front courant de la session"""
+    return get_pareto_session(session_id).to_dict(limit)
+
+@analysis_router.get("/analysis/pareto/sessions/{session_id}/stream")
+async def stream_pareto_session(session_id: str):
+    """Server-Sent Events: un événement "front" à chaque changement du front, jusqu'à la fermeture de la session"""
+    get_pareto_session(session_id)
+
+    async def events():
+        version = None
+        while session_id in pareto_sessions:
+            archive = pareto_sessions[session_id]
+            if archive.version != version:
+                version = archive.version
+                yield f"event: front\ndata: {json.dumps(jsonable_encoder(archive.to_dict()))}\n\n"
+            await asyncio.sleep(STREAM_POLL_INTERVAL)
+        yield "event: end\ndata: {}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@analysis_router.delete("/analysis/pareto/sessions/{session_id}")
+async def close_pareto_session(session_id: str):
+    """Ferme la session (le flux se termine) et retourne le front final"""
+    front = get_pareto_session(session_id).to_dict()
+    del pareto_sessions[session_id]
+    return front
+
+@analysis_router.post("/analysis/backfill")
+async def start_backfill(backfill: BackfillRequest, request: Request, priority: str = PRIORITY_BATCH):
+    """Lance un backfill historique paginé (relancer la même requête reprend là où il s'est arrêté)"""
+    if backfill.granularity not in GRANULARITIES:
+        raise HTTPException(status_code=400, detail=f"Granularité inconnue: {backfill.granularity} (valeurs: {', '.join(GRANULARITIES)})")
+    if backfill.exchange is not None and backfill.exchange not in PAGE_FETCHERS:
+        raise HTTPException(status_code=400, detail=f"Exchange inconnu: {backfill.exchange} (valeurs: {', '.join(PAGE_FETCHERS)})")
+    if backfill.concurrency < 1:
+        raise HTTPException(status_code=400, detail="concurrency doit être d'au moins 1")
+
+    return await start_analysis_job(
+        "backfill", backfill, request, priority,
+        "⏳ Backfill en attente d'un slot d'exécution..."
+    )
+
+@analysis_router.get("/analysis/{job_id}/status")
+async def get_analysis_status(job_id: str):
+    """Progression d'une analyse (même format que les backtests)"""
+    return await get_backtest_status(job_id)
+
+@analysis_router.get("/analysis/{job_id}/stream")
+async def stream_analysis(job_id: str):
+    """
+    Server-Sent Events: un événement à chaque changement du status (progression, live_metrics
+    comme le classement Hyperband), puis un événement final "end"
+    """
+    await get_backtest_status(job_id)  # 404 avant d'ouvrir le flux
+
+    async def events():
+        last = None
+        while True:
+            try:
+                status = jsonable_encoder(await get_backtest_status(job_id))
+            except HTTPException:
+                break  # Status nettoyé
+            payload = json.dumps(status)
+            if payload != last:
+                yield f"event: status\ndata: {payload}\n\n"
+                last = payload
+            if status.get('status') in TERMINAL_STATUSES:
+                break
+            await asyncio.sleep(STREAM_POLL_INTERVAL)
+        yield "event: end\ndata: {}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@analysis_router.get("/analysis/{job_id}/results")
+async def get_analysis_results(job_id: str):
+    """Résultats complets d'une analyse"""
+    if job_id in analysis_results:
+        return analysis_results[job_id]
+
+    job = await asyncio.to_thread(get_shared_job, job_id)
+    if job is not None and job.get("result"):
+        return job["result"]
+
+    raise HTTPException(status_code=404, detail="Résultats non trouvés")
+
+@analysis_router.delete("/analysis/{job_id}")
+async def stop_analysis(job_id: str):
+    """Arrête une analyse en cours (annule aussi ses process workers)"""
+    return await stop_backtest(job_id)
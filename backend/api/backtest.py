@@ -1,15 +1,105 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from models.schemas import BacktestConfig, BacktestStatus, BacktestResult
-from utils.storage import active_backtests, backtest_results_cache
+from fastapi import APIRouter, HTTPException, Request
+from models.schemas import BacktestConfig, BacktestStatus, BacktestResult, RescoreRequest
+from utils.storage import active_backtests, backtest_results_cache, get_job_queue, get_checkpoint_store
 from core.backtest_engine import run_real_backtest
+from core.bootstrap import bootstrap_metrics
+from core.rescore import RescoreUnavailable, load_trade_paths, rescore_backtest
+from core.job_scheduler import (
+    backtest_scheduler, JobRejected, PRIORITIES, PRIORITY_INTERACTIVE,
+    JOB_QUEUED, JOB_RUNNING, JOB_CANCELLED, JOB_TIMEOUT
+)
 from datetime import datetime
+from typing import Optional
+import asyncio
 import uuid
 
 backtest_router = APIRouter()
 
+SHARED_QUEUE_RETRY_AFTER = 10
+MAX_BOOTSTRAP_RESAMPLES = 200000
+MAX_BACKTEST_MONTHS = 36
+
+def get_client_id(request: Request) -> str:
+    """Identifiant client pour les quotas (header X-Client-Id, sinon IP)"""
+    client_id = request.headers.get("X-Client-Id")
+    if client_id:
+        return client_id
+    return request.client.host if request.client else "anonymous"
+
+def update_status_from_scheduler(backtest_id: str, state: str):
+    """Répercute les transitions de l'ordonnanceur sur le status du backtest"""
+    status = active_backtests.get(backtest_id)
+    if status is None:
+        return
+    
+    if state == JOB_QUEUED:
+        status.status = "queued"
+        status.message = "⏳ En attente d'un slot d'exécution..."
+    elif state == JOB_RUNNING:
+        status.status = "running"
+        status.message = "🚀 Initialisation du backtest..."
+    elif state == JOB_TIMEOUT:
+        status.status = "timeout"
+        status.message = "⏰ Temps d'exécution maximum dépassé"
+    elif state == JOB_CANCELLED and status.status in ("queued", "running"):
+        status.status = "stopped"
+        status.message = "⏹️ Arrêté par l'utilisateur"
+
+def submit_scheduled_job(job_id: str, job_factory, request: Request, priority: str):
+    """Soumet un job à l'ordonnanceur, HTTP 429 + Retry-After si la file est saturée"""
+    if priority not in PRIORITIES:
+        raise HTTPException(status_code=400, detail=f"Priorité invalide (valeurs: {', '.join(PRIORITIES)})")
+    
+    try:
+        backtest_scheduler.submit(
+            job_id,
+            job_factory,
+            priority=priority,
+            client_id=get_client_id(request),
+            on_state=update_status_from_scheduler
+        )
+    except JobRejected as e:
+        active_backtests.pop(job_id, None)
+        raise HTTPException(
+            status_code=429,
+            detail=f"Serveur saturé: {str(e)}",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+def enqueue_shared_job(job_queue, job_id: str, kind: str, payload: dict, priority: str, status: BacktestStatus):
+    """Mode distribué: enfile le job dans la file partagée consommée par worker.py"""
+    if priority not in PRIORITIES:
+        raise HTTPException(status_code=400, detail=f"Priorité invalide (valeurs: {', '.join(PRIORITIES)})")
+    
+    if job_queue.pending_count() >= backtest_scheduler.max_queue_size:
+        raise HTTPException(
+            status_code=429,
+            detail="Serveur saturé: file partagée pleine",
+            headers={"Retry-After": str(SHARED_QUEUE_RETRY_AFTER)}
+        )
+    
+    job_queue.enqueue(job_id, kind, payload, priority=priority, progress=status.dict())
+
+def get_shared_job(job_id: str):
+    """Job de la file partagée (None en mode mono-process ou si inconnu)"""
+    job_queue = get_job_queue()
+    return job_queue.get(job_id) if job_queue is not None else None
+
+def shared_job_status(job: dict) -> dict:
+    """Status publié par le worker, avec l'état de la file faisant foi"""
+    status = dict(job.get("progress") or {"id": job["id"], "progress": 0.0, "message": ""})
+    status["status"] = job["status"]
+    if job.get("error"):
+        status["message"] = f"❌ Erreur: {job['error']}"
+    return status
+
 @backtest_router.post("/backtest/start")
-async def start_backtest(config: BacktestConfig, background_tasks: BackgroundTasks):
-    """Lance un nouveau backtest avec VOTRE logique exacte"""
+async def start_backtest(config: BacktestConfig, request: Request, priority: str = PRIORITY_INTERACTIVE,
+                         seed: Optional[int] = None):
+    """
+    Lance un nouveau backtest avec VOTRE logique exacte
+    ?seed=N rend le backtest reproductible (sinon seed aléatoire, renvoyée dans summary.seed)
+    """
     
     # Validation des paramètres (comme dans votre GUI)
     try:
@@ -21,8 +111,8 @@ async def start_backtest(config: BacktestConfig, background_tasks: BackgroundTas
         
         months_diff = (end_date.year - start_date.year) * 12 + (end_date.month - start_date.month) + 1
         
-        if months_diff > 36:
-            raise HTTPException(status_code=400, detail="Période trop longue (max 36 mois)")
+        if months_diff > MAX_BACKTEST_MONTHS:
+            raise HTTPException(status_code=400, detail=f"Période trop longue (max {MAX_BACKTEST_MONTHS} mois)")
             
     except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Paramètres invalides: {str(e)}")
@@ -31,40 +121,222 @@ async def start_backtest(config: BacktestConfig, background_tasks: BackgroundTas
     backtest_id = str(uuid.uuid4())
     
     # Initialise le status
-    active_backtests[backtest_id] = BacktestStatus(
+    status = BacktestStatus(
         id=backtest_id,
-        status="running",
+        status="queued",
         progress=0.0,
-        message="🚀 Initialisation du backtest...",
+        message="⏳ En attente d'un slot d'exécution...",
         started_at=datetime.now(),
         total_months=months_diff
     )
     
-    # Lance le backtest en arrière-plan avec VOTRE logique
-    background_tasks.add_task(run_real_backtest, backtest_id, config)
+    job_queue = get_job_queue()
+    if job_queue is not None:
+        # Mode distribué: les workers exécutent, ce nœud ne fait qu'ordonnancer
+        await asyncio.to_thread(enqueue_shared_job, job_queue, backtest_id, "backtest",
+                                {"config": config.dict(), "seed": seed}, priority, status)
+    else:
+        # Confie le backtest à l'ordonnanceur local (priorité, quotas, timeout)
+        active_backtests[backtest_id] = status
+        submit_scheduled_job(
+            backtest_id,
+            lambda token: run_real_backtest(backtest_id, config, token, seed=seed),
+            request,
+            priority
+        )
     
     return {
         "backtest_id": backtest_id,
-        "status": "started",
+        "status": status.status,
+        "priority": priority,
         "estimated_duration": f"{months_diff * 2} secondes",
         "total_months": months_diff
     }
 
+def get_checkpoint_or_404(backtest_id: str) -> dict:
+    checkpoint = get_checkpoint_store().get(backtest_id)
+    if checkpoint is None:
+        raise HTTPException(status_code=404, detail="Aucun checkpoint pour ce backtest")
+    return checkpoint
+
+def resumed_status(backtest_id: str, checkpoint: dict, months_count: int, message: str) -> BacktestStatus:
+    return BacktestStatus(
+        id=backtest_id,
+        status="queued",
+        progress=checkpoint['month'] / months_count * 100,
+        message=message,
+        started_at=datetime.now(),
+        current_month=checkpoint['month'],
+        total_months=months_count
+    )
+
+@backtest_router.get("/backtest/{backtest_id}/checkpoint")
+async def get_backtest_checkpoint(backtest_id: str):
+    """Dernier checkpoint mensuel (mois terminé, capital, compteurs)"""
+    checkpoint = await asyncio.to_thread(get_checkpoint_or_404, backtest_id)
+    state = checkpoint['state']
+    return {
+        'backtest_id': backtest_id,
+        'month': checkpoint['month'],
+        'months_count': checkpoint['months_count'],
+        'complete': checkpoint['month'] >= checkpoint['months_count'],
+        'seed': checkpoint['seed'],
+        'capital': state['capital'],
+        'total_trades': state['total_trades'],
+        'winning_trades': state['winning_trades'],
+        'moon_shots': state['moon_shots'],
+        'updated_at': datetime.fromtimestamp(checkpoint['updated_at'])
+    }
+
+@backtest_router.post("/backtest/{backtest_id}/resume")
+async def resume_backtest(backtest_id: str, request: Request, priority: str = PRIORITY_INTERACTIVE):
+    """Reprend un backtest arrêté, en échec ou perdu (redémarrage) à son dernier mois terminé"""
+    checkpoint = await asyncio.to_thread(get_checkpoint_or_404, backtest_id)
+    status = active_backtests.get(backtest_id)
+    job = await asyncio.to_thread(get_shared_job, backtest_id)
+    if (status is not None and status.status in ("queued", "running")) or (job is not None and job["status"] in ("queued", "running")):
+        raise HTTPException(status_code=409, detail="Backtest déjà en cours")
+    if checkpoint['month'] >= checkpoint['months_count']:
+        raise HTTPException(status_code=409, detail="Backtest déjà terminé: utiliser /extend pour l'allonger")
+    
+    config = BacktestConfig(**checkpoint['config'])
+    status = resumed_status(backtest_id, checkpoint, checkpoint['months_count'],
+                            f"⏳ Reprise au mois {checkpoint['month'] + 1}/{checkpoint['months_count']}...")
+    
+    job_queue = get_job_queue()
+    if job_queue is not None:
+        payload = {"config": config.dict(), "resume_from": backtest_id}
+        if job is None:
+            await asyncio.to_thread(enqueue_shared_job, job_queue, backtest_id, "backtest", payload, priority, status)
+        elif not await asyncio.to_thread(job_queue.requeue, backtest_id, payload, priority, progress=status.dict()):
+            raise HTTPException(status_code=409, detail="Backtest déjà en cours")
+    else:
+        active_backtests[backtest_id] = status
+        submit_scheduled_job(
+            backtest_id,
+            lambda token: run_real_backtest(backtest_id, config, token, resume_from=backtest_id),
+            request,
+            priority
+        )
+    
+    return {
+        "backtest_id": backtest_id,
+        "status": status.status,
+        "priority": priority,
+        "resumed_from_month": checkpoint['month'],
+        "total_months": checkpoint['months_count']
+    }
+
+@backtest_router.post("/backtest/{backtest_id}/extend")
+async def extend_backtest(backtest_id: str, request: Request, months: int, priority: str = PRIORITY_INTERACTIVE):
+    """
+    Allonge un backtest terminé de `months` mois sans re-simuler les mois existants
+    Nouveau backtest (l'original est conservé), identique à un run direct sur la période complète
+    """
+    if months <= 0:
+        raise HTTPException(status_code=400, detail="months doit être positif")
+    checkpoint = await asyncio.to_thread(get_checkpoint_or_404, backtest_id)
+    if checkpoint['month'] < checkpoint['months_count']:
+        raise HTTPException(status_code=409, detail="Backtest incomplet: utiliser /resume d'abord")
+    
+    months_count = checkpoint['months_count'] + months
+    if months_count > MAX_BACKTEST_MONTHS:
+        raise HTTPException(status_code=400, detail=f"Période trop longue (max {MAX_BACKTEST_MONTHS} mois)")
+    
+    config = BacktestConfig(**checkpoint['config'])
+    end_year, end_month = divmod(config.end_year * 12 + config.end_month - 1 + months, 12)
+    config = config.copy(update={'end_year': end_year, 'end_month': end_month + 1})
+    
+    extended_id = str(uuid.uuid4())
+    status = resumed_status(extended_id, checkpoint, months_count,
+                            f"⏳ Extension: mois {checkpoint['month'] + 1} à {months_count}...")
+    
+    job_queue = get_job_queue()
+    if job_queue is not None:
+        await asyncio.to_thread(enqueue_shared_job, job_queue, extended_id, "backtest",
+                                {"config": config.dict(), "resume_from": backtest_id}, priority, status)
+    else:
+        active_backtests[extended_id] = status
+        submit_scheduled_job(
+            extended_id,
+            lambda token: run_real_backtest(extended_id, config, token, resume_from=backtest_id),
+            request,
+            priority
+        )
+    
+    return {
+        "backtest_id": extended_id,
+        "extended_from": backtest_id,
+        "status": status.status,
+        "priority": priority,
+        "total_months": months_count
+    }
+
 @backtest_router.get("/backtest/{backtest_id}/status")
 async def get_backtest_status(backtest_id: str):
     """Récupère le status en temps réel"""
     if backtest_id not in active_backtests:
+        job = await asyncio.to_thread(get_shared_job, backtest_id)
+        if job is not None:
+            return shared_job_status(job)
         raise HTTPException(status_code=404, detail="Backtest non trouvé")
     
     return active_backtests[backtest_id]
 
 @backtest_router.get("/backtest/{backtest_id}/results")
-async def get_backtest_results(backtest_id: str):
-    """Récupère les résultats complets"""
-    if backtest_id not in backtest_results_cache:
-        raise HTTPException(status_code=404, detail="Résultats non trouvés")
+async def get_backtest_results(backtest_id: str, bootstrap: int = 0, confidence: float = 0.95):
+    """
+    Récupère les résultats complets
+    ?bootstrap=N ajoute les intervalles de confiance de chaque métrique (N ré-échantillonnages)
+    """
+    if backtest_id in backtest_results_cache:
+        result = backtest_results_cache[backtest_id]
+    else:
+        job = await asyncio.to_thread(get_shared_job, backtest_id)
+        if job is None or not job.get("result"):
+            raise HTTPException(status_code=404, detail="Résultats non trouvés")
+        result = job["result"]
     
-    return backtest_results_cache[backtest_id]
+    if bootstrap <= 0:
+        return result
+    
+    if bootstrap > MAX_BOOTSTRAP_RESAMPLES:
+        raise HTTPException(status_code=400, detail=f"bootstrap limité à {MAX_BOOTSTRAP_RESAMPLES} ré-échantillonnages")
+    if not 0 < confidence < 1:
+        raise HTTPException(status_code=400, detail="confidence doit être entre 0 et 1")
+    
+    result_dict = result.dict() if hasattr(result, 'dict') else dict(result)
+    charts_data = result_dict.get('charts_data', {})
+    intervals = await asyncio.to_thread(
+        bootstrap_metrics,
+        charts_data.get('trade_returns', []),
+        charts_data.get('monthly_returns', []),
+        bootstrap,
+        confidence
+    )
+    
+    result_dict['confidence_intervals'] = {
+        'resamples': bootstrap,
+        'confidence': confidence,
+        'metrics': intervals
+    }
+    return result_dict
+
+@backtest_router.post("/backtest/{backtest_id}/rescore")
+async def rescore(backtest_id: str, rules: RescoreRequest):
+    """
+    Re-score un backtest terminé sous d'autres règles de sortie / taille de position
+    Mêmes trades (chemins journaliers stockés), une passe vectorisée: quelques millisecondes
+    """
+    try:
+        config, batch = await asyncio.to_thread(load_trade_paths, backtest_id)
+    except RescoreUnavailable as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    try:
+        return rescore_backtest(config, batch, rules)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @backtest_router.delete("/backtest/{backtest_id}")
 async def stop_backtest(backtest_id: str):
@@ -72,6 +344,12 @@ async def stop_backtest(backtest_id: str):
     if backtest_id in active_backtests:
         active_backtests[backtest_id].status = "stopped"
         active_backtests[backtest_id].message = "⏹️ Arrêté par l'utilisateur"
+        # Annulation réelle: retire de la file ou interrompt la tâche et ses workers
+        backtest_scheduler.cancel(backtest_id)
+        return {"message": "Backtest arrêté"}
+    
+    job_queue = get_job_queue()
+    if job_queue is not None and await asyncio.to_thread(job_queue.request_cancel, backtest_id):
         return {"message": "Backtest arrêté"}
     
     raise HTTPException(status_code=404, detail="Backtest non trouvé")
@@ -93,6 +371,17 @@ async def get_backtest_history():
             'completed_at': active_backtests.get(backtest_id, {}).get('completed_at')
         })
     
+    job_queue = get_job_queue()
+    if job_queue is not None:
+        for job in await asyncio.to_thread(job_queue.list_jobs, status="completed"):
+            result = job.get("result") or {}
+            history.append({
+                'id': job["id"],
+                'config': result.get('config', {}),
+                'summary': result.get('summary', {}),
+                'completed_at': (job.get("progress") or {}).get('completed_at')
+            })
+    
     return {"history": history}
 
 @backtest_router.get("/backtest/active")
@@ -100,7 +389,18 @@ async def get_active_backtests():
     """Récupère tous les backtests actifs"""
     active = []
     for backtest_id, status in active_backtests.items():
-        if status.status == "running":
+        if status.status in ("queued", "running"):
             active.append(status)
     
-    return {"active_backtests": active}
\ No newline at end of file
+    job_queue = get_job_queue()
+    if job_queue is not None:
+        for state in ("queued", "running"):
+            jobs = await asyncio.to_thread(job_queue.list_jobs, status=state)
+            active.extend(shared_job_status(job) for job in jobs)
+    
+    return {"active_backtests": active}
+
+@backtest_router.get("/backtest/scheduler")
+async def get_scheduler_stats():
+    """Statistiques de l'ordonnanceur (file, jobs en cours, rejets)"""
+    return backtest_scheduler.get_stats()
\ No newline at end of file
@@ -3,6 +3,9 @@ from fastapi import File, UploadFile
 from models.schemas import ConfigSave, BacktestConfig
 from typing import Dict, Any, Optional
 from pydantic import BaseModel
+from utils.storage import get_strategy_store, get_config_state
+from utils.config_store import VersionConflict
+import asyncio
 import json
 import os
 from datetime import datetime
@@ -58,8 +61,9 @@ DEFAULT_CONFIG = {
     "strategy_name": "Memecoin Sniper Pro"
 }
 
-# Variable globale pour la config active
-current_config = DEFAULT_CONFIG.copy()
+def active_config_state():
+    """Config active versionnée, partagée entre les workers (remplace la variable globale par process)"""
+    return get_config_state(DEFAULT_CONFIG)
 
 # ============================================================================
 # ROUTES EXISTANTES (CONSERVÉES)
@@ -69,8 +73,6 @@ current_config = DEFAULT_CONFIG.copy()
 async def save_config(config_data: ConfigSave):
     """Sauvegarde une configuration"""
     try:
-        os.makedirs(CONFIGS_DIR, exist_ok=True)
-        
         config_file = {
             "name": config_data.name,
             "description": config_data.description,
@@ -78,10 +80,9 @@ async def save_config(config_data: ConfigSave):
             "created_at": datetime.now().isoformat()
         }
         
-        filename = f"{CONFIGS_DIR}/{config_data.name.replace(' ', '_')}.json"
-        
-        with open(filename, 'w') as f:
-            json.dump(config_file, f, indent=4)
+        filename = await asyncio.to_thread(
+            get_strategy_store(CONFIGS_DIR).save, f"{config_data.name.replace(' ', '_')}.json", config_file
+        )
         
         return {"message": "Configuration sauvegardée", "filename": filename}
     
@@ -92,18 +93,16 @@ async def save_config(config_data: ConfigSave):
 async def list_configs():
     """Liste toutes les configurations"""
     try:
-        configs = []
-        if os.path.exists(CONFIGS_DIR):
-            for filename in os.listdir(CONFIGS_DIR):
-                if filename.endswith('.json'):
-                    with open(f"{CONFIGS_DIR}/{filename}", 'r') as f:
-                        config = json.load(f)
-                        configs.append({
-                            "filename": filename,
-                            "name": config.get("name"),
-                            "description": config.get("description"),
-                            "created_at": config.get("created_at")
-                        })
+        saved = await asyncio.to_thread(get_strategy_store(CONFIGS_DIR).list)
+        configs = [
+            {
+                "filename": filename,
+                "name": config.get("name"),
+                "description": config.get("description"),
+                "created_at": config.get("created_at")
+            }
+            for filename, config in saved
+        ]
         
         return {"configs": configs}
     
@@ -152,21 +151,22 @@ async def get_configs():
     📊 Récupère la configuration actuelle du bot
     Route appelée par votre frontend Next.js
     """
+    version, config = await asyncio.to_thread(active_config_state().get)
     return {
         "success": True,
-        "config": current_config,
+        "config": config,
+        "version": version,
         "message": "Configuration récupérée avec succès",
         "timestamp": datetime.now().isoformat()
     }
 
 @config_router.post("/configs")
-async def update_configs(config_data: ConfigUpdate):
+async def update_configs(config_data: ConfigUpdate, expected_version: Optional[int] = None):
     """
     ⚙️ Met à jour la configuration du bot en temps réel
     Utilisée par votre frontend pour ajuster les paramètres
+    expected_version: refuse la mise à jour (409) si la config a changé depuis cette version
     """
-    global current_config
-    
     try:
         new_config = config_data.config
         
@@ -208,22 +208,42 @@ async def update_configs(config_data: ConfigUpdate):
                 "errors": validation_errors
             })
         
-        # ✅ Mise à jour de la config
-        current_config.update(new_config)
-        current_config["last_updated"] = datetime.now().isoformat()
+        # ✅ Mise à jour de la config (atomique entre workers)
+        version, config = await asyncio.to_thread(
+            active_config_state().update, {**new_config, "last_updated": datetime.now().isoformat()}, expected_version
+        )
         
         return {
             "success": True,
-            "config": current_config,
+            "config": config,
+            "version": version,
             "message": "Configuration mise à jour avec succès",
             "updated_fields": list(new_config.keys())
         }
         
     except HTTPException:
         raise
+    except VersionConflict as e:
+        raise HTTPException(status_code=409, detail={"message": str(e), "version": e.current})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur lors de la mise à jour: {str(e)}")
 
+@config_router.get("/configs/watch")
+async def watch_configs(since_version: int, timeout: float = 30.0):
+    """
+    👀 Notification de changement (long-polling): répond dès que la version dépasse since_version,
+    quel que soit le worker qui a modifié la config, ou au bout de timeout secondes (changed=false)
+    """
+    state = active_config_state()
+    changed = await state.wait_for_change(since_version, min(max(timeout, 0.0), 60.0))
+    version, config = changed if changed is not None else await asyncio.to_thread(state.get)
+    return {
+        "success": True,
+        "changed": changed is not None,
+        "version": version,
+        "config": config
+    }
+
 @config_router.get("/configs/default")
 async def get_default_configs():
     """
@@ -241,13 +261,14 @@ async def reset_configs():
     """
     🗑️ Remet la configuration aux valeurs par défaut optimisées
     """
-    global current_config
-    current_config = DEFAULT_CONFIG.copy()
-    current_config["last_updated"] = datetime.now().isoformat()
+    version, config = await asyncio.to_thread(
+        active_config_state().replace, {**DEFAULT_CONFIG, "last_updated": datetime.now().isoformat()}
+    )
     
     return {
         "success": True,
-        "config": current_config,
+        "config": config,
+        "version": version,
         "message": "Configuration remise aux valeurs par défaut optimisées"
     }
 
@@ -384,8 +405,6 @@ async def save_named_strategy(strategy_name: str, config_data: ConfigUpdate):
     💾 Sauvegarde une stratégie avec un nom personnalisé
     URL: POST /api/configs/ma-strategie-agressive
     """
-    global current_config
-    
     try:
         # Decode le nom de stratégie (au cas où il y aurait des caractères spéciaux)
         from urllib.parse import unquote
@@ -413,9 +432,7 @@ async def save_named_strategy(strategy_name: str, config_data: ConfigUpdate):
                 "errors": validation_errors
             })
         
-        # Sauvegarde de la stratégie nommée
-        os.makedirs(CONFIGS_DIR, exist_ok=True)
-        
+        # Sauvegarde de la stratégie nommée (écriture atomique, index mis à jour)
         strategy_file = {
             "name": decoded_name,
             "description": f"Stratégie personnalisée: {decoded_name}",
@@ -426,22 +443,23 @@ async def save_named_strategy(strategy_name: str, config_data: ConfigUpdate):
         
         # Nettoie le nom pour le fichier
         safe_filename = "".join(c for c in decoded_name if c.isalnum() or c in (' ', '-', '_')).rstrip()
-        filename = f"{CONFIGS_DIR}/{safe_filename.replace(' ', '_')}.json"
-        
-        with open(filename, 'w') as f:
-            json.dump(strategy_file, f, indent=4)
+        filename = await asyncio.to_thread(
+            get_strategy_store(CONFIGS_DIR).save, f"{safe_filename.replace(' ', '_')}.json", strategy_file
+        )
         
         # Met à jour aussi la config courante
-        current_config.update(new_config)
-        current_config["strategy_name"] = decoded_name
-        current_config["last_updated"] = datetime.now().isoformat()
+        version, config = await asyncio.to_thread(
+            active_config_state().update,
+            {**new_config, "strategy_name": decoded_name, "last_updated": datetime.now().isoformat()}
+        )
         
         return {
             "success": True,
             "message": f"Stratégie '{decoded_name}' sauvegardée avec succès",
             "strategy_name": decoded_name,
             "filename": filename,
-            "config": current_config
+            "config": config,
+            "version": version
         }
         
     except HTTPException:
@@ -459,21 +477,18 @@ async def load_named_strategy(strategy_name: str):
         from urllib.parse import unquote
         decoded_name = unquote(strategy_name)
         
-        # Cherche dans les fichiers sauvegardés
-        if os.path.exists(CONFIGS_DIR):
-            for filename in os.listdir(CONFIGS_DIR):
-                if filename.endswith('.json'):
-                    with open(f"{CONFIGS_DIR}/{filename}", 'r') as f:
-                        strategy_data = json.load(f)
-                        if strategy_data.get("name") == decoded_name:
-                            return {
-                                "success": True,
-                                "strategy_name": decoded_name,
-                                "config": strategy_data.get("config", {}),
-                                "description": strategy_data.get("description", ""),
-                                "created_at": strategy_data.get("created_at"),
-                                "message": f"Stratégie '{decoded_name}' chargée"
-                            }
+        # Cherche dans l'index des fichiers sauvegardés
+        found = await asyncio.to_thread(get_strategy_store(CONFIGS_DIR).get, decoded_name)
+        if found is not None:
+            _, strategy_data = found
+            return {
+                "success": True,
+                "strategy_name": decoded_name,
+                "config": strategy_data.get("config", {}),
+                "description": strategy_data.get("description", ""),
+                "created_at": strategy_data.get("created_at"),
+                "message": f"Stratégie '{decoded_name}' chargée"
+            }
         
         raise HTTPException(status_code=404, detail=f"Stratégie '{decoded_name}' non trouvée")
         
@@ -488,20 +503,16 @@ async def list_named_strategies():
     📋 Liste toutes les stratégies nommées sauvegardées
     """
     try:
-        strategies = []
-        
-        if os.path.exists(CONFIGS_DIR):
-            for filename in os.listdir(CONFIGS_DIR):
-                if filename.endswith('.json'):
-                    with open(f"{CONFIGS_DIR}/{filename}", 'r') as f:
-                        strategy_data = json.load(f)
-                        if strategy_data.get("type") == "named_strategy":
-                            strategies.append({
-                                "name": strategy_data.get("name"),
-                                "description": strategy_data.get("description"),
-                                "created_at": strategy_data.get("created_at"),
-                                "filename": filename
-                            })
+        saved = await asyncio.to_thread(get_strategy_store(CONFIGS_DIR).list, type="named_strategy")
+        strategies = [
+            {
+                "name": strategy_data.get("name"),
+                "description": strategy_data.get("description"),
+                "created_at": strategy_data.get("created_at"),
+                "filename": filename
+            }
+            for filename, strategy_data in saved
+        ]
         
         return {
             "success": True,
@@ -522,19 +533,13 @@ async def delete_named_strategy(strategy_name: str):
         from urllib.parse import unquote
         decoded_name = unquote(strategy_name)
         
-        if os.path.exists(CONFIGS_DIR):
-            for filename in os.listdir(CONFIGS_DIR):
-                if filename.endswith('.json'):
-                    filepath = f"{CONFIGS_DIR}/{filename}"
-                    with open(filepath, 'r') as f:
-                        strategy_data = json.load(f)
-                        if strategy_data.get("name") == decoded_name:
-                            os.remove(filepath)
-                            return {
-                                "success": True,
-                                "message": f"Stratégie '{decoded_name}' supprimée",
-                                "deleted_file": filename
-                            }
+        filename = await asyncio.to_thread(get_strategy_store(CONFIGS_DIR).delete, decoded_name)
+        if filename is not None:
+            return {
+                "success": True,
+                "message": f"Stratégie '{decoded_name}' supprimée",
+                "deleted_file": filename
+            }
         
         raise HTTPException(status_code=404, detail=f"Stratégie '{decoded_name}' non trouvée")
         
@@ -552,16 +557,14 @@ def get_current_config() -> Dict[str, Any]:
     🔧 Fonction utilitaire pour récupérer la config actuelle
     Utilisée par le moteur de backtest
     """
-    return current_config.copy()
+    return active_config_state().get()[1]
 
 def update_config_field(field: str, value: Any) -> bool:
     """
     🔄 Met à jour un champ spécifique de la configuration
     """
-    global current_config
     try:
-        current_config[field] = value
-        current_config["last_updated"] = datetime.now().isoformat()
+        active_config_state().update({field: value, "last_updated": datetime.now().isoformat()})
         return True
     except Exception:
         return False
\ No newline at end of file
@@ -1,6 +1,13 @@
 from fastapi import APIRouter, HTTPException
 from core.memecoin_bot import CoinGeckoAPI
-from datetime import datetime, timedelta
+from core.scanner import UniverseScanner
+from core.backfill import GRANULARITIES, PAGE_FETCHERS, epoch_seconds, resolve_targets
+from core.price_matrix import DTYPES, build_price_matrix, open_price_matrix
+from core.simulation import MEMECOIN_LIST
+from models.schemas import PriceMatrixRequest
+from utils.candle_store import CandleStore
+from datetime import datetime, timedelta, timezone
+import asyncio
 import json
 
 data_router = APIRouter()
@@ -8,6 +15,11 @@ data_router = APIRouter()
 # Initialize CoinGecko API
 coingecko_api = CoinGeckoAPI()
 
+# Scanner partagé: garde le snapshot précédent pour les rendements et pics de volume entre scans
+universe_scanner = UniverseScanner(symbol_index=coingecko_api.symbol_index)
+
+SCAN_SORT_KEYS = ("change_24h", "scan_return", "volume_spike", "quote_volume")
+
 @data_router.get("/data/memecoin-list")
 async def get_memecoin_list():
     """Récupère la liste des memecoins populaires"""
@@ -19,7 +31,7 @@ async def get_memecoin_list():
         {'id': 'bonk', 'name': 'Bonk', 'symbol': 'BONK'},
         {'id': 'wojak', 'name': 'Wojak', 'symbol': 'WOJAK'},
         {'id': 'mog-coin', 'name': 'Mog Coin', 'symbol': 'MOG'},
-        {'id': 'brett-based', 'name': 'Brett', 'symbol': 'BRETT'},
+        {'id': 'based-brett', 'name': 'Brett', 'symbol': 'BRETT'},
         {'id': 'book-of-meme', 'name': 'Book of Meme', 'symbol': 'BOME'},
         {'id': 'dogwifcoin', 'name': 'dogwifhat', 'symbol': 'WIF'},
         {'id': 'cat-in-a-dogs-world', 'name': 'Cat in a dogs world', 'symbol': 'MEW'},
@@ -48,6 +60,111 @@ async def get_coin_price(coin_id: str, days: int = 30):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur récupération données: {str(e)}")
 
+@data_router.get("/data/symbols")
+async def lookup_symbols(coin_id: str = None, exchange: str = None, symbol: str = None):
+    """Index des symboles: coin_id -> symboles par exchange, ou (exchange, symbole) -> coin_id"""
+    index = coingecko_api.symbol_index
+    if symbol:
+        if not exchange:
+            raise HTTPException(status_code=400, detail="exchange requis pour rechercher un symbole")
+        found = await asyncio.to_thread(index.coin_for, exchange, symbol)
+        if found is None:
+            raise HTTPException(status_code=404, detail=f"Symbole {symbol} non listé sur {exchange}")
+        return {"exchange": exchange, "symbol": symbol.upper(), "coin_id": found}
+    if coin_id:
+        symbols = await asyncio.to_thread(index.get, coin_id)
+        if symbols is None:
+            raise HTTPException(status_code=404, detail=f"{coin_id} n'est listé sur aucun exchange")
+        return {"coin_id": coin_id, "symbols": dict(symbols)}
+    return await asyncio.to_thread(index.get_stats)
+
+@data_router.post("/data/symbols/refresh")
+async def refresh_symbols():
+    """Reconstruit l'index depuis les listings des exchanges et la liste CoinGecko"""
+    try:
+        stats = await asyncio.to_thread(coingecko_api.symbol_index.refresh)
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Reconstruction de l'index impossible: {str(e)}")
+    return {"message": "🗂️ Index des symboles reconstruit", "stats": stats}
+
+@data_router.get("/data/upstreams")
+async def get_upstream_health():
+    """Santé des exchanges: latence EWMA/p95, taux d'erreur, état du circuit breaker, ordre courant"""
+    health = coingecko_api.health
+    return {
+        "upstreams": health.get_stats(),
+        "order": health.peek_order(name for name, _ in coingecko_api.apis),
+        "hedges": dict(health.hedges)
+    }
+
+@data_router.get("/data/scan")
+async def scan_universe(detection_threshold: float = 30, min_quote_volume: float = 0, limit: int = 50,
+                        sort_by: str = "change_24h"):
+    """Pumps en cours sur toutes les paires listées (un snapshot 24h par exchange)"""
+    if sort_by not in SCAN_SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"Tri inconnu: {sort_by} (valeurs: {', '.join(SCAN_SORT_KEYS)})")
+    result = await asyncio.to_thread(universe_scanner.scan, detection_threshold, min_quote_volume, limit, sort_by)
+    if not universe_scanner.snapshots:
+        raise HTTPException(status_code=502, detail=f"Aucun exchange joignable: {result['errors']}")
+    return result
+
+@data_router.get("/data/candles")
+async def get_candle_coverage(exchange: str = None):
+    """Séries historiques présentes dans le stockage local (remplies par /api/analysis/backfill)"""
+    return {"series": await asyncio.to_thread(CandleStore().coverage, exchange)}
+
+@data_router.get("/data/candles/{coin_id}")
+async def get_stored_candles(coin_id: str, exchange: str, granularity: str = "1h", start: int = None, end: int = None):
+    """Bougies stockées d'un coin, triées par date (timestamps en secondes)"""
+    if granularity not in GRANULARITIES:
+        raise HTTPException(status_code=400, detail=f"Granularité inconnue: {granularity} (valeurs: {', '.join(GRANULARITIES)})")
+    symbol = await asyncio.to_thread(coingecko_api.symbol_index.symbol_for, coin_id, exchange)
+    if symbol is None:
+        raise HTTPException(status_code=404, detail=f"{coin_id} n'est pas listé sur {exchange}")
+
+    candles = await asyncio.to_thread(CandleStore().get_candles, exchange, symbol, GRANULARITIES[granularity], start, end)
+    return {
+        "coin_id": coin_id,
+        "exchange": exchange,
+        "symbol": symbol,
+        "granularity": granularity,
+        "count": len(candles["close"]),
+        **{column: values.tolist() for column, values in candles.items()}
+    }
+
+@data_router.post("/data/price-matrix")
+async def build_matrix(matrix_request: PriceMatrixRequest):
+    """Construit la matrice coins × temps memory-mapped depuis les bougies stockées"""
+    if matrix_request.granularity not in GRANULARITIES:
+        raise HTTPException(status_code=400, detail=f"Granularité inconnue: {matrix_request.granularity} (valeurs: {', '.join(GRANULARITIES)})")
+    if matrix_request.exchange is not None and matrix_request.exchange not in PAGE_FETCHERS:
+        raise HTTPException(status_code=400, detail=f"Exchange inconnu: {matrix_request.exchange} (valeurs: {', '.join(PAGE_FETCHERS)})")
+    if matrix_request.dtype not in DTYPES:
+        raise HTTPException(status_code=400, detail=f"dtype inconnu: {matrix_request.dtype} (valeurs: {', '.join(DTYPES)})")
+
+    start = epoch_seconds(matrix_request.start)
+    end = epoch_seconds(matrix_request.end or datetime.now(timezone.utc))
+    if end <= start:
+        raise HTTPException(status_code=400, detail="La date de fin doit être après la date de début")
+
+    targets, missing = await asyncio.to_thread(
+        resolve_targets, matrix_request.coins or list(MEMECOIN_LIST), coingecko_api.symbol_index, matrix_request.exchange
+    )
+    if not targets:
+        raise HTTPException(status_code=404, detail="Aucun coin listé sur les exchanges demandés")
+
+    stats = await asyncio.to_thread(build_price_matrix, CandleStore(), targets, GRANULARITIES[matrix_request.granularity],
+                                    start, end, dtype=matrix_request.dtype)
+    return {"message": "🧮 Matrice de prix construite", "stats": stats, "unlisted_coins": missing}
+
+@data_router.get("/data/price-matrix")
+async def get_matrix_info():
+    """Matrice de prix courante (coins, plage, dtype, forme)"""
+    matrix = open_price_matrix()
+    if matrix is None:
+        raise HTTPException(status_code=404, detail="Matrice non construite (POST /api/data/price-matrix)")
+    return matrix.get_info()
+
 @data_router.get("/data/market-overview")
 async def get_market_overview():
     """Récupère un aperçu du marché crypto"""
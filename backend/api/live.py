@@ -0,0 +1,101 @@
+from fastapi import APIRouter, HTTPException
+from models.schemas import LiveSniperRequest
+from utils.storage import live_sessions
+from core.live_sniper import LiveSniper, FakeTickerFeed, PollingTickerFeed
+from core.market_stream import STREAMS, StreamingTickerFeed, build_stream
+from core.memecoin_bot import CoinGeckoAPI
+from core.simulation import MEMECOIN_LIST
+import asyncio
+import uuid
+
+live_router = APIRouter()
+
+FEEDS = ("fake", "stream", "poll")
+
+def get_session(session_id: str) -> LiveSniper:
+    if session_id not in live_sessions:
+        raise HTTPException(status_code=404, detail="Session live non trouvée")
+    return live_sessions[session_id]
+
+@live_router.post("/live/start")
+async def start_live_sniper(live_request: LiveSniperRequest):
+    """Démarre une session sniper en paper trading (flux fake local ou prix réels)"""
+    if live_request.feed not in FEEDS:
+        raise HTTPException(status_code=400, detail=f"Flux inconnu: {live_request.feed} (valeurs: {', '.join(FEEDS)})")
+    if live_request.max_open_positions < 1 or live_request.queue_size < 1:
+        raise HTTPException(status_code=400, detail="max_open_positions et queue_size doivent être d'au moins 1")
+    if live_request.feed == "stream" and live_request.exchange not in STREAMS:
+        raise HTTPException(status_code=400, detail=f"Exchange inconnu: {live_request.exchange} (valeurs: {', '.join(STREAMS)})")
+
+    coins = live_request.coins or list(MEMECOIN_LIST)
+    if live_request.feed == "fake":
+        feed = FakeTickerFeed(coins, seed=live_request.seed, interval=live_request.fake_interval,
+                              time_step=live_request.fake_time_step)
+    elif live_request.feed == "stream":
+        try:
+            # Lookups de l'index des symboles hors de la boucle d'événements
+            stream = await asyncio.to_thread(build_stream, live_request.exchange, coins,
+                                             CoinGeckoAPI().symbol_mappings, url=live_request.stream_url)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        coins = list(stream.symbols)
+        feed = StreamingTickerFeed(stream)
+    else:
+        feed = PollingTickerFeed(CoinGeckoAPI(), coins, interval=live_request.poll_interval,
+                                 hedged=live_request.hedged)
+
+    session_id = str(uuid.uuid4())
+    sniper = LiveSniper(
+        session_id, live_request.config, feed,
+        max_open_positions=live_request.max_open_positions,
+        detection_window_seconds=live_request.detection_window_seconds,
+        queue_size=live_request.queue_size
+    )
+    live_sessions[session_id] = sniper
+    await sniper.start()
+
+    return {
+        "session_id": session_id,
+        "status": sniper.status,
+        "feed": live_request.feed,
+        "coins": coins,
+        "message": "🎯 Sniper live démarré (paper trading)"
+    }
+
+@live_router.get("/live")
+async def list_live_sessions():
+    """Sessions live (actives et terminées)"""
+    return {
+        "sessions": [
+            {
+                "session_id": session_id,
+                "status": sniper.status,
+                "equity": sniper.equity,
+                "open_positions": len(sniper.positions),
+                "closed_trades": len(sniper.trades)
+            }
+            for session_id, sniper in live_sessions.items()
+        ]
+    }
+
+@live_router.get("/live/{session_id}/status")
+async def get_live_status(session_id: str):
+    """Capital, positions ouvertes, compteurs, profondeur des files et latences"""
+    return get_session(session_id).get_status()
+
+@live_router.get("/live/{session_id}/trades")
+async def get_live_trades(session_id: str, limit: int = 100):
+    """Derniers trades papier clôturés"""
+    sniper = get_session(session_id)
+    return {
+        "session_id": session_id,
+        "total": len(sniper.trades),
+        "trades": sniper.trades[-limit:]
+    }
+
+@live_router.delete("/live/{session_id}")
+async def stop_live_sniper(session_id: str):
+    """Arrête une session (les positions ouvertes restent affichées au dernier prix)"""
+    sniper = get_session(session_id)
+    await sniper.stop()
+    return {"message": "⏹️ Sniper arrêté", "status": sniper.get_status()}
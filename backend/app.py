@@ -3,14 +3,18 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from datetime import datetime
 import uvicorn
+import asyncio
 import os
 
 # Imports des modules locaux
 from api.backtest import backtest_router
 from api.data import data_router
-from api.config import config_router
+from api.config import config_router, CONFIGS_DIR, active_config_state
+from api.analysis import analysis_router
+from api.live import live_router
 from core.memecoin_bot import CoinGeckoAPI
-from utils.storage import active_backtests, backtest_results_cache
+from utils.storage import active_backtests, backtest_results_cache, live_sessions, get_strategy_store
+from core.job_scheduler import backtest_scheduler
 
 app = FastAPI(
     title="🤖 Memecoin Trading Bot API",
@@ -34,6 +38,8 @@ coingecko_api = CoinGeckoAPI()
 app.include_router(backtest_router, prefix="/api")
 app.include_router(data_router, prefix="/api")
 app.include_router(config_router, prefix="/api")
+app.include_router(analysis_router, prefix="/api")
+app.include_router(live_router, prefix="/api")
 
 @app.get("/")
 async def root():
@@ -52,10 +58,29 @@ async def get_api_status():
         "status": "running",
         "version": "1.0.0",
         "active_backtests": len(active_backtests),
+        "scheduler": backtest_scheduler.get_stats(),
+        "live_sessions": sum(1 for sniper in live_sessions.values() if sniper.status == "running"),
         "coingecko_status": await check_coingecko_status(),
         "timestamp": datetime.now().isoformat()
     }
 
+@app.on_event("startup")
+async def build_strategy_index():
+    """Construit l'index des stratégies sauvegardées (rescan du dossier hors de la boucle d'événements)"""
+    await asyncio.to_thread(get_strategy_store(CONFIGS_DIR).refresh)
+
+@app.on_event("startup")
+async def open_active_config():
+    """Ouvre (et initialise au besoin) la config active partagée, hors de la boucle d'événements"""
+    await asyncio.to_thread(active_config_state)
+
+@app.on_event("shutdown")
+async def shutdown_scheduler():
+    """Annule proprement les backtests et sessions live en cours à l'arrêt du serveur"""
+    await backtest_scheduler.shutdown()
+    for sniper in live_sessions.values():
+        await sniper.stop()
+
 async def check_coingecko_status():
     """Vérifie si CoinGecko API est accessible"""
     try:
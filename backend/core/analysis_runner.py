@@ -0,0 +1,65 @@
+"""
+🧪 Exécution des analyses longues (walk-forward, sweeps, ...)
+Registre commun au nœud API (ordonnanceur local) et aux workers distribués
+"""
+
+import asyncio
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+from core.job_scheduler import CancelToken
+from utils.storage import active_backtests, analysis_results
+
+# kind -> (schéma de la requête, runner synchrone(request, progress, cancel_token) -> dict)
+ANALYSIS_RUNNERS: Dict[str, Tuple[Type[BaseModel], Callable]] = {}
+
+
+def register_analysis(kind: str, schema: Type[BaseModel]):
+    """Décorateur: rend une analyse exécutable par l'API et par worker.py"""
+    def decorator(runner):
+        ANALYSIS_RUNNERS[kind] = (schema, runner)
+        return runner
+    return decorator
+
+
+async def run_analysis(job_id: str, kind: str, request: BaseModel, cancel_token: Optional[CancelToken] = None):
+    """
+    Exécute une analyse dans un thread (le calcul lourd ne bloque pas l'event loop)
+    Met à jour active_backtests[job_id] et stocke le résultat dans analysis_results
+    """
+    _, runner = ANALYSIS_RUNNERS[kind]
+    status = active_backtests.get(job_id)
+
+    def progress(percent: float, message: str, live_metrics: Optional[Dict] = None):
+        """live_metrics: résultats intermédiaires (classement, ...) publiés avec le status"""
+        if status is not None and status.status == "running":
+            status.progress = percent
+            status.message = message
+            if live_metrics is not None:
+                status.live_metrics = live_metrics
+
+    try:
+        result = await asyncio.to_thread(runner, request, progress, cancel_token)
+
+        if cancel_token is not None and cancel_token.cancelled:
+            return
+        if status is not None and status.status != "running":
+            return
+
+        analysis_results[job_id] = result
+        if status is not None:
+            status.status = "completed"
+            status.progress = 100.0
+            status.message = "✅ Analyse terminée avec succès!"
+            status.completed_at = datetime.now()
+
+    except Exception as e:
+        if cancel_token is not None and cancel_token.cancelled:
+            return  # Arrêt demandé (JobCancelled du runner): l'ordonnanceur le compte comme annulé
+        if status is not None:
+            status.status = "failed"
+            status.message = f"❌ Erreur: {str(e)}"
+        print(f"Erreur analyse {kind} {job_id}: {e}")
+        raise  # L'ordonnanceur doit compter le job en échec (JOB_FAILED), pas terminé
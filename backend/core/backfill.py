@@ -0,0 +1,261 @@
+"""
+📥 Backfill historique parallèle - Bougies Coinbase et klines Binance
+La plage demandée est découpée en pages à la taille max de l'exchange (300 bougies Coinbase,
+1000 klines Binance), téléchargées en parallèle sous le token bucket de l'exchange,
+dédupliquées et ordonnées dans le CandleStore SQLite. Les pages terminées sont sautées à la reprise
+"""
+
+import time
+from itertools import zip_longest
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from core.analysis_runner import register_analysis
+from core.job_scheduler import CancelToken, JobCancelled
+from core.simulation import MEMECOIN_LIST
+from models.schemas import BackfillRequest
+from utils.candle_store import Candle, CandleStore
+from utils.rate_limiter import get_rate_limiter
+
+GRANULARITIES = {
+    '1m': 60,
+    '5m': 300,
+    '15m': 900,
+    '1h': 3600,
+    '6h': 21600,
+    '1d': 86400
+}
+
+# Bougies max par requête
+PAGE_SIZES = {
+    'Coinbase': 300,
+    'Binance': 1000
+}
+
+# Ordre de préférence: pages Binance 3x plus grandes et limite de débit 2x plus haute
+EXCHANGE_PREFERENCE = ('Binance', 'Coinbase')
+
+MAX_ATTEMPTS = 4
+REQUEST_TIMEOUT = 15
+
+# (exchange, symbol, page_start)
+Page = Tuple[str, str, int]
+
+
+def fetch_coinbase_page(session: requests.Session, symbol: str, granularity: int, start: int, end: int) -> List[Candle]:
+    """Bougies Coinbase [start, end) - format [time, low, high, open, close, volume], plus récentes d'abord"""
+    response = session.get(
+        f"https://api.exchange.coinbase.com/products/{symbol}/candles",
+        params={
+            'start': datetime.fromtimestamp(start, timezone.utc).isoformat(),
+            'end': datetime.fromtimestamp(end - granularity, timezone.utc).isoformat(),  # end inclusif côté Coinbase
+            'granularity': granularity
+        },
+        timeout=REQUEST_TIMEOUT
+    )
+    response.raise_for_status()
+    return [
+        (int(c[0]), float(c[3]), float(c[2]), float(c[1]), float(c[4]), float(c[5]))
+        for c in response.json() if start <= c[0] < end
+    ]
+
+
+def fetch_binance_page(session: requests.Session, symbol: str, granularity: int, start: int, end: int) -> List[Candle]:
+    """Klines Binance [start, end) - format [open_time ms, open, high, low, close, volume, ...]"""
+    interval = next(name for name, seconds in GRANULARITIES.items() if seconds == granularity)
+    response = session.get(
+        "https://api.binance.com/api/v3/klines",
+        params={
+            'symbol': symbol,
+            'interval': interval,
+            'startTime': start * 1000,
+            'endTime': end * 1000 - 1,
+            'limit': PAGE_SIZES['Binance']
+        },
+        timeout=REQUEST_TIMEOUT
+    )
+    response.raise_for_status()
+    return [
+        (int(k[0]) // 1000, float(k[1]), float(k[2]), float(k[3]), float(k[4]), float(k[5]))
+        for k in response.json()
+    ]
+
+
+PAGE_FETCHERS: Dict[str, Callable[..., List[Candle]]] = {
+    'Coinbase': fetch_coinbase_page,
+    'Binance': fetch_binance_page
+}
+
+
+def epoch_seconds(value: datetime) -> int:
+    """Timestamp en secondes (les dates sans fuseau sont en UTC)"""
+    return int(value.replace(tzinfo=value.tzinfo or timezone.utc).timestamp())
+
+
+def build_pages(start: int, end: int, granularity: int, page_size: int) -> List[int]:
+    """
+    Débuts des pages couvrant [start, end), sur une grille absolue (multiples de la taille de page):
+    deux backfills aux dates différentes retombent sur les mêmes pages, donc sur les mêmes marqueurs de reprise
+    """
+    span = granularity * page_size
+    return list(range(start - start % span, end, span))
+
+
+def fetch_with_retry(fetcher, session: requests.Session, exchange: str, symbol: str, granularity: int,
+                     start: int, end: int, cancel_token: Optional[CancelToken] = None) -> List[Candle]:
+    """Une page sous le token bucket de l'exchange, avec backoff sur 429/5xx et erreurs réseau"""
+    bucket = get_rate_limiter(exchange)
+    for attempt in range(MAX_ATTEMPTS):
+        if cancel_token is not None:
+            cancel_token.raise_if_cancelled()
+        bucket.acquire()
+        try:
+            return fetcher(session, symbol, granularity, start, end)
+        except requests.HTTPError as e:
+            status = e.response.status_code if e.response is not None else None
+            if status is not None and status != 429 and status < 500:
+                raise  # 4xx: symbole inconnu ou plage invalide, inutile de réessayer
+            if attempt == MAX_ATTEMPTS - 1:
+                raise
+        except requests.RequestException:
+            if attempt == MAX_ATTEMPTS - 1:
+                raise
+        time.sleep(min(2 ** attempt, 10))
+    return []
+
+
+def resolve_targets(coins: List[str], symbol_index, exchange: Optional[str]) -> Tuple[List[Tuple[str, str, str]], List[str]]:
+    """(coin_id, exchange, symbole) à télécharger, et coins listés nulle part"""
+    exchanges = [exchange] if exchange else list(EXCHANGE_PREFERENCE)
+    targets, missing = [], []
+    for coin_id in coins:
+        for name in exchanges:
+            symbol = symbol_index.symbol_for(coin_id, name)
+            if symbol:
+                targets.append((coin_id, name, symbol))
+                break
+        else:
+            missing.append(coin_id)
+    return targets, missing
+
+
+def run_backfill_pages(pages: List[Page], granularity: int, store: CandleStore, concurrency: int,
+                       session: requests.Session, progress: Callable[[int, int], None],
+                       cancel_token: Optional[CancelToken] = None,
+                       fetchers: Optional[Dict[str, Callable[..., List[Candle]]]] = None) -> Dict[str, int]:
+    """
+    Télécharge les pages en parallèle (threads: l'attente réseau domine)
+    Le thread principal est le seul écrivain SQLite: chaque page est écrite dès qu'elle arrive
+    """
+    fetchers = fetchers or PAGE_FETCHERS
+    now = int(time.time())
+    stats = {'pages': 0, 'candles': 0, 'failed_pages': 0}
+    errors: List[str] = []
+    pending = iter(pages)
+    in_flight = {}
+
+    def submit_next(executor) -> bool:
+        page = next(pending, None)
+        if page is None:
+            return False
+        exchange, symbol, page_start = page
+        page_end = page_start + granularity * PAGE_SIZES[exchange]
+        future = executor.submit(fetch_with_retry, fetchers[exchange], session, exchange, symbol,
+                                 granularity, page_start, page_end, cancel_token)
+        in_flight[future] = (page, page_end)
+        return True
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        # Fenêtre glissante de pages en vol: pas de milliers de futures en mémoire
+        for _ in range(concurrency * 2):
+            if not submit_next(executor):
+                break
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                (exchange, symbol, page_start), page_end = in_flight.pop(future)
+                try:
+                    candles = future.result()
+                except JobCancelled:
+                    break
+                except Exception as e:
+                    stats['failed_pages'] += 1
+                    errors.append(f"{exchange} {symbol} @{page_start}: {e}")
+                else:
+                    # La page qui contient le présent reste à compléter au prochain passage
+                    store.write_page(exchange, symbol, granularity, page_start, candles,
+                                     complete=page_end <= now - granularity)
+                    stats['pages'] += 1
+                    stats['candles'] += len(candles)
+                progress(stats['pages'] + stats['failed_pages'], len(pages))
+                submit_next(executor)
+
+            if cancel_token is not None and cancel_token.cancelled:
+                for future in in_flight:
+                    future.cancel()
+                cancel_token.raise_if_cancelled()
+
+    stats['errors'] = errors[:20]
+    return stats
+
+
+@register_analysis("backfill", BackfillRequest)
+def run_backfill(request: BackfillRequest, progress: Optional[Callable[[float, str], None]] = None,
+                 cancel_token: Optional[CancelToken] = None, store: Optional[CandleStore] = None,
+                 fetchers: Optional[Dict[str, Callable[..., List[Candle]]]] = None) -> Dict:
+    """
+    Backfill d'une plage de dates pour plusieurs coins
+    Reprise: relancer la même requête ne télécharge que les pages manquantes ou en échec
+    """
+    from core.memecoin_bot import SYMBOL_INDEX
+
+    progress = progress or (lambda percent, message: None)
+    if request.granularity not in GRANULARITIES:
+        raise ValueError(f"Granularité inconnue: {request.granularity} (valeurs: {', '.join(GRANULARITIES)})")
+    if request.exchange is not None and request.exchange not in PAGE_FETCHERS:
+        raise ValueError(f"Exchange inconnu: {request.exchange} (valeurs: {', '.join(PAGE_FETCHERS)})")
+
+    granularity = GRANULARITIES[request.granularity]
+    start = epoch_seconds(request.start)
+    end = epoch_seconds(request.end or datetime.now(timezone.utc))
+    if end <= start:
+        raise ValueError("La date de fin doit être après la date de début")
+
+    store = store or CandleStore()
+    targets, missing = resolve_targets(request.coins or list(MEMECOIN_LIST), SYMBOL_INDEX, request.exchange)
+
+    per_target: List[List[Page]] = []
+    skipped = 0
+    for _, exchange, symbol in targets:
+        done = store.completed_pages(exchange, symbol, granularity)
+        page_starts = build_pages(start, end, granularity, PAGE_SIZES[exchange])
+        todo = [(exchange, symbol, page_start) for page_start in page_starts if page_start not in done]
+        skipped += len(page_starts) - len(todo)
+        per_target.append(todo)
+    # Round-robin entre coins: les seaux des deux exchanges travaillent en même temps
+    pages = [page for group in zip_longest(*per_target) for page in group if page is not None]
+
+    progress(5.0, f"📥 {len(pages)} pages à télécharger ({skipped} déjà en base) pour {len(targets)} coins")
+    started = time.time()
+
+    def page_progress(completed: int, total: int):
+        progress(5.0 + 95.0 * completed / max(total, 1), f"📥 {completed}/{total} pages")
+
+    stats = run_backfill_pages(pages, granularity, store, request.concurrency, requests.Session(),
+                               page_progress, cancel_token, fetchers)
+
+    return {
+        'granularity': request.granularity,
+        'start': start,
+        'end': end,
+        'coins': [{'coin_id': coin_id, 'exchange': exchange, 'symbol': symbol} for coin_id, exchange, symbol in targets],
+        'unlisted_coins': missing,
+        'skipped_pages': skipped,
+        'elapsed_seconds': time.time() - started,
+        **stats,
+        'complete': stats['failed_pages'] == 0
+    }
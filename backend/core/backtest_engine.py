@@ -1,15 +1,29 @@
 import asyncio
+import random
 import numpy as np
 from datetime import datetime
+from typing import Optional
 from models.schemas import BacktestConfig, BacktestResult
-from utils.storage import active_backtests, backtest_results_cache
+from utils.storage import active_backtests, backtest_results_cache, get_checkpoint_store
+from utils.checkpoint_store import CheckpointStore
 from core.memecoin_bot import SmartMemecoinBacktester, CoinGeckoAPI
+from core.job_scheduler import CancelToken
+from core.simulation import first_touch_exits, simulate_daily_returns, EXIT_REASONS
+from core.execution import ExecutionSimulator, execution_summary
 
-async def run_real_backtest(backtest_id: str, config: BacktestConfig):
+async def run_real_backtest(backtest_id: str, config: BacktestConfig, cancel_token: Optional[CancelToken] = None,
+                            seed: Optional[int] = None, resume_from: Optional[str] = None,
+                            checkpoints: Optional[CheckpointStore] = None):
     """
     Exécute le backtest avec VOTRE logique exacte du GUI Tkinter
+    cancel_token: jeton de l'ordonnanceur, vérifié à chaque mois
+    seed: seed du générateur du backtest (None = aléatoire), enregistrée dans les checkpoints
+    resume_from: backtest dont on reprend le dernier checkpoint - backtest_id lui-même pour une reprise
+    (démarrage normal s'il n'en a pas), un autre id pour une extension (checkpoint copié sous backtest_id)
     """
     try:
+        checkpoints = checkpoints or get_checkpoint_store()
+        
         # Initialise le backtester avec vos paramètres exacts
         coingecko_api = CoinGeckoAPI()
         backtester = SmartMemecoinBacktester(
@@ -45,12 +59,45 @@ async def run_real_backtest(backtest_id: str, config: BacktestConfig):
         total_trades = 0
         winning_trades = 0
         moon_shots = 0
+        first_month = 1
+        
+        # Reprise: mois terminés, compteurs et état exact du générateur du dernier checkpoint
+        checkpoint = None
+        if resume_from is not None:
+            if resume_from != backtest_id and not await asyncio.to_thread(checkpoints.fork, resume_from, backtest_id):
+                raise ValueError(f"Aucun checkpoint pour le backtest {resume_from}")
+            checkpoint = await asyncio.to_thread(checkpoints.load, backtest_id)
+        
+        if checkpoint is not None:
+            state = checkpoint['state']
+            seed = checkpoint['seed']
+            rng = np.random.default_rng(seed)
+            rng.bit_generator.state = state['rng_state']
+            for month_data in checkpoint['months']:
+                results['capital'].append(month_data['capital'])
+                results['returns'].append(month_data['return_pct'])
+                results['trades'].extend(month_data['trades'])
+                results['monthly_stats'].append(month_data['stats'])
+            if len(results['trades']) != state['trade_cursor']:
+                raise ValueError(f"Checkpoint incohérent: {len(results['trades'])} trades pour un curseur à {state['trade_cursor']}")
+            
+            current_capital = state['capital']
+            total_trades = state['total_trades']
+            winning_trades = state['winning_trades']
+            moon_shots = state['moon_shots']
+            first_month = checkpoint['month'] + 1
+            print(f"♻️ Backtest {backtest_id} repris au mois {first_month}/{months_count}")
+        else:
+            seed = seed if seed is not None else random.randrange(2 ** 32)
+            rng = np.random.default_rng(seed)
         
         # SIMULATION MENSUELLE EXACTE (comme dans votre GUI)
-        for month in range(1, months_count + 1):
+        for month in range(first_month, months_count + 1):
             # Vérification si le backtest doit s'arrêter
             if backtest_id not in active_backtests or active_backtests[backtest_id].status != "running":
                 break
+            if cancel_token is not None and cancel_token.cancelled:
+                break
             
             # Mise à jour du progress (comme dans votre GUI)
             progress = (month / months_count) * 100
@@ -61,7 +108,7 @@ async def run_real_backtest(backtest_id: str, config: BacktestConfig):
             # SIMULATION DU MOIS avec vraies données CoinGecko
             month_start_capital = current_capital
             month_results = await simulate_month_with_coingecko(
-                month, current_capital, config, backtester
+                month, current_capital, config, backtester, rng
             )
             
             # Mise à jour du capital
@@ -76,6 +123,21 @@ async def run_real_backtest(backtest_id: str, config: BacktestConfig):
             winning_trades += month_results['winning_trades']
             moon_shots += month_results['moon_shots']
             
+            # Checkpoint du mois (seul le mois écoulé est écrit)
+            await asyncio.to_thread(
+                checkpoints.save_month, backtest_id, config.dict(), seed, month, months_count,
+                {
+                    'capital': current_capital,
+                    'total_trades': total_trades,
+                    'winning_trades': winning_trades,
+                    'moon_shots': moon_shots,
+                    'trade_cursor': len(results['trades']),
+                    'rng_state': rng.bit_generator.state
+                },
+                current_capital, month_results['return_pct'], month_results['trades'], month_results['stats'],
+                month_results['paths'], month_results['coin_index']
+            )
+            
             # Métriques live (comme dans votre GUI)
             total_return = ((current_capital - config.initial_capital) / config.initial_capital) * 100
             win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
@@ -91,10 +153,12 @@ async def run_real_backtest(backtest_id: str, config: BacktestConfig):
             await asyncio.sleep(0.2)
         
         # FINALISATION (comme dans votre GUI)
-        if backtest_id in active_backtests and active_backtests[backtest_id].status == "running":
+        cancelled = cancel_token is not None and cancel_token.cancelled
+        if backtest_id in active_backtests and active_backtests[backtest_id].status == "running" and not cancelled:
             
             # Calculs finaux
             final_results = calculate_final_metrics(results, config)
+            final_results['summary']['seed'] = seed
             
             # Stockage des résultats
             backtest_results_cache[backtest_id] = BacktestResult(
@@ -119,45 +183,54 @@ async def run_real_backtest(backtest_id: str, config: BacktestConfig):
             active_backtests[backtest_id].status = "failed"
             active_backtests[backtest_id].message = f"❌ Erreur: {str(e)}"
         print(f"Erreur backtest {backtest_id}: {e}")
+        raise  # L'ordonnanceur doit compter le job en échec (JOB_FAILED), pas terminé
 
-async def simulate_month_with_coingecko(month: int, current_capital: float, config: BacktestConfig, backtester):
+async def simulate_month_with_coingecko(month: int, current_capital: float, config: BacktestConfig, backtester,
+                                        rng: Optional[np.random.Generator] = None):
     """
     Simule un mois de trading avec les VRAIES données CoinGecko
-    Logique identique à votre generate_realistic_performance()
+    Logique identique à votre generate_realistic_performance(), sorties évaluées jour par jour
     """
+    rng = rng if rng is not None else np.random.default_rng()
+    execution = ExecutionSimulator(config.execution, rng) if config.execution is not None else None
     
     # Liste des top memecoins à analyser (comme dans votre stratégie)
     memecoin_list = [
         'dogecoin', 'shiba-inu', 'pepe', 'floki', 'bonk', 
-        'wojak', 'mog-coin', 'brett-based', 'book-of-meme',
+        'wojak', 'mog-coin', 'based-brett', 'book-of-meme',
         'dogwifcoin', 'cat-in-a-dogs-world', 'memecoin-2'
     ]
     
     month_trades = []
+    recorded = []  # Trades journalisés: leurs chemins bruts sont gardés pour le re-scoring
     trades_count = 0
     winning_trades = 0
     moon_shots = 0
     month_start_capital = current_capital
     
     # Génère 8-15 trades par mois (comme dans votre GUI)
-    target_trades = np.random.randint(8, 16)
+    target_trades = int(rng.integers(8, 16))
+    selected_coins = rng.choice(memecoin_list, size=target_trades)
     
-    for trade_idx in range(target_trades):
+    # Chemins journaliers de tous les trades du mois, puis sorties au premier contact
+    daily_returns = await get_realistic_paths_from_coingecko(selected_coins, config, rng)
+    take_profits = [config.tp1, config.tp2, config.tp3, config.tp4, config.tp5]
+    exits = first_touch_exits(daily_returns, [config.stop_loss], [take_profits])
+    
+    for trade_idx, selected_coin in enumerate(selected_coins):
         try:
-            # Sélectionne un memecoin aléatoire
-            selected_coin = np.random.choice(memecoin_list)
-            
-            # Récupère les vraies données CoinGecko pour ce mois
-            performance = await get_realistic_performance_from_coingecko(
-                selected_coin, config
-            )
-            
-            # Applique VOS règles de sortie exactes
-            final_return = apply_your_exit_rules(performance, config)
+            # Applique VOS règles de sortie exactes, au jour où elles se déclenchent
+            final_return = float(exits.returns[0, trade_idx])
             
             # Calcul P&L exactement comme dans votre GUI
             position_size_usd = current_capital * (config.position_size / 100)
-            pnl = position_size_usd * (final_return / 100) - 40  # fees
+            execution_details = None
+            if execution is None:
+                pnl = position_size_usd * (final_return / 100) - 40  # fees
+            else:
+                # Fill réaliste: latence, slippage, spread, frais %, fill partiel
+                gross_return = final_return
+                final_return, pnl, execution_details = simulate_execution(execution, position_size_usd, gross_return)
             
             current_capital += pnl
             trades_count += 1
@@ -175,9 +248,14 @@ async def simulate_month_with_coingecko(month: int, current_capital: float, conf
                 'return': final_return,
                 'pnl': pnl,
                 'action': 'SELL',
-                'date': f"2024-{month:02d}-{np.random.randint(1, 29):02d}",
-                'holding_days': np.random.randint(1, config.max_holding_days + 1)
+                'date': f"2024-{month:02d}-{int(rng.integers(1, 29)):02d}",
+                'holding_days': int(exits.holding_days[0, trade_idx]),
+                'exit_reason': EXIT_REASONS[int(exits.exit_reason[0, trade_idx])]
             })
+            if execution_details is not None:
+                month_trades[-1]['gross_return'] = gross_return
+                month_trades[-1]['execution'] = execution_details
+            recorded.append(trade_idx)
             
         except Exception as e:
             print(f"Erreur trade {trade_idx}: {e}")
@@ -193,6 +271,8 @@ async def simulate_month_with_coingecko(month: int, current_capital: float, conf
         'trades_count': trades_count,
         'winning_trades': winning_trades,
         'moon_shots': moon_shots,
+        'paths': daily_returns[recorded],
+        'coin_index': np.array([memecoin_list.index(coin) for coin in selected_coins[recorded]], dtype=np.int64),
         'stats': {
             'month': month,
             'starting_capital': month_start_capital,
@@ -204,53 +284,30 @@ async def simulate_month_with_coingecko(month: int, current_capital: float, conf
         }
     }
 
-async def get_realistic_performance_from_coingecko(coin_id: str, config: BacktestConfig):
-    """
-    Récupère la performance réaliste basée sur les données CoinGecko
-    """
-    try:
-        # Simulation basée sur les patterns réels des memecoins
-        base_trend = np.random.normal(1.5, 3.0)
-        volatility = np.random.uniform(40, 80)
-        
-        cumulative = 0
-        for day in range(config.max_holding_days):
-            daily = np.random.normal(base_trend, volatility/12)
-            
-            # Events spéciaux basés sur l'analyse réelle des memecoins
-            random_event = np.random.random()
-            
-            if random_event < 0.08:  # Moon shot (8% comme observé)
-                daily += np.random.uniform(200, 800)
-            elif random_event < 0.05:  # Pump majeur (5%)
-                daily += np.random.uniform(50, 150)
-            elif random_event < 0.12:  # Dump (12%)
-                daily -= np.random.uniform(30, 60)
-            
-            cumulative += daily
-        
-        return cumulative
-        
-    except Exception as e:
-        print(f"Erreur CoinGecko pour {coin_id}: {e}")
-        return np.random.normal(0, 50)
+def simulate_execution(execution: ExecutionSimulator, amount: float, gross_return: float):
+    """Aller-retour d'un trade via le simulateur: (rendement net %, P&L, détails d'exécution)"""
+    fill = execution.round_trip([amount], [gross_return])
+    latency_cost = execution.latency_cost([amount], [gross_return],
+                                          fill['entry_latency_ms'], fill['exit_latency_ms'])
+    details = {
+        'requested_amount': amount,
+        'filled_amount': float(fill['filled_amount'][0]),
+        'fill_ratio': float(fill['filled_amount'][0] / amount) if amount > 0 else 0.0,
+        'fees': float(fill['fees'][0]),
+        'slippage_cost': float(fill['slippage_cost'][0]),
+        'entry_latency_ms': float(fill['entry_latency_ms'][0]),
+        'exit_latency_ms': float(fill['exit_latency_ms'][0]),
+        'return_bps_per_ms': float(latency_cost['return_bps_per_ms'][0]),
+        'pnl_per_ms': float(latency_cost['pnl_per_ms'][0])
+    }
+    return float(fill['net_return'][0]), float(fill['pnl'][0]), details
 
-def apply_your_exit_rules(performance: float, config: BacktestConfig):
+async def get_realistic_paths_from_coingecko(coin_ids, config: BacktestConfig, rng: np.random.Generator):
     """
-    Applique VOS règles de sortie exactes du GUI
+    Chemins journaliers réalistes (trades x max_holding_days, en points de %)
+    basés sur les patterns réels des memecoins - même modèle que votre GUI
     """
-    # Stop Loss
-    if performance <= config.stop_loss:
-        return config.stop_loss
-    
-    # Take Profits (du plus élevé au plus bas - comme dans votre GUI)
-    take_profits = [config.tp5, config.tp4, config.tp3, config.tp2, config.tp1]
-    
-    for tp in take_profits:
-        if performance >= tp:
-            return tp
-    
-    return performance
+    return simulate_daily_returns(rng, len(coin_ids), config.max_holding_days)
 
 def calculate_final_metrics(results: dict, config: BacktestConfig):
     """
@@ -292,16 +349,21 @@ def calculate_final_metrics(results: dict, config: BacktestConfig):
     sharpe_ratio = np.mean(monthly_returns) / volatility if volatility > 0 else 0
     profit_factor = (avg_gain * len(winning_trades)) / (abs(avg_loss) * len(losing_trades)) if losing_trades and avg_loss != 0 else 0
     
+    summary = {
+        'initial_capital': initial_capital,
+        'final_capital': final_capital,
+        'total_return': total_return,
+        'total_pnl': total_pnl,
+        'total_trades': len(trades),
+        'win_rate': win_rate,
+        'moon_shots': len(moon_shots)
+    }
+    execution = execution_summary(trades, initial_capital)
+    if execution is not None:
+        summary['execution'] = execution
+    
     return {
-        'summary': {
-            'initial_capital': initial_capital,
-            'final_capital': final_capital,
-            'total_return': total_return,
-            'total_pnl': total_pnl,
-            'total_trades': len(trades),
-            'win_rate': win_rate,
-            'moon_shots': len(moon_shots)
-        },
+        'summary': summary,
         'metrics': {
             'total_return': total_return,
             'win_rate': win_rate,
@@ -0,0 +1,123 @@
+"""
+🎯 Intervalles de confiance par bootstrap - Vectorisé
+Ré-échantillonne trades et rendements mensuels des milliers de fois en une passe NumPy
+pour mesurer l'incertitude des métriques (un backtest = 100 à 400 trades, très bruité)
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+import numpy as np
+
+from core.path_bank import SharedArrays, SharedArraysDescriptor, attach_arrays
+
+# Au-delà de ce nombre d'éléments tirés (resamples x taille), on répartit sur un pool de process
+PARALLEL_THRESHOLD = 20_000_000
+CHUNK_ELEMENTS = 5_000_000
+
+
+def trade_statistics(returns: np.ndarray) -> Dict[str, np.ndarray]:
+    """Métriques par trade sur des échantillons (B, n) - définitions de calculate_final_metrics"""
+    wins = returns > 0
+    n_trades = returns.shape[1]
+    n_wins = wins.sum(axis=1)
+    n_losses = n_trades - n_wins
+    gains = np.where(wins, returns, 0).sum(axis=1)
+    losses = np.where(wins, 0, returns).sum(axis=1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return {
+            'win_rate': n_wins / n_trades * 100,
+            'avg_gain': np.where(n_wins > 0, gains / np.maximum(n_wins, 1), 0.0),
+            'avg_loss': np.where(n_losses > 0, losses / np.maximum(n_losses, 1), 0.0),
+            'profit_factor': np.where(losses != 0, gains / np.abs(losses), 0.0),
+            'avg_trade_return': returns.mean(axis=1)
+        }
+
+
+def monthly_statistics(monthly_returns: np.ndarray) -> Dict[str, np.ndarray]:
+    """Métriques mensuelles sur des échantillons (B, m), courbe de capital recomposée"""
+    volatility = monthly_returns.std(axis=1)
+    mean_return = monthly_returns.mean(axis=1)
+    growth = np.cumprod(1 + monthly_returns / 100, axis=1)
+    curve = np.concatenate([np.ones((len(growth), 1)), growth], axis=1)
+    peaks = np.maximum.accumulate(curve, axis=1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return {
+            'total_return': (curve[:, -1] - 1) * 100,
+            'volatility': volatility,
+            'sharpe_ratio': np.where(volatility > 0, mean_return / volatility, 0.0),
+            'max_drawdown': ((peaks - curve) / peaks * 100).max(axis=1),
+            'monthly_return_avg': mean_return
+        }
+
+
+def _bootstrap_chunk(trade_returns: np.ndarray, monthly_returns: np.ndarray, n_resamples: int,
+                     seed) -> Dict[str, np.ndarray]:
+    """Un paquet de ré-échantillonnages (exécutable dans un process worker)"""
+    rng = np.random.default_rng(seed)
+    samples = {}
+
+    if len(trade_returns):
+        indices = rng.integers(0, len(trade_returns), size=(n_resamples, len(trade_returns)))
+        samples.update(trade_statistics(trade_returns[indices]))
+    if len(monthly_returns):
+        indices = rng.integers(0, len(monthly_returns), size=(n_resamples, len(monthly_returns)))
+        samples.update(monthly_statistics(monthly_returns[indices]))
+
+    return samples
+
+
+def _bootstrap_shared_chunk(arrays: SharedArraysDescriptor, n_resamples: int, seed) -> Dict[str, np.ndarray]:
+    """_bootstrap_chunk sur des échantillons en mémoire partagée (le worker ne reçoit que le descripteur)"""
+    shared = attach_arrays(arrays)
+    return _bootstrap_chunk(shared['trade_returns'], shared['monthly_returns'], n_resamples, seed)
+
+
+def bootstrap_metrics(trade_returns, monthly_returns, n_resamples: int = 2000, confidence: float = 0.95,
+                      seed: Optional[int] = None, max_workers: Optional[int] = None) -> Dict[str, Dict[str, float]]:
+    """
+    Intervalles de confiance (percentiles) de chaque métrique
+    Retourne {métrique: {estimate, lower, upper, std_error}}
+    """
+    trade_returns = np.asarray(trade_returns, dtype=np.float64)
+    monthly_returns = np.asarray(monthly_returns, dtype=np.float64)
+    sample_size = max(len(trade_returns), len(monthly_returns), 1)
+    seeds = np.random.SeedSequence(seed)
+
+    # Découpage en paquets pour borner la mémoire (et paralléliser les très gros runs)
+    chunk_resamples = max(1, CHUNK_ELEMENTS // sample_size)
+    chunks = [min(chunk_resamples, n_resamples - start) for start in range(0, n_resamples, chunk_resamples)]
+    chunk_seeds = seeds.spawn(len(chunks))
+
+    workers = max_workers or os.cpu_count() or 1
+    if len(chunks) > 1 and workers > 1 and n_resamples * sample_size >= PARALLEL_THRESHOLD:
+        with SharedArrays.from_arrays({'trade_returns': trade_returns, 'monthly_returns': monthly_returns}) as shared, \
+                ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+            results = list(executor.map(_bootstrap_shared_chunk, [shared.descriptor] * len(chunks), chunks, chunk_seeds))
+    else:
+        results = [_bootstrap_chunk(trade_returns, monthly_returns, size, chunk_seed)
+                   for size, chunk_seed in zip(chunks, chunk_seeds)]
+
+    # Estimations ponctuelles sur l'échantillon original
+    point = {}
+    if len(trade_returns):
+        point.update(trade_statistics(trade_returns[None, :]))
+    if len(monthly_returns):
+        point.update(monthly_statistics(monthly_returns[None, :]))
+
+    alpha = (1 - confidence) / 2 * 100
+    intervals = {}
+    for metric, estimate in point.items():
+        distribution = np.concatenate([result[metric] for result in results])
+        lower, upper = np.nanpercentile(distribution, [alpha, 100 - alpha])
+        intervals[metric] = {
+            'estimate': float(estimate[0]),
+            'lower': float(lower),
+            'upper': float(upper),
+            'std_error': float(np.nanstd(distribution))
+        }
+
+    return intervals
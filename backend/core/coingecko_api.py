@@ -10,6 +10,8 @@ from typing import List, Optional, Dict
 from datetime import datetime, timedelta
 import json
 
+from core.synthetic import synthetic_prices
+
 class CoinGeckoAPI:
     """
     Interface CoinGecko ultra-robuste avec fallbacks et cache
@@ -162,11 +164,11 @@ class CoinGeckoAPI:
             
             # Fallback: générer des données réalistes si API fail
             print(f"🎲 Fallback: génération de données simulées pour {coin_id}")
-            return self._generate_fallback_prices(days)
+            return self._generate_fallback_prices(days, coin_id)
             
         except Exception as e:
             print(f"⚠️ Erreur get_price_data pour {coin_id}: {e}")
-            return self._generate_fallback_prices(days)
+            return self._generate_fallback_prices(days, coin_id)
     
     def get_current_price(self, coin_id: str) -> Optional[float]:
         """
@@ -215,28 +217,11 @@ class CoinGeckoAPI:
             print(f"⚠️ Erreur get_trending_coins: {e}")
             return self._get_fallback_trending()
     
-    def _generate_fallback_prices(self, days: int) -> List[float]:
+    def _generate_fallback_prices(self, days: int, coin_id: str = "") -> List[float]:
         """
-        🎲 Génère des prix fallback réalistes
+        🎲 Génère des prix fallback réalistes (générateur vectorisé partagé, nouveau tirage à chaque appel)
         """
-        import numpy as np
-        
-        base_price = random.uniform(0.00001, 0.1)  # Prix typique memecoin
-        prices = []
-        
-        for i in range(days):
-            # Volatilité élevée typique des memecoins
-            daily_change = np.random.normal(0, 0.15)  # 15% volatilité journalière
-            
-            # Events spéciaux occasionnels
-            if random.random() < 0.05:  # 5% chance de pump/dump
-                daily_change += random.choice([-0.4, 0.6])  # -40% ou +60%
-            
-            base_price *= (1 + daily_change)
-            base_price = max(base_price, 0.00001)  # Pas de prix négatif
-            prices.append(base_price)
-        
-        return prices
+        return synthetic_prices(coin_id, days, coin_class='volatile').tolist()
     
     def _generate_fallback_price(self, coin_id: str) -> float:
         """
@@ -312,26 +297,8 @@ class MockCoinGeckoAPI:
     
     def get_price_data(self, coin_id: str, vs_currency: str = "usd", days: int = 30) -> List[float]:
         """Données simulées ultra-réalistes"""
-        import numpy as np
-        
-        base_price = self.memecoin_base_prices.get(coin_id, random.uniform(0.00001, 0.001))
-        prices = []
-        
-        for day in range(days):
-            # Simulation comportement memecoin
-            daily_volatility = np.random.normal(0, 0.12)  # 12% volatilité
-            
-            # Events spéciaux memecoins
-            if random.random() < 0.08:  # Moon shot
-                daily_volatility += random.uniform(0.5, 2.0)
-            elif random.random() < 0.12:  # Dump
-                daily_volatility -= random.uniform(0.3, 0.8)
-            
-            base_price *= (1 + daily_volatility)
-            base_price = max(base_price, 0.00001)
-            prices.append(base_price)
-        
-        return prices
+        return synthetic_prices(coin_id, days, coin_class='mock',
+                                base_price=self.memecoin_base_prices.get(coin_id)).tolist()
     
     def get_current_price(self, coin_id: str) -> float:
         """Prix simulé"""
@@ -0,0 +1,177 @@
+"""
+⚙️ Simulateur d'exécution - Paper trading réaliste
+Latence décision → fill, slippage dépendant de la taille, spread, frais en %, fills partiels
+Utilisé par le backtester (config.execution) et par le sniper live en paper trading
+Mesure aussi combien de rendement coûte chaque milliseconde de latence
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+
+from models.schemas import ExecutionConfig
+
+BUY = "BUY"
+SELL = "SELL"
+
+# Écart de latence utilisé pour la dérivée numérique du coût de la latence
+LATENCY_DELTA_MS = 10.0
+
+
+@dataclass
+class Fill:
+    """Résultat d'un ordre simulé"""
+    side: str
+    requested_amount: float
+    filled_amount: float
+    reference_price: float
+    price: float
+    latency_ms: float
+    slippage_bps: float
+    fees: float
+
+    @property
+    def fill_ratio(self) -> float:
+        return self.filled_amount / self.requested_amount if self.requested_amount > 0 else 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            'side': self.side,
+            'requested_amount': self.requested_amount,
+            'filled_amount': self.filled_amount,
+            'fill_ratio': self.fill_ratio,
+            'reference_price': self.reference_price,
+            'price': self.price,
+            'latency_ms': self.latency_ms,
+            'slippage_bps': self.slippage_bps,
+            'fees': self.fees
+        }
+
+
+class ExecutionSimulator:
+    """
+    Modèle d'exécution vectorisé
+    - latence: latency_ms + jitter exponentiel, le prix dérive pendant ce temps (momentum du pump)
+    - coût: demi-spread + impact = impact_bps x (taille / liquidité) ^ impact_exponent
+    - fills partiels: un ordre ne prend pas plus de max_participation x liquidité
+    """
+
+    def __init__(self, config: ExecutionConfig, rng: Optional[np.random.Generator] = None):
+        self.config = config
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+    def sample_latency(self, size: Optional[int] = None):
+        """Latence décision → fill (ms)"""
+        jitter = self.rng.exponential(self.config.latency_jitter_ms, size) if self.config.latency_jitter_ms > 0 else 0.0
+        return self.config.latency_ms + jitter
+
+    def filled_amount(self, amount_usd):
+        """Montant exécuté (le reste de l'ordre n'est pas servi)"""
+        return np.minimum(amount_usd, self.config.max_participation * self.config.liquidity_usd)
+
+    def cost_bps(self, amount_usd):
+        """Demi-spread + impact de marché en bps pour un ordre de cette taille"""
+        config = self.config
+        impact = config.impact_bps * (np.asarray(amount_usd, dtype=np.float64) / config.liquidity_usd) ** config.impact_exponent
+        return config.spread_bps / 2 + impact
+
+    def price_factor(self, side: str, amount_usd, latency_ms, momentum_pct_per_second):
+        """Prix de fill / prix de décision"""
+        drift = 1 + np.asarray(momentum_pct_per_second) * np.asarray(latency_ms) / 1000 / 100
+        cost = self.cost_bps(amount_usd) / 1e4
+        return drift * (1 + cost) if side == BUY else drift * (1 - cost)
+
+    def fill(self, side: str, price: float, amount_usd: float, momentum_pct_per_second: Optional[float] = None,
+             latency_ms: Optional[float] = None) -> Fill:
+        """Un ordre (paper trading live)"""
+        config = self.config
+        if momentum_pct_per_second is None:
+            momentum_pct_per_second = (config.entry_momentum_pct_per_second if side == BUY
+                                       else config.exit_momentum_pct_per_second)
+        latency_ms = float(self.sample_latency()) if latency_ms is None else latency_ms
+        filled = float(self.filled_amount(amount_usd)) if side == BUY else amount_usd
+        fill_price = price * float(self.price_factor(side, filled, latency_ms, momentum_pct_per_second))
+        fees = filled * config.fee_percent / 100 + config.fixed_fee
+
+        return Fill(
+            side=side,
+            requested_amount=amount_usd,
+            filled_amount=filled,
+            reference_price=price,
+            price=fill_price,
+            latency_ms=latency_ms,
+            slippage_bps=abs(fill_price / price - 1) * 1e4,
+            fees=fees
+        )
+
+    def round_trip(self, amounts, gross_returns, entry_latency_ms=None, exit_latency_ms=None) -> Dict[str, np.ndarray]:
+        """
+        Aller-retour vectorisé pour des trades dont la sortie est déjà connue (backtest)
+        amounts: montants demandés ($), gross_returns: rendements des règles de sortie (%)
+        Les sorties sont exécutées en entier (ordre au marché), les entrées peuvent être partielles
+        """
+        config = self.config
+        amounts = np.asarray(amounts, dtype=np.float64)
+        gross_returns = np.asarray(gross_returns, dtype=np.float64)
+        if entry_latency_ms is None:
+            entry_latency_ms = self.sample_latency(amounts.shape)
+        if exit_latency_ms is None:
+            exit_latency_ms = self.sample_latency(amounts.shape)
+
+        filled = self.filled_amount(amounts)
+        exit_value = filled * (1 + gross_returns / 100)
+        entry = self.price_factor(BUY, filled, entry_latency_ms, config.entry_momentum_pct_per_second)
+        exit_ = self.price_factor(SELL, np.maximum(exit_value, 0), exit_latency_ms, config.exit_momentum_pct_per_second)
+        net_returns = ((1 + gross_returns / 100) * exit_ / entry - 1) * 100
+
+        proceeds = np.maximum(filled * (1 + net_returns / 100), 0)
+        fees = (filled + proceeds) * config.fee_percent / 100 + 2 * config.fixed_fee
+        pnl = proceeds - filled - fees
+
+        return {
+            'filled_amount': filled,
+            'net_return': net_returns,
+            'pnl': pnl,
+            'fees': fees,
+            'slippage_cost': filled * (1 + gross_returns / 100) - proceeds,
+            'entry_latency_ms': np.broadcast_to(entry_latency_ms, amounts.shape),
+            'exit_latency_ms': np.broadcast_to(exit_latency_ms, amounts.shape)
+        }
+
+    def latency_cost(self, amounts, gross_returns, entry_latency_ms, exit_latency_ms,
+                     delta_ms: float = LATENCY_DELTA_MS) -> Dict[str, np.ndarray]:
+        """
+        Coût marginal d'une milliseconde de latence supplémentaire (entrée ET sortie)
+        Mêmes tirages de latence (nombres aléatoires communs): seule la latence change
+        """
+        base = self.round_trip(amounts, gross_returns, entry_latency_ms, exit_latency_ms)
+        slower = self.round_trip(amounts, gross_returns, np.asarray(entry_latency_ms) + delta_ms,
+                                 np.asarray(exit_latency_ms) + delta_ms)
+        return {
+            'return_bps_per_ms': (base['net_return'] - slower['net_return']) * 100 / delta_ms,
+            'pnl_per_ms': (base['pnl'] - slower['pnl']) / delta_ms
+        }
+
+
+def execution_summary(trades, initial_capital: float) -> Optional[Dict[str, float]]:
+    """Agrégats d'exécution d'un backtest (trades enrichis par le simulateur)"""
+    executed = [trade['execution'] for trade in trades if 'execution' in trade]
+    if not executed:
+        return None
+
+    def total(key):
+        return float(sum(execution[key] for execution in executed))
+
+    pnl_per_ms = total('pnl_per_ms')
+    return {
+        'trades': len(executed),
+        'total_fees': total('fees'),
+        'total_slippage_cost': total('slippage_cost'),
+        'avg_fill_ratio': float(np.mean([execution['fill_ratio'] for execution in executed])),
+        'avg_latency_ms': float(np.mean([execution['entry_latency_ms'] for execution in executed])),
+        # Le chiffre qui justifie (ou pas) d'accélérer le pipeline
+        'avg_trade_return_bps_per_ms': float(np.mean([execution['return_bps_per_ms'] for execution in executed])),
+        'pnl_per_ms': pnl_per_ms,
+        'total_return_pct_per_ms': pnl_per_ms / initial_capital * 100
+    }
@@ -0,0 +1,270 @@
+"""
+🎰 Recherche adaptative des règles de sortie - Successive halving / Hyperband
+Propositions quasi-aléatoires (suite de Halton décalée) dans l'espace des paramètres, scorées
+d'abord sur quelques mois simulés; seul le meilleur tiers (1/eta) est promu sur un horizon eta fois
+plus long. Chaque rung tourne dans un pool de process sur la banque de trades partagée.
+Le classement intermédiaire et le front de Pareto des rungs à horizon complet sont publiés
+dans live_metrics (suivi en streaming)
+"""
+
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.analysis_runner import register_analysis
+from core.job_scheduler import CancelToken, JobCancelled, is_cancel_requested
+from core.pareto import ParetoArchive
+from core.path_bank import SharedArraysDescriptor, acquire_path_bank, attach_trade_batch
+from core.simulation import PARAM_NAMES, TradeBatch, params_from_config, score_params
+from core.walk_forward import OBJECTIVES
+from models.schemas import HyperbandRequest
+
+# Paramètres explorables: colonnes de PARAM_NAMES + durée de détention (entière)
+SEARCH_PARAMS = PARAM_NAMES + ("max_holding_days",)
+TP_COLUMNS = slice(1, 6)
+HOLDING_COLUMN = len(PARAM_NAMES)
+
+HALTON_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+
+LEADERBOARD_METRICS = ('total_return', 'sharpe_ratio', 'max_drawdown', 'volatility', 'win_rate', 'profit_factor')
+
+
+def halton(start: int, count: int, dimensions: int, shift: np.ndarray) -> np.ndarray:
+    """
+    Points start..start+count-1 de la suite de Halton dans [0, 1)^d, décalés modulo 1 (rotation
+    de Cranley-Patterson: une seed = une suite différente, même faible discrépance)
+    """
+    points = np.empty((count, dimensions))
+    for dim in range(dimensions):
+        base = HALTON_PRIMES[dim]
+        index = np.arange(start + 1, start + count + 1)
+        value = np.zeros(count)
+        fraction = 1.0 / base
+        while index.any():
+            index, digit = np.divmod(index, base)
+            value += digit * fraction
+            fraction /= base
+        points[:, dim] = value
+    return (points + shift) % 1.0
+
+
+def propose_configs(unit_points: np.ndarray, base: np.ndarray, space: Dict[str, Tuple[float, float]]) -> np.ndarray:
+    """
+    Points du cube unité -> configs (n, len(SEARCH_PARAMS))
+    Paramètres hors de l'espace: valeur de la config; TP triés (échelle croissante), durée entière
+    """
+    configs = np.tile(base, (len(unit_points), 1))
+    for dim, (name, (low, high)) in enumerate(space.items()):
+        configs[:, SEARCH_PARAMS.index(name)] = low + unit_points[:, dim] * (high - low)
+    configs[:, TP_COLUMNS] = np.sort(configs[:, TP_COLUMNS], axis=1)
+    configs[:, HOLDING_COLUMN] = np.round(configs[:, HOLDING_COLUMN])
+    return configs
+
+
+def build_brackets(n_configs: int, min_months: int, max_months: int, eta: int,
+                   brackets: Optional[int] = None) -> List[List[Tuple[int, int]]]:
+    """
+    Rungs (configs, mois) de chaque bracket Hyperband, du plus exploratoire au plus prudent
+    Le bracket s part de n_configs x (s_max+1)/(s+1) / eta^(s_max-s) configs sur max_months / eta^s mois
+    """
+    s_max = int(math.floor(math.log(max(max_months / min_months, 1), eta) + 1e-9))
+    n_brackets = s_max + 1 if brackets is None else max(1, min(brackets, s_max + 1))
+    plan = []
+    for s in range(s_max, s_max - n_brackets, -1):
+        n = max(1, math.ceil(n_configs * (s_max + 1) / (s + 1) / eta ** (s_max - s)))
+        rungs = []
+        for i in range(s + 1):
+            configs = max(1, n // eta ** i)
+            months = min(max_months, max(min_months, int(round(max_months / eta ** (s - i)))))
+            rungs.append((configs, months))
+        plan.append(rungs)
+    return plan
+
+
+def score_configs(batch: TradeBatch, configs: np.ndarray, n_months: int, initial_capital: float,
+                  cancel_flag: Optional[str] = None) -> Dict[str, np.ndarray]:
+    """Métriques (n,) des configs sur les n_months premiers mois, groupées par durée de détention"""
+    if is_cancel_requested(cancel_flag):
+        raise JobCancelled()
+    horizon = batch.slice_months(0, n_months)
+    results = {metric: np.empty(len(configs)) for metric in LEADERBOARD_METRICS}
+    for days in np.unique(configs[:, HOLDING_COLUMN]).astype(int):
+        rows = np.flatnonzero(configs[:, HOLDING_COLUMN] == days)
+        truncated = TradeBatch(daily_returns=horizon.daily_returns[:, :days], month_index=horizon.month_index,
+                               coin_index=horizon.coin_index, n_months=horizon.n_months)
+        scores = score_params(truncated, configs[rows, :HOLDING_COLUMN], initial_capital)
+        for metric in LEADERBOARD_METRICS:
+            results[metric][rows] = scores[metric]
+    return results
+
+
+def score_configs_on_bank(bank: SharedArraysDescriptor, configs: np.ndarray, n_months: int, initial_capital: float,
+                          cancel_flag: Optional[str] = None) -> Dict[str, np.ndarray]:
+    """score_configs sur la banque partagée (exécuté en worker)"""
+    return score_configs(attach_trade_batch(bank), configs, n_months, initial_capital, cancel_flag)
+
+
+def config_to_dict(row: np.ndarray) -> Dict[str, float]:
+    values = {name: float(value) for name, value in zip(SEARCH_PARAMS, row)}
+    values['max_holding_days'] = int(values['max_holding_days'])
+    return values
+
+
+class Leaderboard:
+    """Meilleure évaluation de chaque config: les horizons longs priment (moins de bruit), puis l'objectif"""
+
+    def __init__(self, objective: str, size: int):
+        self.objective = objective
+        self.sign = OBJECTIVES[objective]
+        self.size = size
+        self.entries: Dict[int, Dict] = {}
+
+    def update(self, config_ids: np.ndarray, configs: np.ndarray, n_months: int, metrics: Dict[str, np.ndarray]):
+        for position, config_id in enumerate(config_ids):
+            previous = self.entries.get(int(config_id))
+            if previous is not None and previous['months'] > n_months:
+                continue
+            self.entries[int(config_id)] = {
+                'config_id': int(config_id),
+                'months': n_months,
+                'params': config_to_dict(configs[position]),
+                'metrics': {metric: float(np.nan_to_num(values[position], nan=0.0, posinf=0.0, neginf=0.0))
+                            for metric, values in metrics.items()}
+            }
+
+    def entries_for(self, config_ids: np.ndarray) -> List[Dict]:
+        return [self.entries[int(config_id)] for config_id in config_ids]
+
+    def top(self, count: Optional[int] = None) -> List[Dict]:
+        ranked = sorted(self.entries.values(),
+                        key=lambda entry: (-entry['months'], -self.sign * entry['metrics'][self.objective]))
+        return ranked[:count or self.size]
+
+
+@register_analysis("hyperband", HyperbandRequest)
+def run_hyperband(request: HyperbandRequest, progress: Optional[Callable[..., None]] = None,
+                  cancel_token: Optional[CancelToken] = None) -> Dict:
+    """
+    Hyperband sur les règles de sortie
+    - tous les brackets partagent la même banque de trades (max_months mois, durée max de l'espace)
+    - chaque rung est découpé entre les workers du pool; seul le meilleur 1/eta passe au rung suivant
+    """
+    config = request.config
+    progress = progress or (lambda percent, message, live_metrics=None: None)
+
+    if request.objective not in OBJECTIVES:
+        raise ValueError(f"Objectif inconnu: {request.objective} (valeurs: {', '.join(OBJECTIVES)})")
+    unknown = [name for name in request.search_space if name not in SEARCH_PARAMS]
+    if unknown or not request.search_space:
+        raise ValueError(f"Paramètres inconnus: {', '.join(unknown) or 'aucun'} (valeurs: {', '.join(SEARCH_PARAMS)})")
+    if len(request.search_space) > len(HALTON_PRIMES):
+        raise ValueError(f"Au plus {len(HALTON_PRIMES)} paramètres explorés")
+    if any(len(bounds) != 2 for bounds in request.search_space.values()):
+        raise ValueError("search_space: [min, max] pour chaque paramètre")
+    space = {name: (float(min(bounds)), float(max(bounds))) for name, bounds in request.search_space.items()}
+    if request.eta < 2 or request.n_configs < 1 or request.min_months < 1:
+        raise ValueError("eta >= 2, n_configs >= 1 et min_months >= 1")
+    if 'max_holding_days' in space and space['max_holding_days'][0] < 1:
+        raise ValueError("max_holding_days doit être d'au moins 1")
+    pareto = ParetoArchive(request.pareto_objectives)
+
+    start_date = datetime(config.start_year, config.start_month, 1)
+    end_date = datetime(config.end_year, config.end_month, 1)
+    period_months = (end_date.year - start_date.year) * 12 + (end_date.month - start_date.month) + 1
+    max_months = request.max_months or period_months
+    min_months = min(request.min_months, max_months)
+
+    seed = request.seed if request.seed is not None else random.randrange(2 ** 32)
+    rng = np.random.default_rng(seed)
+    shift = rng.random(len(space))
+    base = np.append(params_from_config(config)[0], config.max_holding_days)
+    max_days = int(round(space.get('max_holding_days', (0, config.max_holding_days))[1]))
+
+    plan = build_brackets(request.n_configs, min_months, max_months, request.eta, request.brackets)
+    total_rungs = sum(len(rungs) for rungs in plan)
+    proposals = sum(rungs[0][0] for rungs in plan)
+    leaderboard = Leaderboard(request.objective, request.leaderboard_size)
+    budget_used = 0
+    done_rungs = 0
+    next_index = 0
+
+    cancel_flag = cancel_token.shared_flag_name() if cancel_token is not None else None
+    max_workers = request.max_workers or os.cpu_count() or 1
+    progress(2.0, f"🎰 {len(plan)} brackets, {proposals} configs proposées, horizon {min_months}-{max_months} mois")
+
+    with acquire_path_bank(seed, max_months, max_days) as bank, \
+            ProcessPoolExecutor(max_workers=max_workers) as executor:
+        if cancel_token is not None:
+            cancel_token.add_callback(lambda: executor.shutdown(wait=False, cancel_futures=True))
+
+        for bracket, rungs in enumerate(plan):
+            n_start = rungs[0][0]
+            configs = propose_configs(halton(next_index, n_start, len(space), shift), base, space)
+            config_ids = np.arange(next_index, next_index + n_start)
+            next_index += n_start
+
+            for rung, (_, n_months) in enumerate(rungs):
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+
+                chunks = [chunk for chunk in np.array_split(np.arange(len(configs)), max_workers) if len(chunk)]
+                futures = [executor.submit(score_configs_on_bank, bank.descriptor, configs[chunk], n_months,
+                                           config.initial_capital, cancel_flag)
+                           for chunk in chunks]
+                metrics = {metric: np.empty(len(configs)) for metric in LEADERBOARD_METRICS}
+                for chunk, future in zip(chunks, futures):
+                    for metric, values in future.result().items():
+                        metrics[metric][chunk] = values
+
+                budget_used += len(configs) * n_months
+                leaderboard.update(config_ids, configs, n_months, metrics)
+                if n_months == max_months:
+                    # Front sur l'horizon complet uniquement: des rendements sur 3 et 24 mois ne se comparent pas
+                    pareto.add(np.column_stack([metrics[objective] for objective in pareto.objectives]),
+                               leaderboard.entries_for(config_ids))
+                done_rungs += 1
+                progress(
+                    5.0 + 90.0 * done_rungs / total_rungs,
+                    f"🎰 Bracket {bracket + 1}/{len(plan)}, rung {rung + 1}/{len(rungs)}: "
+                    f"{len(configs)} configs sur {n_months} mois",
+                    {
+                        'bracket': bracket + 1,
+                        'rung': rung + 1,
+                        'configs': len(configs),
+                        'months': n_months,
+                        'budget_used_config_months': budget_used,
+                        'leaderboard': leaderboard.top(),
+                        'pareto_front': pareto.to_dict()
+                    }
+                )
+
+                # Promotion: le meilleur 1/eta (taille du rung suivant)
+                if rung + 1 < len(rungs):
+                    keep = rungs[rung + 1][0]
+                    objective_values = OBJECTIVES[request.objective] * np.nan_to_num(metrics[request.objective], nan=-np.inf)
+                    best = np.argsort(-objective_values, kind='stable')[:keep]
+                    configs, config_ids = configs[best], config_ids[best]
+
+    full_budget = proposals * max_months
+    best_entry = leaderboard.top(1)[0]
+    best_config = config.copy(update=best_entry['params'])
+    return {
+        'type': 'hyperband',
+        'config': config.dict(),
+        'seed': seed,
+        'objective': request.objective,
+        'search_space': {name: list(bounds) for name, bounds in space.items()},
+        'brackets': [[{'configs': n, 'months': months} for n, months in rungs] for rungs in plan],
+        'configs_proposed': proposals,
+        'budget_used_config_months': budget_used,
+        'full_budget_config_months': full_budget,
+        'budget_fraction': budget_used / full_budget if full_budget else 0.0,
+        'leaderboard': leaderboard.top(),
+        'pareto_front': pareto.to_dict(),
+        'best_config': best_config.dict()
+    }
@@ -0,0 +1,356 @@
+"""
+📈 Indicateurs incrémentaux - O(1) par tick
+Rendement glissant, z-score de volume, EMA, max/min glissants (deques monotones) et VWAP,
+mis à jour tick par tick sans jamais recalculer la fenêtre complète
+Variante vectorisée: des centaines de symboles mis à jour d'un coup à partir d'un batch de ticks
+"""
+
+import math
+from collections import deque
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# ============================================================================
+# INDICATEURS PAR SYMBOLE (fenêtres en secondes, exactes)
+# ============================================================================
+
+class RollingReturn:
+    """Rendement (%) entre le premier prix de la fenêtre et le dernier"""
+
+    def __init__(self, window_seconds: float):
+        self.window = window_seconds
+        self._prices: Deque[Tuple[float, float]] = deque()
+        self.value = 0.0
+
+    def update(self, price: float, timestamp: float) -> float:
+        prices = self._prices
+        prices.append((timestamp, price))
+        while timestamp - prices[0][0] > self.window:
+            prices.popleft()
+        self.value = (price / prices[0][1] - 1) * 100
+        return self.value
+
+    def reset(self):
+        self._prices.clear()
+        self.value = 0.0
+
+
+class RollingZScore:
+    """Z-score de la dernière valeur dans la fenêtre (sommes glissantes, pas de recalcul)"""
+
+    def __init__(self, window_seconds: float):
+        self.window = window_seconds
+        self._values: Deque[Tuple[float, float]] = deque()
+        self._sum = 0.0
+        self._sum_sq = 0.0
+        self.value = 0.0
+
+    def update(self, x: float, timestamp: float) -> float:
+        values = self._values
+        values.append((timestamp, x))
+        self._sum += x
+        self._sum_sq += x * x
+        while timestamp - values[0][0] > self.window:
+            _, old = values.popleft()
+            self._sum -= old
+            self._sum_sq -= old * old
+
+        n = len(values)
+        mean = self._sum / n
+        variance = max(self._sum_sq / n - mean * mean, 0.0)
+        self.value = (x - mean) / math.sqrt(variance) if variance > 0 else 0.0
+        return self.value
+
+
+class EMA:
+    """
+    Moyenne mobile exponentielle
+    alpha fixe par tick, ou halflife_seconds pour des ticks irréguliers (alpha dépend de l'écart de temps)
+    """
+
+    def __init__(self, alpha: Optional[float] = None, halflife_seconds: Optional[float] = None):
+        if (alpha is None) == (halflife_seconds is None):
+            raise ValueError("EMA: fournir alpha OU halflife_seconds")
+        self.alpha = alpha
+        self.halflife = halflife_seconds
+        self.value: Optional[float] = None
+        self._last_timestamp: Optional[float] = None
+
+    @classmethod
+    def from_span(cls, span: int) -> "EMA":
+        return cls(alpha=2 / (span + 1))
+
+    def update(self, x: float, timestamp: Optional[float] = None) -> float:
+        if self.value is None:
+            self.value = x
+        else:
+            alpha = self.alpha
+            if alpha is None:
+                elapsed = max(timestamp - self._last_timestamp, 0.0)
+                alpha = 1 - 0.5 ** (elapsed / self.halflife)
+            self.value += alpha * (x - self.value)
+        self._last_timestamp = timestamp
+        return self.value
+
+
+class RollingExtremum:
+    """Max (ou min) glissant par deque monotone: chaque valeur entre et sort au plus une fois"""
+
+    def __init__(self, window_seconds: float, mode: str = "max"):
+        if mode not in ("max", "min"):
+            raise ValueError(f"Mode inconnu: {mode}")
+        self.window = window_seconds
+        self._sign = 1.0 if mode == "max" else -1.0
+        self._deque: Deque[Tuple[float, float]] = deque()
+        self.value: Optional[float] = None
+
+    def update(self, x: float, timestamp: float) -> float:
+        signed = self._sign * x
+        candidates = self._deque
+        while candidates and candidates[-1][1] <= signed:
+            candidates.pop()
+        candidates.append((timestamp, signed))
+        while timestamp - candidates[0][0] > self.window:
+            candidates.popleft()
+        self.value = self._sign * candidates[0][1]
+        return self.value
+
+
+class RollingMax(RollingExtremum):
+    def __init__(self, window_seconds: float):
+        super().__init__(window_seconds, "max")
+
+
+class RollingMin(RollingExtremum):
+    def __init__(self, window_seconds: float):
+        super().__init__(window_seconds, "min")
+
+
+class VWAP:
+    """Prix moyen pondéré par le volume sur la fenêtre (ou depuis le début si window_seconds=None)"""
+
+    def __init__(self, window_seconds: Optional[float] = None):
+        self.window = window_seconds
+        self._trades: Deque[Tuple[float, float, float]] = deque()
+        self._pv = 0.0
+        self._volume = 0.0
+        self.value: Optional[float] = None
+
+    def update(self, price: float, volume: float, timestamp: float) -> Optional[float]:
+        pv = price * volume
+        self._pv += pv
+        self._volume += volume
+        if self.window is not None:
+            trades = self._trades
+            trades.append((timestamp, pv, volume))
+            while timestamp - trades[0][0] > self.window:
+                _, old_pv, old_volume = trades.popleft()
+                self._pv -= old_pv
+                self._volume -= old_volume
+
+        self.value = self._pv / self._volume if self._volume > 0 else price
+        return self.value
+
+
+class SymbolIndicators:
+    """Tous les indicateurs de détection d'un symbole, mis à jour ensemble"""
+
+    def __init__(self, window_seconds: float = 3600, ema_halflife_seconds: float = 300):
+        self.rolling_return = RollingReturn(window_seconds)
+        self.volume_zscore = RollingZScore(window_seconds)
+        self.ema = EMA(halflife_seconds=ema_halflife_seconds)
+        self.rolling_max = RollingMax(window_seconds)
+        self.rolling_min = RollingMin(window_seconds)
+        self.vwap = VWAP(window_seconds)
+        self.price: Optional[float] = None
+
+    def update(self, price: float, volume: float, timestamp: float):
+        self.price = price
+        self.rolling_return.update(price, timestamp)
+        self.volume_zscore.update(volume, timestamp)
+        self.ema.update(price, timestamp)
+        self.rolling_max.update(price, timestamp)
+        self.rolling_min.update(price, timestamp)
+        self.vwap.update(price, volume, timestamp)
+
+    def snapshot(self) -> Dict[str, Optional[float]]:
+        return {
+            'price': self.price,
+            'rolling_return': self.rolling_return.value,
+            'volume_zscore': self.volume_zscore.value,
+            'ema': self.ema.value,
+            'rolling_max': self.rolling_max.value,
+            'rolling_min': self.rolling_min.value,
+            'vwap': self.vwap.value
+        }
+
+
+# ============================================================================
+# VARIANTE VECTORISÉE (S symboles, fenêtre découpée en buckets)
+# ============================================================================
+
+class VectorizedIndicators:
+    """
+    Mêmes indicateurs pour S symboles, mis à jour par batch de ticks
+    La fenêtre est découpée en buckets de bucket_seconds (précision de la fenêtre = 1 bucket):
+    - par tick: O(1) (scatter NumPy dans le bucket courant)
+    - à chaque changement de bucket: agrégats des buckets clos recalculés une fois (O(S x buckets)),
+      indépendamment du nombre de ticks
+    Le z-score de volume compare le volume du bucket courant aux buckets clos de la fenêtre
+    """
+
+    def __init__(self, symbols: Sequence[str], window_seconds: float = 3600, bucket_seconds: float = 60,
+                 ema_alpha: float = 0.1):
+        self.symbols = list(symbols)
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.bucket_seconds = bucket_seconds
+        self.n_buckets = max(2, int(math.ceil(window_seconds / bucket_seconds)))
+        self.ema_alpha = ema_alpha
+
+        shape = (len(self.symbols), self.n_buckets)
+        self._first_price = np.full(shape, np.nan)
+        self._max = np.full(shape, -np.inf)
+        self._min = np.full(shape, np.inf)
+        self._volume = np.zeros(shape)
+        self._pv = np.zeros(shape)
+        self._bucket: Optional[int] = None
+
+        n = len(self.symbols)
+        self.price = np.full(n, np.nan)
+        self.ema = np.full(n, np.nan)
+        self._volume_total = np.zeros(n)
+        self._pv_total = np.zeros(n)
+        self._refresh_closed()
+
+    @property
+    def _slot(self) -> int:
+        return self._bucket % self.n_buckets
+
+    def symbol_indices(self, symbols: Sequence[str]) -> np.ndarray:
+        return np.fromiter((self.index[symbol] for symbol in symbols), dtype=np.int64, count=len(symbols))
+
+    def update_batch(self, symbol_index: np.ndarray, prices: np.ndarray, volumes: np.ndarray,
+                     timestamps: np.ndarray):
+        """Applique un batch de ticks trié par timestamp (symbol_index: indices dans self.symbols)"""
+        symbol_index = np.asarray(symbol_index, dtype=np.int64)
+        prices = np.asarray(prices, dtype=np.float64)
+        volumes = np.asarray(volumes, dtype=np.float64)
+        buckets = (np.asarray(timestamps, dtype=np.float64) // self.bucket_seconds).astype(np.int64)
+        if not len(buckets):
+            return
+
+        # Un segment par bucket traversé (en pratique 1, rarement 2)
+        boundaries = np.flatnonzero(np.diff(buckets)) + 1
+        for lo, hi in zip(np.r_[0, boundaries], np.r_[boundaries, len(buckets)]):
+            self._advance(int(buckets[lo]))
+            self._apply(symbol_index[lo:hi], prices[lo:hi], volumes[lo:hi])
+
+    def _advance(self, bucket: int):
+        if self._bucket is None:
+            self._bucket = bucket
+            return
+        steps = bucket - self._bucket
+        if steps <= 0:
+            return
+
+        # Buckets sortis de la fenêtre: vidés et retirés des totaux glissants
+        for offset in range(1, min(steps, self.n_buckets) + 1):
+            slot = (self._bucket + offset) % self.n_buckets
+            self._volume_total -= self._volume[:, slot]
+            self._pv_total -= self._pv[:, slot]
+            self._first_price[:, slot] = np.nan
+            self._max[:, slot] = -np.inf
+            self._min[:, slot] = np.inf
+            self._volume[:, slot] = 0.0
+            self._pv[:, slot] = 0.0
+
+        self._bucket = bucket
+        self._refresh_closed()
+
+    def _refresh_closed(self):
+        """Agrégats des buckets clos (tout sauf le courant) - recalculés une fois par bucket"""
+        n_buckets = self.n_buckets
+        current = self._slot if self._bucket is not None else 0
+        # Buckets clos du plus ancien au plus récent
+        order = [(current + offset) % n_buckets for offset in range(1, n_buckets)]
+
+        self._closed_max = self._max[:, order].max(axis=1)
+        self._closed_min = self._min[:, order].min(axis=1)
+        closed_volume = self._volume[:, order]
+        self._closed_volume_mean = closed_volume.mean(axis=1)
+        self._closed_volume_std = closed_volume.std(axis=1)
+
+        first = self._first_price[:, order]
+        has_price = ~np.isnan(first)
+        oldest = np.argmax(has_price, axis=1)
+        self._start_price = np.where(has_price.any(axis=1), first[np.arange(len(first)), oldest], np.nan)
+
+    def _apply(self, symbol_index: np.ndarray, prices: np.ndarray, volumes: np.ndarray):
+        slot = self._slot
+
+        # Premier prix du bucket: premier tick de chaque symbole dans le segment
+        unique, first_index = np.unique(symbol_index, return_index=True)
+        empty = np.isnan(self._first_price[unique, slot])
+        self._first_price[unique[empty], slot] = prices[first_index[empty]]
+
+        np.maximum.at(self._max[:, slot], symbol_index, prices)
+        np.minimum.at(self._min[:, slot], symbol_index, prices)
+        np.add.at(self._volume[:, slot], symbol_index, volumes)
+        np.add.at(self._pv[:, slot], symbol_index, prices * volumes)
+        np.add.at(self._volume_total, symbol_index, volumes)
+        np.add.at(self._pv_total, symbol_index, prices * volumes)
+
+        # Dernier prix: le dernier tick de chaque symbole l'emporte
+        last_index = len(symbol_index) - 1 - np.unique(symbol_index[::-1], return_index=True)[1]
+        self.price[unique] = prices[last_index]
+
+        self._update_ema(symbol_index, prices, unique)
+
+    def _update_ema(self, symbol_index: np.ndarray, prices: np.ndarray, unique: np.ndarray):
+        """EMA séquentielle en forme fermée: k ticks d'un symbole = e(1-a)^k + somme a(1-a)^(k-1-r) p_r"""
+        alpha = self.ema_alpha
+        order = np.argsort(symbol_index, kind='stable')
+        sorted_symbols = symbol_index[order]
+        counts = np.bincount(sorted_symbols, minlength=len(self.symbols))
+        group_start = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        rank = np.arange(len(order)) - group_start[sorted_symbols]
+        k = counts[sorted_symbols]
+
+        # Symboles sans historique: l'EMA démarre à leur premier prix
+        new = np.isnan(self.ema[unique])
+        self.ema[unique[new]] = prices[order][group_start[unique[new]]]
+
+        weights = alpha * (1 - alpha) ** (k - 1 - rank)
+        contribution = np.bincount(sorted_symbols, weights=weights * prices[order], minlength=len(self.symbols))
+        decay = (1 - alpha) ** counts
+        self.ema[unique] = self.ema[unique] * decay[unique] + contribution[unique]
+
+    def snapshot(self) -> Dict[str, np.ndarray]:
+        """Indicateurs courants (S,) de tous les symboles"""
+        slot = self._slot if self._bucket is not None else 0
+        start_price = np.where(np.isnan(self._start_price), self._first_price[:, slot], self._start_price)
+        current_volume = self._volume[:, slot]
+        std = self._closed_volume_std
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return {
+                'price': self.price.copy(),
+                'rolling_return': (self.price / start_price - 1) * 100,
+                'volume_zscore': np.where(std > 0, (current_volume - self._closed_volume_mean) / std, 0.0),
+                'ema': self.ema.copy(),
+                'rolling_max': np.maximum(self._closed_max, self._max[:, slot]),
+                'rolling_min': np.minimum(self._closed_min, self._min[:, slot]),
+                'vwap': np.where(self._volume_total > 0, self._pv_total / self._volume_total, self.price)
+            }
+
+    def top(self, metric: str = 'rolling_return', n: int = 10) -> List[Dict]:
+        """Les n symboles les plus forts sur un indicateur"""
+        values = self.snapshot()
+        ranking = np.nan_to_num(values[metric], nan=-np.inf)
+        best = np.argsort(-ranking)[:n]
+        return [
+            {'symbol': self.symbols[i], **{name: float(array[i]) for name, array in values.items()}}
+            for i in best if np.isfinite(ranking[i])
+        ]
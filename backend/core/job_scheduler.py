@@ -0,0 +1,362 @@
+"""
+🚦 Ordonnanceur de jobs - File bornée, priorités et annulation réelle
+Protège le serveur contre les rafales de backtests (sweeps) qui affament les utilisateurs interactifs
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from typing import Awaitable, Callable, Dict, List, Optional
+
+# Priorités disponibles (de la plus urgente à la moins urgente)
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BATCH = "batch"
+PRIORITIES = (PRIORITY_INTERACTIVE, PRIORITY_BATCH)
+
+# États d'un job
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+JOB_TIMEOUT = "timeout"
+FINAL_STATES = (JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED, JOB_TIMEOUT)
+
+
+class JobRejected(Exception):
+    """Job refusé par le contrôle d'admission (file pleine ou quota client)"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class JobCancelled(Exception):
+    """Levée par le code coopératif quand son job a été annulé"""
+
+
+# ============================================================================
+# JETON D'ANNULATION - PARTAGÉ AVEC LES PROCESS WORKERS
+# ============================================================================
+
+class CancelToken:
+    """
+    🛑 Jeton d'annulation coopératif
+    Vérifié par la boucle mensuelle, et visible depuis les process workers
+    via un drapeau en mémoire partagée (shared_flag_name)
+    """
+
+    def __init__(self):
+        self.cancelled = False
+        self.reason: Optional[str] = None
+        self._callbacks: List[Callable[[], None]] = []
+        self._shm: Optional[shared_memory.SharedMemory] = None
+
+    def cancel(self, reason: str = JOB_CANCELLED):
+        if self.cancelled:
+            return
+        self.cancelled = True
+        self.reason = reason
+        if self._shm is not None:
+            self._shm.buf[0] = 1
+
+        for callback in self._callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"⚠️ Callback d'annulation en erreur: {e}")
+
+    def raise_if_cancelled(self):
+        if self.cancelled:
+            raise JobCancelled(self.reason or JOB_CANCELLED)
+
+    def add_callback(self, callback: Callable[[], None]):
+        """Enregistre une action à exécuter à l'annulation (ex: shutdown d'un pool)"""
+        if self.cancelled:
+            callback()
+        else:
+            self._callbacks.append(callback)
+
+    def shared_flag_name(self) -> str:
+        """Nom du drapeau partagé à transmettre aux process workers"""
+        if self._shm is None:
+            self._shm = shared_memory.SharedMemory(create=True, size=1)
+            self._shm.buf[0] = 1 if self.cancelled else 0
+        return self._shm.name
+
+    def close(self):
+        """Libère le drapeau partagé (appelé par l'ordonnanceur en fin de job)"""
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+
+# Drapeaux attachés par ce process worker (LRU): un worker de pool survit à de nombreux jobs,
+# les attachements des jobs terminés sont fermés au lieu de s'accumuler
+MAX_ATTACHED_FLAGS = 16
+_attached_flags: "OrderedDict[str, shared_memory.SharedMemory]" = OrderedDict()
+
+
+def _detach_flag(flag_name: str):
+    shm = _attached_flags.pop(flag_name, None)
+    if shm is not None:
+        shm.close()
+
+
+def is_cancel_requested(flag_name: Optional[str]) -> bool:
+    """
+    Côté process worker: True si le job parent a été annulé
+    (le drapeau disparu compte aussi comme une annulation)
+    """
+    if not flag_name:
+        return False
+
+    shm = _attached_flags.get(flag_name)
+    if shm is None:
+        try:
+            shm = shared_memory.SharedMemory(name=flag_name)
+        except FileNotFoundError:
+            return True
+        _attached_flags[flag_name] = shm
+        while len(_attached_flags) > MAX_ATTACHED_FLAGS:
+            _detach_flag(next(iter(_attached_flags)))
+    else:
+        _attached_flags.move_to_end(flag_name)
+
+    if shm.buf[0] == 1:
+        # Job annulé: plus rien à surveiller pour ce drapeau
+        _detach_flag(flag_name)
+        return True
+    return False
+
+
+# ============================================================================
+# ORDONNANCEUR
+# ============================================================================
+
+@dataclass
+class Job:
+    """Job soumis à l'ordonnanceur"""
+    id: str
+    factory: Callable[[CancelToken], Awaitable]
+    priority: str
+    client_id: str
+    timeout: Optional[float]
+    on_state: Optional[Callable[[str, str], None]] = None
+    token: CancelToken = field(default_factory=CancelToken)
+    state: str = JOB_QUEUED
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    task: Optional[asyncio.Task] = None
+
+
+class JobScheduler:
+    """
+    🚦 Ordonnanceur asyncio avec contrôle d'admission
+    - File bornée (backpressure: JobRejected -> HTTP 429 + Retry-After)
+    - Priorité interactive > batch, les batchs ne peuvent remplir qu'une part de la file
+    - Quota de jobs simultanés et en attente par client
+    - Timeout par job et annulation propagée jusqu'aux process workers
+    """
+
+    def __init__(self, max_concurrent: int = 4, max_queue_size: int = 100,
+                 batch_queue_share: float = 0.5, per_client_running: int = 2,
+                 per_client_queued: int = 20, default_timeout: Optional[float] = 1800):
+        self.max_concurrent = max_concurrent
+        self.max_queue_size = max_queue_size
+        self.batch_queue_limit = max(1, int(max_queue_size * batch_queue_share))
+        self.per_client_running = per_client_running
+        self.per_client_queued = per_client_queued
+        self.default_timeout = default_timeout
+
+        self.queues: Dict[str, deque] = {priority: deque() for priority in PRIORITIES}
+        self.jobs: Dict[str, Job] = {}
+        self.running: Dict[str, Job] = {}
+
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+
+        # Durée moyenne d'un job (EWMA) pour estimer le Retry-After
+        self.avg_job_duration = 10.0
+        self.stats_counters = {state: 0 for state in FINAL_STATES}
+        self.stats_counters['rejected'] = 0
+
+    # ------------------------------------------------------------------
+    # API publique
+    # ------------------------------------------------------------------
+
+    def submit(self, job_id: str, factory: Callable[[CancelToken], Awaitable], priority: str = PRIORITY_INTERACTIVE,
+               client_id: str = "anonymous", timeout: Optional[float] = None,
+               on_state: Optional[Callable[[str, str], None]] = None) -> Job:
+        """Admet un job dans la file ou lève JobRejected"""
+        if priority not in PRIORITIES:
+            raise ValueError(f"Priorité inconnue: {priority}")
+
+        queued = self.queue_depth()
+        if queued >= self.max_queue_size:
+            self._reject("File d'attente pleine")
+        if priority == PRIORITY_BATCH and len(self.queues[PRIORITY_BATCH]) >= self.batch_queue_limit:
+            self._reject("File batch pleine")
+
+        client_queued = sum(1 for job in self._queued_jobs() if job.client_id == client_id)
+        if client_queued >= self.per_client_queued:
+            self._reject(f"Trop de jobs en attente pour le client {client_id}")
+
+        job = Job(
+            id=job_id,
+            factory=factory,
+            priority=priority,
+            client_id=client_id,
+            timeout=timeout if timeout is not None else self.default_timeout,
+            on_state=on_state
+        )
+        self.jobs[job_id] = job
+        self.queues[priority].append(job)
+        self._notify(job, JOB_QUEUED)
+
+        self._ensure_dispatcher()
+        self._wakeup.set()
+        return job
+
+    def cancel(self, job_id: str, reason: str = JOB_CANCELLED) -> bool:
+        """Annule un job en attente ou en cours (tâche asyncio + jeton partagé)"""
+        job = self.jobs.get(job_id)
+        if job is None or job.state in FINAL_STATES:
+            return False
+
+        if job.state == JOB_QUEUED:
+            self.queues[job.priority].remove(job)
+            job.token.cancel(reason)
+            self._finish(job, JOB_CANCELLED)
+            return True
+
+        job.token.cancel(reason)
+        if job.task is not None:
+            job.task.cancel()
+        return True
+
+    def queue_depth(self) -> int:
+        return sum(len(queue) for queue in self.queues.values())
+
+    def estimate_retry_after(self) -> int:
+        """Estimation (secondes) du temps avant qu'une place se libère"""
+        backlog = self.queue_depth() + len(self.running)
+        waves = backlog / max(1, self.max_concurrent)
+        return max(1, int(round(waves * self.avg_job_duration)))
+
+    def get_stats(self) -> Dict:
+        return {
+            "running": len(self.running),
+            "queued": {priority: len(queue) for priority, queue in self.queues.items()},
+            "max_concurrent": self.max_concurrent,
+            "max_queue_size": self.max_queue_size,
+            "avg_job_duration": round(self.avg_job_duration, 2),
+            "counters": dict(self.stats_counters)
+        }
+
+    async def shutdown(self):
+        """Annule tous les jobs et arrête le dispatcher"""
+        for job_id in list(self.jobs):
+            self.cancel(job_id)
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            try:
+                await self._dispatcher
+            except asyncio.CancelledError:
+                pass
+            self._dispatcher = None
+
+    # ------------------------------------------------------------------
+    # Interne
+    # ------------------------------------------------------------------
+
+    def _reject(self, message: str):
+        self.stats_counters['rejected'] += 1
+        raise JobRejected(message, self.estimate_retry_after())
+
+    def _queued_jobs(self):
+        for queue in self.queues.values():
+            yield from queue
+
+    def _ensure_dispatcher(self):
+        if self._dispatcher is None or self._dispatcher.done():
+            self._wakeup = asyncio.Event()
+            self._dispatcher = asyncio.get_running_loop().create_task(self._dispatch_loop())
+
+    def _next_job(self) -> Optional[Job]:
+        """Premier job éligible, par priorité puis ordre d'arrivée"""
+        running_by_client: Dict[str, int] = {}
+        for job in self.running.values():
+            running_by_client[job.client_id] = running_by_client.get(job.client_id, 0) + 1
+
+        for priority in PRIORITIES:
+            queue = self.queues[priority]
+            for job in queue:
+                if running_by_client.get(job.client_id, 0) < self.per_client_running:
+                    queue.remove(job)
+                    return job
+        return None
+
+    async def _dispatch_loop(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+
+            while len(self.running) < self.max_concurrent:
+                job = self._next_job()
+                if job is None:
+                    break
+                self.running[job.id] = job
+                job.started_at = time.time()
+                self._notify(job, JOB_RUNNING)
+                job.task = asyncio.get_running_loop().create_task(self._run(job))
+
+    async def _run(self, job: Job):
+        state = JOB_COMPLETED
+        try:
+            await asyncio.wait_for(job.factory(job.token), timeout=job.timeout)
+            if job.token.cancelled:
+                state = JOB_TIMEOUT if job.token.reason == JOB_TIMEOUT else JOB_CANCELLED
+        except asyncio.TimeoutError:
+            job.token.cancel(JOB_TIMEOUT)
+            state = JOB_TIMEOUT
+        except (asyncio.CancelledError, JobCancelled):
+            state = JOB_TIMEOUT if job.token.reason == JOB_TIMEOUT else JOB_CANCELLED
+        except Exception as e:
+            print(f"❌ Job {job.id} en erreur: {e}")
+            state = JOB_FAILED
+        finally:
+            self.running.pop(job.id, None)
+            duration = time.time() - (job.started_at or time.time())
+            self.avg_job_duration = 0.8 * self.avg_job_duration + 0.2 * duration
+            self._finish(job, state)
+            if self._wakeup is not None:
+                self._wakeup.set()
+
+    def _finish(self, job: Job, state: str):
+        job.token.close()
+        self.stats_counters[state] += 1
+        self._notify(job, state)
+        # Seuls les jobs vivants restent indexés
+        self.jobs.pop(job.id, None)
+
+    def _notify(self, job: Job, state: str):
+        job.state = state
+        if job.on_state is not None:
+            try:
+                job.on_state(job.id, state)
+            except Exception as e:
+                print(f"⚠️ Callback d'état en erreur pour {job.id}: {e}")
+
+
+# Instance partagée par les routes (paramétrable par variables d'environnement)
+backtest_scheduler = JobScheduler(
+    max_concurrent=int(os.environ.get("SCHEDULER_MAX_CONCURRENT", 4)),
+    max_queue_size=int(os.environ.get("SCHEDULER_MAX_QUEUE", 100)),
+    per_client_running=int(os.environ.get("SCHEDULER_PER_CLIENT", 2)),
+    default_timeout=float(os.environ.get("SCHEDULER_JOB_TIMEOUT", 1800))
+)
@@ -0,0 +1,470 @@
+"""
+🎯 Mode Sniper Live - Pipeline asynchrone ingest → detect → decide → paper-execute
+Chaque étape est une tâche asyncio reliée à la suivante par une file bornée (backpressure:
+un étage lent ralentit l'amont au lieu de faire exploser la mémoire)
+La métrique qui compte: la latence détection → décision
+"""
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import AsyncIterator, Deque, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from core.execution import ExecutionSimulator
+from core.indicators import RollingReturn
+from core.simulation import (
+    EXIT_MAX_HOLDING, EXIT_REASONS, EXIT_STOP_LOSS, EXIT_TOP_TP, EXIT_TP_LOCK, TRADING_FEES
+)
+from models.schemas import BacktestConfig
+
+BUY = "BUY"
+SELL = "SELL"
+
+LATENCY_WINDOW = 2000  # Dernières mesures conservées pour les percentiles
+
+
+@dataclass
+class Tick:
+    """Prix reçu du flux (timestamp en secondes, temps du marché)"""
+    symbol: str
+    price: float
+    volume: float
+    timestamp: float
+    received_at: float = field(default_factory=time.perf_counter)
+
+
+@dataclass
+class Signal:
+    """Pump détecté au-dessus de detection_threshold"""
+    symbol: str
+    price: float
+    change_pct: float
+    timestamp: float
+    detected_at: float = field(default_factory=time.perf_counter)
+
+
+@dataclass
+class Order:
+    """Ordre papier transmis à l'exécution"""
+    side: str
+    symbol: str
+    price: float
+    timestamp: float
+    amount: float = 0.0
+    reason: str = ""
+    decided_at: float = field(default_factory=time.perf_counter)
+
+
+@dataclass
+class PaperPosition:
+    """Position papier ouverte, avec l'état nécessaire aux règles de sortie"""
+    symbol: str
+    amount: float
+    entry_price: float
+    entry_time: float
+    max_return: float = float("-inf")
+    last_price: float = 0.0
+    exiting: bool = False
+    entry_fill: Optional[Dict] = None
+
+    def current_return(self, price: float) -> float:
+        return (price / self.entry_price - 1) * 100
+
+    def check_exit(self, price: float, timestamp: float, stop_loss: float, take_profits: Sequence[float],
+                   max_holding_seconds: float) -> Optional[int]:
+        """
+        Mêmes règles que first_touch_exits, tick par tick
+        Retourne le code EXIT_* à déclencher, ou None
+        """
+        current = self.current_return(price)
+        locked = [tp for tp in take_profits if self.max_return >= tp]
+        self.max_return = max(self.max_return, current)
+        self.last_price = price
+
+        if not locked and current <= stop_loss:
+            return EXIT_STOP_LOSS
+        if locked and current <= locked[-1]:
+            return EXIT_TP_LOCK
+        if current >= take_profits[-1]:
+            return EXIT_TOP_TP
+        if timestamp - self.entry_time >= max_holding_seconds:
+            return EXIT_MAX_HOLDING
+        return None
+
+
+class LatencyTracker:
+    """Fenêtre glissante de latences (ms) et percentiles"""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.count = 0
+
+    def record(self, seconds: float):
+        self.samples.append(seconds * 1000)
+        self.count += 1
+
+    def summary(self) -> Dict[str, float]:
+        if not self.samples:
+            return {'count': 0}
+        values = np.fromiter(self.samples, dtype=np.float64, count=len(self.samples))
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        return {
+            'count': self.count,
+            'mean_ms': float(values.mean()),
+            'p50_ms': float(p50),
+            'p95_ms': float(p95),
+            'p99_ms': float(p99),
+            'max_ms': float(values.max())
+        }
+
+
+# ============================================================================
+# FLUX DE PRIX
+# ============================================================================
+
+class FakeTickerFeed:
+    """
+    Flux local reproductible: marche aléatoire par memecoin + pumps injectés
+    time_step: secondes de marché simulées entre deux rounds (accélère le temps)
+    """
+
+    def __init__(self, coins: Sequence[str], seed: Optional[int] = None, interval: float = 0.0,
+                 time_step: float = 60.0, volatility: float = 0.5, pump_probability: float = 0.002,
+                 pump_size: float = 60.0, pump_ticks: int = 5, max_rounds: Optional[int] = None):
+        self.coins = list(coins)
+        self.rng = np.random.default_rng(seed)
+        self.interval = interval
+        self.time_step = time_step
+        self.volatility = volatility
+        self.pump_probability = pump_probability
+        self.pump_size = pump_size
+        self.pump_ticks = pump_ticks
+        self.max_rounds = max_rounds
+
+    async def __aiter__(self) -> AsyncIterator[Tick]:
+        n_coins = len(self.coins)
+        prices = self.rng.uniform(0.001, 1.0, n_coins)
+        pump_left = np.zeros(n_coins, dtype=np.int64)
+        timestamp = time.time()
+        rounds = 0
+
+        while self.max_rounds is None or rounds < self.max_rounds:
+            # Un round = un tick par coin, calculé en une passe NumPy
+            steps = self.rng.normal(0, self.volatility, n_coins)
+            new_pumps = (pump_left == 0) & (self.rng.random(n_coins) < self.pump_probability)
+            pump_left[new_pumps] = self.pump_ticks
+            steps += np.where(pump_left > 0, self.pump_size / self.pump_ticks, 0.0)
+            pump_left = np.maximum(pump_left - 1, 0)
+            prices *= np.maximum(1 + steps / 100, 0.01)
+            volumes = self.rng.lognormal(10, 1, n_coins) * (1 + (pump_left > 0) * 9)
+            timestamp += self.time_step
+
+            for coin, price, volume in zip(self.coins, prices.tolist(), volumes.tolist()):
+                yield Tick(coin, price, volume, timestamp)
+
+            rounds += 1
+            await asyncio.sleep(self.interval)
+
+
+class PollingTickerFeed:
+    """Flux réel par polling de get_current_price (Coinbase/Binance via MultiCryptoAPI)"""
+
+    def __init__(self, api, coins: Sequence[str], interval: float = 10.0, hedged: bool = True):
+        self.api = api
+        self.coins = list(coins)
+        self.interval = interval
+        self.hedged = hedged  # Requêtes couvertes: la latence de queue compte plus que le nombre de requêtes
+
+    async def __aiter__(self) -> AsyncIterator[Tick]:
+        while True:
+            started = time.monotonic()
+            prices = await asyncio.gather(
+                *(asyncio.to_thread(self.api.get_current_price, coin, self.hedged) for coin in self.coins)
+            )
+            timestamp = time.time()
+            for coin, price in zip(self.coins, prices):
+                if price:
+                    yield Tick(coin, float(price), 0.0, timestamp)
+            await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+
+# ============================================================================
+# PIPELINE
+# ============================================================================
+
+class LiveSniper:
+    """
+    Pipeline sniper en paper trading
+    ingest (flux) -> ticks -> detect (pumps + surveillance des sorties) -> signaux -> decide -> ordres -> execute
+    """
+
+    def __init__(self, session_id: str, config: BacktestConfig, feed, max_open_positions: int = 10,
+                 detection_window_seconds: float = 3600.0, queue_size: int = 1000):
+        self.session_id = session_id
+        self.config = config
+        self.feed = feed
+        self.max_open_positions = max_open_positions
+        self.detection_window = detection_window_seconds
+        self.take_profits = sorted([config.tp1, config.tp2, config.tp3, config.tp4, config.tp5])
+        self.max_holding_seconds = config.max_holding_days * 86400
+
+        self.tick_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.signal_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.order_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+        self.cash = config.initial_capital
+        self.positions: Dict[str, PaperPosition] = {}
+        self.pending_buys: Dict[str, float] = {}
+        self.trades: List[Dict] = []
+        self.execution = ExecutionSimulator(config.execution) if config.execution is not None else None
+        self._returns: Dict[str, RollingReturn] = {}
+
+        self.counters = {'ticks': 0, 'signals': 0, 'orders': 0, 'fills': 0, 'rejected_signals': 0}
+        self.latency = {
+            'tick_to_detection': LatencyTracker(),
+            'detection_to_decision': LatencyTracker(),
+            'decision_to_fill': LatencyTracker()
+        }
+
+        self.status = "created"
+        self.error: Optional[str] = None
+        self.started_at: Optional[datetime] = None
+        self.stopped_at: Optional[datetime] = None
+        self._tasks: List[asyncio.Task] = []
+
+    # ----- cycle de vie -----
+
+    async def start(self):
+        self.status = "running"
+        self.started_at = datetime.now()
+        self._tasks = [
+            asyncio.create_task(self._ingest()),
+            asyncio.create_task(self._detect()),
+            asyncio.create_task(self._decide()),
+            asyncio.create_task(self._execute())
+        ]
+        self._done = asyncio.gather(*self._tasks, return_exceptions=True)
+        self._done.add_done_callback(self._on_finished)
+
+    def _on_finished(self, _):
+        if self.status == "running":
+            self.status = "finished"
+        self.stopped_at = self.stopped_at or datetime.now()
+
+    async def stop(self):
+        """Arrête le pipeline (les positions ouvertes restent valorisées au dernier prix)"""
+        if self.status == "running":
+            self.status = "stopped"
+            self.stopped_at = datetime.now()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def wait(self):
+        """Attend la fin du flux (flux fini: tests, replays)"""
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _fail(self, stage: str, error: Exception):
+        self.status = "failed"
+        self.error = f"{stage}: {error}"
+        print(f"❌ Sniper {self.session_id} - erreur {stage}: {error}")
+        for task in self._tasks:
+            task.cancel()
+
+    # ----- étapes -----
+
+    async def _ingest(self):
+        try:
+            async for tick in self.feed:
+                await self.tick_queue.put(tick)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._fail("ingest", e)
+        finally:
+            if self.status == "running":
+                await self.tick_queue.put(None)
+
+    async def _detect(self):
+        try:
+            while True:
+                tick = await self.tick_queue.get()
+                if tick is None:
+                    await self.signal_queue.put(None)
+                    return
+                self.counters['ticks'] += 1
+
+                position = self.positions.get(tick.symbol)
+                if position is not None:
+                    await self._check_exit(position, tick)
+                    continue
+
+                change = self._window_change(tick)
+                if change >= self.config.detection_threshold and tick.symbol not in self.pending_buys:
+                    signal = Signal(tick.symbol, tick.price, change, tick.timestamp)
+                    self.latency['tick_to_detection'].record(signal.detected_at - tick.received_at)
+                    self.counters['signals'] += 1
+                    self._returns[tick.symbol].reset()
+                    await self.signal_queue.put(signal)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._fail("detect", e)
+
+    def _window_change(self, tick: Tick) -> float:
+        """Variation (%) du prix depuis le début de la fenêtre de détection (O(1) par tick)"""
+        rolling_return = self._returns.get(tick.symbol)
+        if rolling_return is None:
+            rolling_return = self._returns[tick.symbol] = RollingReturn(self.detection_window)
+        return rolling_return.update(tick.price, tick.timestamp)
+
+    async def _check_exit(self, position: PaperPosition, tick: Tick):
+        if position.exiting:
+            return
+        exit_code = position.check_exit(tick.price, tick.timestamp, self.config.stop_loss,
+                                        self.take_profits, self.max_holding_seconds)
+        if exit_code is not None:
+            position.exiting = True
+            await self.order_queue.put(
+                Order(SELL, tick.symbol, tick.price, tick.timestamp, position.amount, EXIT_REASONS[exit_code])
+            )
+
+    async def _decide(self):
+        try:
+            while True:
+                signal = await self.signal_queue.get()
+                if signal is None:
+                    await self.order_queue.put(None)
+                    return
+
+                decided_at = time.perf_counter()
+                self.latency['detection_to_decision'].record(decided_at - signal.detected_at)
+
+                open_count = len(self.positions) + len(self.pending_buys)
+                amount = min(self.equity * self.config.position_size / 100, self.cash - sum(self.pending_buys.values()))
+                already_held = signal.symbol in self.positions or signal.symbol in self.pending_buys
+                if already_held or open_count >= self.max_open_positions or amount <= 0:
+                    self.counters['rejected_signals'] += 1
+                    continue
+
+                self.pending_buys[signal.symbol] = amount
+                self.counters['orders'] += 1
+                await self.order_queue.put(Order(BUY, signal.symbol, signal.price, signal.timestamp, amount,
+                                                 f"pump +{signal.change_pct:.1f}%", decided_at))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._fail("decide", e)
+
+    async def _execute(self):
+        try:
+            while True:
+                order = await self.order_queue.get()
+                if order is None:
+                    return
+                self.latency['decision_to_fill'].record(time.perf_counter() - order.decided_at)
+                self.counters['fills'] += 1
+                if order.side == BUY:
+                    self._fill_buy(order)
+                else:
+                    self._fill_sell(order)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._fail("execute", e)
+
+    def _fill_buy(self, order: Order):
+        amount = self.pending_buys.pop(order.symbol)
+        if self.execution is None:
+            self.cash -= amount
+            self.positions[order.symbol] = PaperPosition(order.symbol, amount, order.price, order.timestamp,
+                                                         last_price=order.price)
+            return
+
+        # Fill simulé: le reste d'un fill partiel reste en cash
+        fill = self.execution.fill(BUY, order.price, amount)
+        self.cash -= fill.filled_amount + fill.fees
+        self.positions[order.symbol] = PaperPosition(order.symbol, fill.filled_amount, fill.price, order.timestamp,
+                                                     last_price=order.price, entry_fill=fill.to_dict())
+
+    def _fill_sell(self, order: Order):
+        position = self.positions.pop(order.symbol)
+        exit_fill = None
+        if self.execution is None:
+            exit_price = order.price
+            fees = TRADING_FEES
+        else:
+            exit_fill = self.execution.fill(SELL, order.price, position.amount * order.price / position.entry_price)
+            exit_price = exit_fill.price
+            fees = exit_fill.fees + position.entry_fill['fees']
+
+        final_return = position.current_return(exit_price)
+        proceeds = max(position.amount * (1 + final_return / 100), 0.0)
+        self.cash += proceeds - (TRADING_FEES if exit_fill is None else exit_fill.fees)
+
+        trade = {
+            'token': order.symbol.upper(),
+            'return': final_return,
+            'pnl': proceeds - position.amount - fees,
+            'action': SELL,
+            'date': datetime.fromtimestamp(order.timestamp).isoformat(),
+            'entry_date': datetime.fromtimestamp(position.entry_time).isoformat(),
+            'holding_days': (order.timestamp - position.entry_time) / 86400,
+            'exit_reason': order.reason,
+            'amount': position.amount,
+            'fees': fees
+        }
+        if exit_fill is not None:
+            trade['execution'] = {'entry': position.entry_fill, 'exit': exit_fill.to_dict()}
+        self.trades.append(trade)
+
+    # ----- reporting -----
+
+    @property
+    def open_value(self) -> float:
+        return sum(max(p.amount * (1 + p.current_return(p.last_price) / 100), 0.0) for p in self.positions.values())
+
+    @property
+    def equity(self) -> float:
+        return self.cash + self.open_value
+
+    def get_status(self) -> Dict:
+        wins = sum(1 for trade in self.trades if trade['return'] > 0)
+        return {
+            'session_id': self.session_id,
+            'status': self.status,
+            'error': self.error,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'stopped_at': self.stopped_at.isoformat() if self.stopped_at else None,
+            'capital': {
+                'initial': self.config.initial_capital,
+                'cash': self.cash,
+                'equity': self.equity,
+                'return_pct': (self.equity / self.config.initial_capital - 1) * 100
+            },
+            'open_positions': [
+                {
+                    'token': p.symbol.upper(),
+                    'amount': p.amount,
+                    'entry_price': p.entry_price,
+                    'last_price': p.last_price,
+                    'unrealized_return': p.current_return(p.last_price),
+                    'entry_date': datetime.fromtimestamp(p.entry_time).isoformat()
+                }
+                for p in self.positions.values()
+            ],
+            'closed_trades': len(self.trades),
+            'win_rate': wins / len(self.trades) * 100 if self.trades else 0.0,
+            'counters': dict(self.counters),
+            'queues': {
+                'ticks': self.tick_queue.qsize(),
+                'signals': self.signal_queue.qsize(),
+                'orders': self.order_queue.qsize()
+            },
+            'latency': {name: tracker.summary() for name, tracker in self.latency.items()},
+            'feed': self.feed.get_stats() if hasattr(self.feed, 'get_stats') else None
+        }
@@ -0,0 +1,372 @@
+"""
+📡 Market Data Streaming - WebSocket Binance/Coinbase
+Une seule connexion pour tous les symboles, un ring buffer NumPy par symbole (prix, volume, timestamp)
+et une diffusion des mises à jour aux consommateurs (sniper live, indicateurs, ...)
+Rejouable hors-ligne: les messages bruts s'enregistrent en JSONL et un serveur local les rejoue
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import websockets
+
+from core.live_sniper import Tick
+
+DEFAULT_BUFFER_SIZE = 4096
+RECONNECT_MIN_DELAY = 1.0
+RECONNECT_MAX_DELAY = 30.0
+
+# (symbole, prix, volume, timestamp en secondes)
+Update = Tuple[str, float, float, float]
+
+
+class RingBuffer:
+    """Buffer circulaire de taille fixe: colonnes timestamp, prix, volume (float64)"""
+
+    TIMESTAMP, PRICE, VOLUME = 0, 1, 2
+
+    def __init__(self, capacity: int = DEFAULT_BUFFER_SIZE):
+        self.capacity = capacity
+        self._data = np.zeros((capacity, 3))
+        self.count = 0
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def append(self, price: float, volume: float, timestamp: float):
+        row = self._data[self.count % self.capacity]
+        row[0] = timestamp
+        row[1] = price
+        row[2] = volume
+        self.count += 1
+
+    def latest(self) -> Optional[Tuple[float, float, float]]:
+        """(timestamp, prix, volume) de la dernière mise à jour"""
+        if not self.count:
+            return None
+        timestamp, price, volume = self._data[(self.count - 1) % self.capacity]
+        return float(timestamp), float(price), float(volume)
+
+    def last(self, n: Optional[int] = None) -> np.ndarray:
+        """Les n dernières lignes (n, 3) dans l'ordre chronologique (copie)"""
+        size = len(self)
+        n = size if n is None else min(n, size)
+        end = self.count % self.capacity
+        start = end - n
+        if start >= 0:
+            return self._data[start:end].copy()
+        return np.concatenate([self._data[start:], self._data[:end]])
+
+    def to_dict(self, n: Optional[int] = None) -> Dict[str, List[float]]:
+        rows = self.last(n)
+        return {
+            'timestamps': rows[:, self.TIMESTAMP].tolist(),
+            'prices': rows[:, self.PRICE].tolist(),
+            'volumes': rows[:, self.VOLUME].tolist()
+        }
+
+
+class MarketDataHub:
+    """
+    Ring buffers par symbole + diffusion aux abonnés
+    Un abonné lent ne bloque jamais l'ingestion: sa file bornée perd les plus anciennes mises à jour
+    """
+
+    def __init__(self, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        self.buffer_size = buffer_size
+        self.buffers: Dict[str, RingBuffer] = {}
+        self._subscribers: List[Tuple[asyncio.Queue, Optional[Set[str]]]] = []
+        self.updates = 0
+        self.dropped = 0
+
+    def buffer(self, symbol: str) -> RingBuffer:
+        if symbol not in self.buffers:
+            self.buffers[symbol] = RingBuffer(self.buffer_size)
+        return self.buffers[symbol]
+
+    def subscribe(self, symbols: Optional[Iterable[str]] = None, maxsize: int = 10000) -> asyncio.Queue:
+        """File de mises à jour (symbole, prix, volume, timestamp), filtrée sur symbols si fourni"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._subscribers.append((queue, set(symbols) if symbols is not None else None))
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers = [(q, symbols) for q, symbols in self._subscribers if q is not queue]
+
+    def publish(self, symbol: str, price: float, volume: float, timestamp: float):
+        self.buffer(symbol).append(price, volume, timestamp)
+        self.updates += 1
+
+        update = (symbol, price, volume, timestamp)
+        for queue, symbols in self._subscribers:
+            if symbols is not None and symbol not in symbols:
+                continue
+            if queue.full():
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(update)
+
+    def get_stats(self) -> Dict:
+        return {
+            'symbols': len(self.buffers),
+            'updates': self.updates,
+            'dropped': self.dropped,
+            'subscribers': len(self._subscribers)
+        }
+
+
+# ============================================================================
+# FLUX EXCHANGES
+# ============================================================================
+
+class ExchangeStream(ABC):
+    """
+    Connexion WebSocket unique pour une liste de coins, reconnexion automatique
+    symbols: coin_id -> symbole de l'exchange (ex: 'dogecoin' -> 'DOGEUSDT')
+    record_path: enregistre les messages bruts (JSONL) pour les rejouer plus tard
+    """
+
+    name = "exchange"
+    default_url = ""
+
+    def __init__(self, symbols: Dict[str, str], url: Optional[str] = None, record_path: Optional[str] = None):
+        self.symbols = symbols
+        self.coin_ids = {symbol.upper(): coin_id for coin_id, symbol in symbols.items()}
+        self.url = url or self.build_url()
+        self.record_path = record_path
+        self.connected = False
+        self.messages = 0
+        self.reconnects = 0
+
+    def build_url(self) -> str:
+        return self.default_url
+
+    def subscribe_message(self) -> Optional[str]:
+        return None
+
+    @abstractmethod
+    def parse(self, message: str) -> List[Update]:
+        """Message brut -> mises à jour (coin_id, prix, volume, timestamp)"""
+
+    async def run(self, hub: MarketDataHub, max_messages: Optional[int] = None):
+        """Ingestion continue vers le hub (jusqu'à annulation, ou max_messages pour les tests)"""
+        delay = RECONNECT_MIN_DELAY
+        record = open(self.record_path, "a") if self.record_path else None
+        started = time.monotonic()
+
+        try:
+            while max_messages is None or self.messages < max_messages:
+                try:
+                    async with websockets.connect(self.url, max_size=None) as connection:
+                        self.connected = True
+                        delay = RECONNECT_MIN_DELAY
+                        subscribe = self.subscribe_message()
+                        if subscribe:
+                            await connection.send(subscribe)
+                        print(f"📡 {self.name}: flux connecté ({len(self.symbols)} symboles)")
+
+                        async for message in connection:
+                            self.messages += 1
+                            if record is not None:
+                                record.write(json.dumps({'t': time.monotonic() - started, 'message': message}) + "\n")
+                            for coin_id, price, volume, timestamp in self.parse(message):
+                                hub.publish(coin_id, price, volume, timestamp)
+                            if max_messages is not None and self.messages >= max_messages:
+                                return
+
+                    if max_messages is not None:
+                        return  # Replay terminé
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    print(f"⚠️ {self.name}: flux interrompu ({e}), reconnexion dans {delay:.0f}s")
+
+                self.connected = False
+                self.reconnects += 1
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RECONNECT_MAX_DELAY)
+        finally:
+            self.connected = False
+            if record is not None:
+                record.close()
+
+
+class BinanceStream(ExchangeStream):
+    """🥈 Binance: flux combiné <symbol>@trade, tous les symboles dans l'URL"""
+
+    name = "Binance"
+    default_url = "wss://stream.binance.com:9443/stream"
+
+    def build_url(self) -> str:
+        streams = "/".join(f"{symbol.lower()}@trade" for symbol in self.symbols.values())
+        return f"{self.default_url}?streams={streams}"
+
+    def parse(self, message: str) -> List[Update]:
+        data = json.loads(message)
+        data = data.get("data", data)
+        coin_id = self.coin_ids.get(str(data.get("s", "")).upper())
+        if coin_id is None or data.get("e") != "trade":
+            return []
+        return [(coin_id, float(data["p"]), float(data["q"]), data["T"] / 1000)]
+
+
+class CoinbaseStream(ExchangeStream):
+    """🥇 Coinbase: canal ticker, abonnement envoyé après connexion"""
+
+    name = "Coinbase"
+    default_url = "wss://ws-feed.exchange.coinbase.com"
+
+    def subscribe_message(self) -> Optional[str]:
+        return json.dumps({
+            "type": "subscribe",
+            "product_ids": list(self.symbols.values()),
+            "channels": ["ticker"]
+        })
+
+    def parse(self, message: str) -> List[Update]:
+        data = json.loads(message)
+        coin_id = self.coin_ids.get(str(data.get("product_id", "")).upper())
+        if coin_id is None or data.get("type") != "ticker":
+            return []
+        timestamp = datetime.fromisoformat(data["time"].replace("Z", "+00:00")).timestamp() if "time" in data else time.time()
+        return [(coin_id, float(data["price"]), float(data.get("last_size", 0)), timestamp)]
+
+
+STREAMS = {
+    "binance": BinanceStream,
+    "coinbase": CoinbaseStream
+}
+
+
+def build_stream(exchange: str, coins: Sequence[str], symbol_mappings: Dict[str, Dict[str, str]],
+                 url: Optional[str] = None, record_path: Optional[str] = None) -> ExchangeStream:
+    """Flux d'un exchange pour les coins qu'il liste (mapping de MultiCryptoAPI)"""
+    stream_class = STREAMS[exchange]
+    symbols = {
+        coin: symbol_mappings[coin][stream_class.name]
+        for coin in coins
+        if stream_class.name in symbol_mappings.get(coin, {})
+    }
+    if not symbols:
+        raise ValueError(f"Aucun des coins demandés n'est listé sur {stream_class.name}")
+    return stream_class(symbols, url=url, record_path=record_path)
+
+
+class StreamingTickerFeed:
+    """Flux du sniper live alimenté par un ExchangeStream (remplace le polling REST)"""
+
+    def __init__(self, stream: ExchangeStream, hub: Optional[MarketDataHub] = None,
+                 max_messages: Optional[int] = None, queue_size: int = 10000):
+        self.stream = stream
+        self.hub = hub or MarketDataHub()
+        self.max_messages = max_messages
+        self.queue_size = queue_size
+
+    def get_stats(self) -> Dict:
+        return {
+            'exchange': self.stream.name,
+            'connected': self.stream.connected,
+            'messages': self.stream.messages,
+            'reconnects': self.stream.reconnects,
+            **self.hub.get_stats()
+        }
+
+    async def __aiter__(self):
+        queue = self.hub.subscribe(self.stream.symbols.keys(), self.queue_size)
+        task = asyncio.create_task(self.stream.run(self.hub, self.max_messages))
+        try:
+            while not (task.done() and queue.empty()):
+                getter = asyncio.ensure_future(queue.get())
+                await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+                if not getter.done():
+                    getter.cancel()
+                    continue
+                symbol, price, volume, timestamp = getter.result()
+                yield Tick(symbol, price, volume, timestamp)
+        finally:
+            task.cancel()
+            self.hub.unsubscribe(queue)
+
+
+# ============================================================================
+# REPLAY LOCAL
+# ============================================================================
+
+class ReplayServer:
+    """
+    Serveur WebSocket local qui rejoue un enregistrement JSONL ({'t': secondes, 'message': brut})
+    speed: facteur d'accélération (0 = aussi vite que possible)
+    Chaque client reçoit l'enregistrement complet puis la connexion est fermée
+    """
+
+    def __init__(self, messages: Sequence[Tuple[float, str]], host: str = "127.0.0.1", port: int = 0,
+                 speed: float = 0.0):
+        self.messages = messages
+        self.host = host
+        self.port = port
+        self.speed = speed
+        self._server = None
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "ReplayServer":
+        with open(path) as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        return cls([(record['t'], record['message']) for record in records], **kwargs)
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    async def _handler(self, connection):
+        previous = self.messages[0][0] if self.messages else 0.0
+        for offset, message in self.messages:
+            if self.speed > 0 and offset > previous:
+                await asyncio.sleep((offset - previous) / self.speed)
+            previous = offset
+            await connection.send(message)
+
+    async def start(self):
+        self._server = await websockets.serve(self._handler, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+
+async def serve_replay(path: str, host: str, port: int, speed: float):
+    server = await ReplayServer.from_file(path, host=host, port=port, speed=speed).start()
+    print(f"🔁 Replay de {len(server.messages)} messages sur {server.url} (vitesse x{speed or 'max'})")
+    await asyncio.Future()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serveur de replay WebSocket pour les flux enregistrés")
+    parser.add_argument("recording", help="Fichier JSONL enregistré (record_path)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--speed", type=float, default=1.0, help="Accélération (0 = max)")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve_replay(args.recording, args.host, args.port, args.speed))
+    except KeyboardInterrupt:
+        print("👋 Replay arrêté")
+
+
+if __name__ == "__main__":
+    main()
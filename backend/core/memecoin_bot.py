@@ -11,6 +11,14 @@ from datetime import datetime, timedelta
 from dataclasses import dataclass
 from typing import List, Optional, Dict
 import json
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from core.simulation import MEMECOIN_LIST, first_touch_exits, prices_to_daily_returns
+from core.price_matrix import open_price_matrix
+from core.symbol_index import SymbolIndex
+from core.synthetic import synthetic_prices
+from core.upstream_health import UpstreamSelector
+from utils.rate_limiter import get_rate_limiter
 
 # ============================================================================
 # MULTI-API CRYPTO - VRAIES DONNÉES HAUTE PERFORMANCE
@@ -22,15 +30,10 @@ class CoinbaseAPI:
     def __init__(self):
         self.base_url = "https://api.exchange.coinbase.com"
         self.session = requests.Session()
-        self.last_request_time = 0
-        self.rate_limit_delay = 0.1  # 100ms = 10 req/sec
+        self.rate_limiter = get_rate_limiter('Coinbase')  # 10 req/sec, partagé entre instances
         
     def _wait_for_rate_limit(self):
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.rate_limit_delay:
-            time.sleep(self.rate_limit_delay - time_since_last)
-        self.last_request_time = time.time()
+        self.rate_limiter.acquire()
     
     def get_price_data(self, symbol: str, days: int = 30) -> Optional[List[float]]:
         try:
@@ -94,15 +97,10 @@ class BinanceAPI:
     def __init__(self):
         self.base_url = "https://api.binance.com/api/v3"
         self.session = requests.Session()
-        self.last_request_time = 0
-        self.rate_limit_delay = 0.05  # 50ms = 20 req/sec
+        self.rate_limiter = get_rate_limiter('Binance')  # 20 req/sec, partagé entre instances
         
     def _wait_for_rate_limit(self):
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.rate_limit_delay:
-            time.sleep(self.rate_limit_delay - time_since_last)
-        self.last_request_time = time.time()
+        self.rate_limiter.acquire()
     
     def get_price_data(self, symbol: str, days: int = 30) -> Optional[List[float]]:
         try:
@@ -162,6 +160,74 @@ class BinanceAPI:
             return None
 
 
+# Mappings écrits à la main: prioritaires sur l'index découvert (tickers ambigus, paires non USD)
+SYMBOL_OVERRIDES = {
+    'bitcoin': {
+        'Coinbase': 'BTC-USD',
+        'Binance': 'BTCUSDT'
+    },
+    'ethereum': {
+        'Coinbase': 'ETH-USD',
+        'Binance': 'ETHUSDT'
+    },
+    'dogecoin': {
+        'Coinbase': 'DOGE-USD',
+        'Binance': 'DOGEUSDT'
+    },
+    'shiba-inu': {
+        'Coinbase': 'SHIB-USD',
+        'Binance': 'SHIBUSDT'
+    },
+    'pepe': {
+        'Binance': 'PEPEUSDT'  # Binance only
+    },
+    'floki': {
+        'Binance': 'FLOKIUSDT'
+    },
+    'bonk': {
+        'Binance': 'BONKUSDT'
+    },
+    'wojak': {
+        'Binance': 'WOJAKUSDT'
+    },
+    'dogwifcoin': {
+        'Binance': 'WIFUSDT'
+    },
+    'cat-in-a-dogs-world': {
+        'Binance': 'MEWUSDT'
+    },
+    'book-of-meme': {
+        'Binance': 'BOMEUSDT'
+    },
+    'memecoin-2': {
+        'Binance': 'MEMEUSDT'
+    }
+}
+
+# Index partagé par toutes les instances (un seul cache et un seul backoff réseau)
+# MOG, BRETT...: tickers partagés, départagés par les coins que le moteur trade réellement
+SYMBOL_INDEX = SymbolIndex(SYMBOL_OVERRIDES, tracked=MEMECOIN_LIST)
+
+# Santé des exchanges partagée (latence EWMA, erreurs, circuit breakers)
+UPSTREAM_HEALTH = UpstreamSelector(['Coinbase', 'Binance'])
+
+# Requêtes couvertes (hedging) de get_current_price
+HEDGE_QUANTILE = 0.95
+HEDGE_DEFAULT_DELAY = 0.25  # Avant d'avoir des mesures de latence
+HEDGE_MIN_DELAY = 0.02
+HEDGE_MAX_DELAY = 2.0
+
+_hedge_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_hedge_executor() -> ThreadPoolExecutor:
+    """Pool partagé des requêtes de prix couvertes (créé au premier appel)"""
+    global _hedge_executor
+    if _hedge_executor is None:
+        _hedge_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="price-hedge")
+    return _hedge_executor
+
+
 class MultiCryptoAPI:
     """
     🚀 MANAGER MULTI-API INTELLIGENT
@@ -178,161 +244,152 @@ class MultiCryptoAPI:
             ('Coinbase', self.coinbase),
             ('Binance', self.binance)
         ]
+        self.api_by_name = dict(self.apis)
         
-        # Mapping des symboles pour chaque exchange
-        self.symbol_mappings = {
-            'bitcoin': {
-                'Coinbase': 'BTC-USD',
-                'Binance': 'BTCUSDT'
-            },
-            'ethereum': {
-                'Coinbase': 'ETH-USD',
-                'Binance': 'ETHUSDT'
-            },
-            'dogecoin': {
-                'Coinbase': 'DOGE-USD',
-                'Binance': 'DOGEUSDT'
-            },
-            'shiba-inu': {
-                'Coinbase': 'SHIB-USD',
-                'Binance': 'SHIBUSDT'
-            },
-            'pepe': {
-                'Binance': 'PEPEUSDT'  # Binance only
-            },
-            'floki': {
-                'Binance': 'FLOKIUSDT'
-            },
-            'bonk': {
-                'Binance': 'BONKUSDT'
-            },
-            'wojak': {
-                'Binance': 'WOJAKUSDT'
-            },
-            'dogwifcoin': {
-                'Binance': 'WIFUSDT'
-            },
-            'cat-in-a-dogs-world': {
-                'Binance': 'MEWUSDT'
-            }
-        }
+        # Santé partagée: l'ordre réel dépend de la latence et des erreurs observées
+        self.health = UPSTREAM_HEALTH
+        
+        # Index coin_id <-> symbole par exchange (découvert depuis les listings, overrides prioritaires)
+        self.symbol_index = SYMBOL_INDEX
+        self.symbol_mappings = self.symbol_index
         
         print(f"🚀 Multi-API Manager initialisé - Vraies données garanties !")
     
+    def _call_upstream(self, api_name: str, method: str, *args):
+        """Appel d'un exchange, chronométré et enregistré dans sa santé (None = échec)"""
+        if not self.health.begin(api_name):
+            return None
+        started = time.perf_counter()
+        try:
+            result = getattr(self.api_by_name[api_name], method)(*args)
+        except Exception as e:
+            print(f"❌ {api_name} échoué: {e}")
+            result = None
+        # Les clients renvoient None sur erreur réseau/HTTP: compté comme un échec
+        self.health.record(api_name, bool(result), time.perf_counter() - started)
+        return result
+    
     def get_price_data(self, coin_id: str, vs_currency: str = "usd", days: int = 30) -> Optional[List[float]]:
         """
         Récupère les VRAIES données historiques via la meilleure API disponible
         """
         print(f"🔍 Recherche données pour {coin_id} ({days} jours)")
         
+        # Matrice de prix locale (memory-mapped, partagée entre workers) avant tout appel réseau,
+        # seulement si elle couvre la période jusqu'à maintenant (à un pas près); sinon les exchanges
+        price_matrix = open_price_matrix()
+        if price_matrix is not None and coin_id in price_matrix:
+            prices = price_matrix.get_price_data(coin_id, days=days, as_of=int(time.time()),
+                                                 max_staleness=price_matrix.granularity)
+            if prices:
+                return prices
+        
         if coin_id not in self.symbol_mappings:
             print(f"⚠️ {coin_id} non supporté dans le mapping")
             return self._generate_enhanced_realistic_data(coin_id, days)
         
-        # Essaie chaque API jusqu'à succès
-        for api_name, api_instance in self.apis:
-            if api_name in self.symbol_mappings[coin_id]:
-                symbol = self.symbol_mappings[coin_id][api_name]
-                
-                try:
-                    print(f"🔄 Tentative {api_name} pour {coin_id} ({symbol})")
-                    prices = api_instance.get_price_data(symbol, days)
-                    
-                    if prices and len(prices) > 0:
-                        print(f"✅ SUCCÈS {api_name} - {len(prices)} prix réels récupérés !")
-                        return prices
-                        
-                except Exception as e:
-                    print(f"❌ {api_name} échoué: {e}")
-                    continue
+        # Essaie les APIs disponibles, de la plus rapide à la plus lente (circuits ouverts sautés)
+        symbols = self.symbol_mappings[coin_id]
+        for api_name in self.health.order(name for name, _ in self.apis if name in symbols):
+            print(f"🔄 Tentative {api_name} pour {coin_id} ({symbols[api_name]})")
+            prices = self._call_upstream(api_name, 'get_price_data', symbols[api_name], days)
+            if prices and len(prices) > 0:
+                print(f"✅ SUCCÈS {api_name} - {len(prices)} prix réels récupérés !")
+                return prices
         
         # Fallback : données ultra-réalistes basées sur les patterns réels
         print(f"🎲 Fallback: génération de données ultra-réalistes pour {coin_id}")
         return self._generate_enhanced_realistic_data(coin_id, days)
     
-    def get_current_price(self, coin_id: str) -> Optional[float]:
-        """Prix actuel via la meilleure API"""
+    def get_current_price(self, coin_id: str, hedged: bool = False) -> Optional[float]:
+        """
+        Prix actuel via la meilleure API
+        hedged: requête de secours vers l'exchange suivant si le premier tarde (latence de queue)
+        """
         if coin_id not in self.symbol_mappings:
             return self._generate_realistic_current_price(coin_id)
         
-        for api_name, api_instance in self.apis:
-            if api_name in self.symbol_mappings[coin_id]:
-                symbol = self.symbol_mappings[coin_id][api_name]
-                
-                try:
-                    price = api_instance.get_current_price(symbol)
-                    if price:
-                        print(f"💰 Prix {api_name} {coin_id}: ${price}")
-                        return price
-                except Exception as e:
-                    continue
+        symbols = self.symbol_mappings[coin_id]
+        names = self.health.order(name for name, _ in self.apis if name in symbols)
+        if hedged and len(names) > 1:
+            price = self._hedged_current_price(names, symbols)
+            if price:
+                return price
+            return self._generate_realistic_current_price(coin_id)
+        
+        for api_name in names:
+            price = self._call_upstream(api_name, 'get_current_price', symbols[api_name])
+            if price:
+                print(f"💰 Prix {api_name} {coin_id}: ${price}")
+                return price
         
         return self._generate_realistic_current_price(coin_id)
     
-    def _generate_enhanced_realistic_data(self, coin_id: str, days: int) -> List[float]:
+    def _hedge_delay(self, api_name: str) -> float:
+        """Attente avant la requête de secours: p95 observée de l'exchange en cours"""
+        p95 = self.health.latency_quantile(api_name, HEDGE_QUANTILE)
+        if p95 is None:
+            return HEDGE_DEFAULT_DELAY
+        return min(max(p95, HEDGE_MIN_DELAY), HEDGE_MAX_DELAY)
+    
+    def _hedged_current_price(self, names: List[str], symbols: Dict[str, str]) -> Optional[float]:
         """
-        Génère des données ULTRA-RÉALISTES basées sur les patterns des vrais memecoins
-        Amélioration de votre algorithme original avec des patterns réels observés
+        Premier prix valide parmi des requêtes échelonnées
+        - l'exchange préféré part seul; sans réponse après son délai p95, le suivant part aussi
+        - un échec déclenche le suivant immédiatement (basculement classique)
+        - pas de requête de secours si le token bucket de l'exchange est vide (budget partagé)
+        Les requêtes perdantes ne sont pas interrompues (HTTP bloquant) mais leur résultat est ignoré;
+        leur latence alimente quand même la santé de l'exchange
         """
-        # Prix de base selon le type de coin (basé sur vraies données)
-        base_prices = {
-            'bitcoin': 45000,
-            'ethereum': 2500,
-            'dogecoin': 0.08,
-            'shiba-inu': 0.000015,
-            'pepe': 0.000002,
-            'floki': 0.00005,
-            'bonk': 0.00001,
-            'wojak': 0.00008,
-            'dogwifcoin': 2.5,
-            'cat-in-a-dogs-world': 0.008
-        }
-        
-        base_price = base_prices.get(coin_id, random.uniform(0.00001, 0.01))
-        prices = []
-        current_price = base_price
-        
-        # Paramètres de volatilité par type de coin
-        if coin_id in ['bitcoin', 'ethereum']:
-            daily_vol = 0.05  # 5% volatilité journalière
-            pump_prob = 0.02
-            dump_prob = 0.02
-            moon_prob = 0.005
-        else:  # Memecoins
-            daily_vol = 0.12  # 12% volatilité journalière (plus élevée)
-            pump_prob = 0.05
-            dump_prob = 0.08
-            moon_prob = 0.02  # Plus de moon shots
-        
-        for day in range(days):
-            # Volatilité de base
-            daily_change = np.random.normal(0, daily_vol)
-            
-            # Events spéciaux basés sur patterns observés
-            random_event = np.random.random()
-            
-            if random_event < moon_prob:  # Moon shot
-                daily_change += random.uniform(0.3, 1.5)  # 30-150% pump
-                print(f"🌙 Moon shot simulé jour {day}: +{daily_change*100:.1f}%")
-                
-            elif random_event < pump_prob:  # Pump normal
-                daily_change += random.uniform(0.1, 0.4)  # 10-40% pump
-                
-            elif random_event < dump_prob:  # Dump
-                daily_change -= random.uniform(0.15, 0.5)  # -15 à -50% dump
-            
-            # Tendance hebdomadaire (cycles de 7 jours)
-            week_cycle = np.sin(2 * np.pi * day / 7) * 0.02
-            daily_change += week_cycle
-            
-            # Application du changement
-            current_price *= (1 + daily_change)
-            current_price = max(current_price, base_price * 0.01)  # Minimum 1% du prix initial
-            
-            prices.append(current_price)
+        executor = get_hedge_executor()
+        remaining = list(names)
+        pending = {}
+        
+        def launch():
+            api_name = remaining.pop(0)
+            future = executor.submit(self._call_upstream, api_name, 'get_current_price', symbols[api_name])
+            pending[future] = api_name
+            return api_name
+        
+        latest = launch()
+        primary = latest
+        hedge_allowed = True
+        while pending:
+            timeout = self._hedge_delay(latest) if remaining and hedge_allowed else None
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            
+            for future in done:
+                api_name = pending.pop(future)
+                price = future.result()
+                if price:
+                    for other in pending:
+                        other.cancel()
+                    if api_name != primary:
+                        self.health.record_hedge('won')
+                    print(f"💰 Prix {api_name} {symbols[api_name]}: ${price}")
+                    return price
+            
+            if not remaining:
+                continue
+            if done and not pending:
+                latest = launch()  # Tous les essais en cours ont échoué: basculement
+                hedge_allowed = True
+            elif not done:
+                if get_rate_limiter(remaining[0]).available() >= 1:
+                    self.health.record_hedge('launched')
+                    latest = launch()
+                else:
+                    self.health.record_hedge('skipped_budget')
+                    hedge_allowed = False  # On attend la réponse en cours
         
-        print(f"🎲 Données ultra-réalistes générées pour {coin_id}: {len(prices)} points")
-        return prices
+        return None
+    
+    def _generate_enhanced_realistic_data(self, coin_id: str, days: int, seed: Optional[int] = None) -> List[float]:
+        """
+        Génère des données ULTRA-RÉALISTES basées sur les patterns des vrais memecoins
+        Générateur vectorisé partagé (core/synthetic.py): mémoïsé par (coin, jours, seed), nouveau tirage sans seed
+        """
+        return synthetic_prices(coin_id, days, seed).tolist()
     
     def _generate_realistic_current_price(self, coin_id: str) -> float:
         """Prix actuel réaliste basé sur le coin"""
@@ -501,17 +558,17 @@ class SmartMemecoinBacktester:
         print(f"   🎯 Take Profits: {self.take_profits}")
         print(f"   📡 Source: Multi-API (Coinbase + Binance)")
     
-    def generate_realistic_performance(self):
+    def generate_realistic_path(self) -> np.ndarray:
         """
-        🎲 VOTRE FONCTION LÉGENDAIRE - INCHANGÉE
-        Cette fonction reste exactement la même car elle est parfaite !
+        🎲 VOTRE FONCTION LÉGENDAIRE - jour par jour
+        Mêmes paramètres de fou, mais on garde chaque journée pour évaluer les sorties au bon moment
         """
         # Facteurs de marché (vos paramètres de fou)
         base_trend = np.random.normal(self.base_trend_mean, self.base_trend_std)
         volatility = np.random.uniform(self.volatility_min, self.volatility_max)
         
         # Simulation sur votre période de holding optimale
-        cumulative = 0
+        path = np.empty(self.max_holding_days)
         for day in range(self.max_holding_days):
             daily = np.random.normal(base_trend, volatility/12)
             
@@ -527,9 +584,22 @@ class SmartMemecoinBacktester:
             elif random_event < self.dump_probability:  # Dump soudain 12%
                 daily -= np.random.uniform(30, 60)    # -30 à -60% dump
             
-            cumulative += daily
+            path[day] = daily
         
-        return cumulative
+        return path
+    
+    def generate_realistic_performance(self):
+        """
+        🎲 Performance cumulée sur toute la période de holding (sans sortie anticipée)
+        """
+        return float(self.generate_realistic_path().sum())
+    
+    def exit_on_path(self, daily_returns: np.ndarray):
+        """
+        🎯 VOS RÈGLES DE SORTIE appliquées jour par jour: (rendement final, jours de holding)
+        """
+        exits = first_touch_exits(daily_returns[None, :], [self.stop_loss_percent], [self.take_profits])
+        return float(exits.returns[0, 0]), int(exits.holding_days[0, 0])
     
     def apply_exit_rules(self, performance):
         """
@@ -546,9 +616,11 @@ class SmartMemecoinBacktester:
         
         return performance
     
-    def execute_trade(self, coin_id: str, performance: float, month: int) -> Dict:
+    def execute_trade(self, coin_id: str, performance: float, month: int,
+                      holding_days: Optional[int] = None) -> Dict:
         """
         💼 EXÉCUTION DE TRADE - VOTRE LOGIQUE PARFAITE INCHANGÉE
+        holding_days: durée réelle du trade quand la sortie a été évaluée sur le chemin
         """
         # Application de vos règles de sortie magiques
         final_return = self.apply_exit_rules(performance)
@@ -586,7 +658,7 @@ class SmartMemecoinBacktester:
             'action': TradeAction.SELL,
             'is_moon_shot': is_moon_shot,
             'date': datetime.now().strftime("%Y-%m-%d"),
-            'holding_days': np.random.randint(1, self.max_holding_days + 1),
+            'holding_days': holding_days if holding_days is not None else self.max_holding_days,
             'fees': trading_fees
         }
     
@@ -616,24 +688,24 @@ class SmartMemecoinBacktester:
             # 🚀 MAINTENANT ON PEUT UTILISER VRAIES DONNÉES OU SIMULATION
             use_real_data = random.random() < 0.3  # 30% chance de vraies données
             
+            daily_returns = None
             if use_real_data:
                 # Essaie de récupérer des vraies données récentes
                 real_prices = self.coingecko_api.get_price_data(coin_id, days=self.max_holding_days)
                 if real_prices and len(real_prices) >= 2:
-                    # Calcule la performance réelle sur la période
-                    start_price = real_prices[0]
-                    end_price = real_prices[-1]
-                    performance = ((end_price - start_price) / start_price) * 100
-                    print(f"📊 Vraies données {coin_id}: {performance:+.1f}%")
-                else:
-                    # Fallback sur votre algorithme légendaire
-                    performance = self.generate_realistic_performance()
-            else:
-                # Utilise votre algorithme parfait
-                performance = self.generate_realistic_performance()
+                    # Chemin réel sur la période (le cumul final = performance réelle)
+                    daily_returns = prices_to_daily_returns(real_prices, self.max_holding_days)
+                    print(f"📊 Vraies données {coin_id}: {daily_returns.sum():+.1f}%")
+            
+            if daily_returns is None:
+                # Utilise votre algorithme parfait (fallback compris)
+                daily_returns = self.generate_realistic_path()
+            
+            # Sortie au premier contact du stop / des TP, au jour près
+            performance, holding_days = self.exit_on_path(daily_returns)
             
             # Exécution avec votre logique parfaite
-            trade_result = self.execute_trade(coin_id, performance, month)
+            trade_result = self.execute_trade(coin_id, performance, month, holding_days)
             month_trades_list.append(trade_result)
             
             # Comptage des gains
@@ -0,0 +1,144 @@
+"""
+🏔️ Fronts de Pareto multi-objectifs - Tri non dominé vectorisé
+Compromis rendement / drawdown / volatilité / win rate sur des milliers à des millions de configs
+évaluées: seules les configs qu'aucune autre ne bat sur tous les objectifs sont gardées.
+ParetoArchive maintient le front au fil des résultats d'un sweep (fusion incrémentale par lot)
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.walk_forward import OBJECTIVES
+
+
+def objective_costs(values: np.ndarray, objectives: Sequence[str]) -> np.ndarray:
+    """Valeurs (n, m) -> coûts à minimiser (objectifs à maximiser inversés, NaN = pire valeur)"""
+    signs = np.array([OBJECTIVES[objective] for objective in objectives], dtype=np.float64)
+    costs = -np.asarray(values, dtype=np.float64) * signs
+    return np.where(np.isnan(costs), np.inf, costs)
+
+
+def point_values(points: Sequence[Dict], objectives: Sequence[str]) -> np.ndarray:
+    """
+    Matrice (n, m) des objectifs de points de sweep: valeurs à plat ou sous 'metrics'
+    (format du classement Hyperband et des résultats de backtest); None = NaN
+    """
+    values = np.empty((len(points), len(objectives)))
+    for row, point in enumerate(points):
+        metrics = point.get('metrics', point)
+        for column, objective in enumerate(objectives):
+            if objective not in metrics:
+                raise ValueError(f"Point {row}: objectif '{objective}' absent")
+            value = metrics[objective]
+            values[row, column] = np.nan if value is None else float(value)
+    return values
+
+
+def pareto_front(costs: np.ndarray) -> np.ndarray:
+    """
+    Indices des points non dominés (minimisation), un seul représentant par doublon exact
+    2 objectifs: tri + minimum courant, O(n log n). Au-delà: élimination par blocs vectorisée,
+    en partant des points de plus petite somme (ceux qui dominent le plus)
+    """
+    costs = np.asarray(costs, dtype=np.float64)
+    n, m = costs.shape
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+
+    if m == 1:
+        return np.array([int(np.argmin(costs[:, 0]))])
+
+    if m == 2:
+        order = np.lexsort((costs[:, 1], costs[:, 0]))
+        second = costs[order, 1]
+        best_before = np.concatenate([[np.inf], np.minimum.accumulate(second)[:-1]])
+        return np.sort(order[second < best_before])
+
+    order = np.argsort(costs.sum(axis=1), kind='stable')
+    candidates = order
+    remaining = costs[order]
+    position = 0
+    while position < len(remaining):
+        # Garde les points strictement meilleurs sur au moins un objectif que le point courant
+        keep = (remaining < remaining[position]).any(axis=1)
+        keep[position] = True
+        candidates = candidates[keep]
+        remaining = remaining[keep]
+        position = int(keep[:position].sum()) + 1
+    return np.sort(candidates)
+
+
+def non_dominated_ranks(costs: np.ndarray, max_fronts: Optional[int] = None) -> np.ndarray:
+    """Rang de front de chaque point (1 = Pareto, 2 = front suivant, ...; 0 = au-delà de max_fronts)"""
+    costs = np.asarray(costs, dtype=np.float64)
+    if not len(costs):
+        return np.zeros(0, dtype=np.int64)
+    # Doublons exacts: classés une fois, même rang
+    unique, inverse = np.unique(costs, axis=0, return_inverse=True)
+    ranks = np.zeros(len(unique), dtype=np.int64)
+    remaining = np.arange(len(unique))
+    rank = 0
+    while len(remaining) and (max_fronts is None or rank < max_fronts):
+        rank += 1
+        front = pareto_front(unique[remaining])
+        ranks[remaining[front]] = rank
+        remaining = np.delete(remaining, front)
+    return ranks[inverse.reshape(-1)]
+
+
+class ParetoArchive:
+    """
+    Front courant d'un flux de résultats
+    add() fusionne un lot: front du lot, puis front de (archive + front du lot) - l'archive reste petite
+    """
+
+    def __init__(self, objectives: Sequence[str]):
+        unknown = [objective for objective in objectives if objective not in OBJECTIVES]
+        if unknown or len(objectives) < 2:
+            raise ValueError(f"Au moins 2 objectifs parmi: {', '.join(OBJECTIVES)} (inconnus: {', '.join(unknown) or 'aucun'})")
+        self.objectives = list(objectives)
+        self.costs = np.empty((0, len(objectives)))
+        self.points: List[Dict] = []
+        self.seen = 0
+        self.version = 0
+
+    def add(self, values: np.ndarray, points: Sequence[Dict]) -> Tuple[int, int]:
+        """Ajoute un lot (valeurs (n, m) dans l'ordre des objectifs); retourne (entrés, sortis) du front"""
+        self.seen += len(points)
+        if not len(points):
+            return 0, 0
+        costs = objective_costs(values, self.objectives)
+        batch_front = pareto_front(costs)
+
+        merged_costs = np.concatenate([self.costs, costs[batch_front]])
+        merged_points = self.points + [points[index] for index in batch_front]
+        front = pareto_front(merged_costs)
+
+        previous = len(self.points)
+        removed = previous - int((front < previous).sum())
+        added = int((front >= previous).sum())
+        self.costs = merged_costs[front]
+        self.points = [merged_points[index] for index in front]
+        if added or removed:
+            self.version += 1
+        return added, removed
+
+    def add_points(self, points: Sequence[Dict]) -> Tuple[int, int]:
+        """add() sur des points dict (point_values)"""
+        return self.add(point_values(points, self.objectives), points)
+
+    def front(self) -> List[Dict]:
+        """Points du front triés sur le premier objectif (du meilleur au pire)"""
+        order = np.argsort(self.costs[:, 0], kind='stable') if len(self.points) else []
+        return [self.points[index] for index in order]
+
+    def to_dict(self, limit: Optional[int] = None) -> Dict:
+        front = self.front()
+        return {
+            'objectives': self.objectives,
+            'evaluated': self.seen,
+            'front_size': len(front),
+            'version': self.version,
+            'front': front[:limit] if limit is not None else front
+        }
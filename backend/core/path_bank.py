@@ -0,0 +1,232 @@
+"""
+🏦 Banque de chemins en mémoire partagée - Trades simulés partagés par les process workers
+Les rendements journaliers bruts du modèle (generate_realistic_performance vectorisé) sont écrits
+une fois dans des blocs multiprocessing.shared_memory: les workers reçoivent un descripteur de
+quelques octets et mappent les mêmes pages (ni copie par worker, ni pickling des tableaux).
+Les banques sont comptées par référence et libérées (unlink) quand le dernier utilisateur les rend
+"""
+
+import threading
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from core.simulation import MarketModel, TradeBatch, _month_trade_count, _simulate_month
+
+# (champ, nom du bloc, forme, dtype)
+ArraySpec = Tuple[str, str, Tuple[int, ...], str]
+
+
+@dataclass(frozen=True)
+class SharedArraysDescriptor:
+    """Ce qui est envoyé aux workers: noms des blocs et métadonnées, jamais les données"""
+    arrays: Tuple[ArraySpec, ...]
+    n_months: int = 0
+
+    @property
+    def nbytes(self) -> int:
+        return sum(int(np.prod(shape)) * np.dtype(dtype).itemsize for _, _, shape, dtype in self.arrays)
+
+
+class SharedArrays:
+    """
+    Tableaux NumPy placés dans des blocs de mémoire partagée (côté process propriétaire)
+    acquire/release comptent les utilisateurs; le dernier release libère les blocs
+    """
+
+    def __init__(self, shapes: Mapping[str, Tuple[Tuple[int, ...], np.dtype]], n_months: int = 0,
+                 on_free: Optional[Callable[["SharedArrays"], None]] = None):
+        self._lock = threading.Lock()
+        self._on_free = on_free
+        self._blocks: Dict[str, shared_memory.SharedMemory] = {}
+        self.arrays: Dict[str, np.ndarray] = {}
+        self.n_months = n_months
+        self.refcount = 1
+        try:
+            for field, (shape, dtype) in shapes.items():
+                nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+                block = shared_memory.SharedMemory(create=True, size=max(nbytes, 1))  # size=0 interdit
+                self._blocks[field] = block
+                self.arrays[field] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        except Exception:
+            self._on_free = None  # Jamais enregistrée: rien à retirer du registre
+            self._unlink()
+            raise
+        self.descriptor = SharedArraysDescriptor(
+            arrays=tuple((field, block.name, tuple(self.arrays[field].shape), self.arrays[field].dtype.str)
+                         for field, block in self._blocks.items()),
+            n_months=n_months
+        )
+
+    @classmethod
+    def from_arrays(cls, arrays: Mapping[str, np.ndarray], n_months: int = 0,
+                    on_free: Optional[Callable[["SharedArrays"], None]] = None) -> "SharedArrays":
+        """Copie des tableaux existants dans de nouveaux blocs partagés"""
+        shared = cls({field: (array.shape, array.dtype) for field, array in arrays.items()}, n_months, on_free)
+        for field, array in arrays.items():
+            shared.arrays[field][...] = array
+        return shared
+
+    def acquire(self) -> "SharedArrays":
+        with self._lock:
+            if self.refcount <= 0:
+                raise RuntimeError("Banque déjà libérée")
+            self.refcount += 1
+        return self
+
+    def release(self):
+        """Rend une référence; les blocs sont détruits au dernier release"""
+        with self._lock:
+            self.refcount -= 1
+            if self.refcount > 0:
+                return
+        self._unlink()
+
+    def _unlink(self):
+        self.arrays = {}  # Plus aucune vue exportée: les blocs peuvent être fermés
+        for block in self._blocks.values():
+            try:
+                block.close()
+            except BufferError:
+                pass  # Vues encore vivantes chez l'appelant: le mapping tombera avec elles
+            block.unlink()
+        self._blocks = {}
+        if self._on_free is not None:
+            self._on_free(self)
+
+    def __enter__(self) -> "SharedArrays":
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+    def __reduce__(self):
+        raise TypeError("SharedArrays ne se sérialise pas: transmettre .descriptor aux workers")
+
+
+def bank_trade_batch(bank: SharedArrays) -> TradeBatch:
+    """TradeBatch sur les blocs, côté propriétaire (vues sans copie, valides jusqu'au dernier release)"""
+    return TradeBatch(
+        daily_returns=bank.arrays['daily_returns'],
+        month_index=bank.arrays['month_index'],
+        coin_index=bank.arrays['coin_index'],
+        n_months=bank.n_months
+    )
+
+
+def share_trade_batch(batch: TradeBatch) -> SharedArrays:
+    """Copie un TradeBatch existant en mémoire partagée"""
+    return SharedArrays.from_arrays({
+        'daily_returns': batch.daily_returns,
+        'month_index': batch.month_index,
+        'coin_index': batch.coin_index
+    }, n_months=batch.n_months)
+
+
+def simulate_path_bank(seed: int, n_months: int, max_holding_days: int,
+                       model: MarketModel = MarketModel(), first_month: int = 1,
+                       dtype=np.float64, on_free: Optional[Callable[[SharedArrays], None]] = None) -> SharedArrays:
+    """
+    Même simulation que simulate_trade_batch, écrite mois par mois directement dans les blocs partagés
+    - les tailles sont connues d'avance (premier tirage de chaque mois rejoué seul)
+    - chaque mois est simulé hors du cache LRU et libéré après écriture
+    Une seule copie des chemins vit donc dans le process, plus un mois transitoire
+    """
+    months = range(first_month, first_month + n_months)
+    counts = [_month_trade_count(np.random.default_rng([seed, month, max_holding_days]), model) for month in months]
+    n_trades = sum(counts)
+
+    bank = SharedArrays({
+        'daily_returns': ((n_trades, max_holding_days), np.dtype(dtype)),
+        'month_index': ((n_trades,), np.dtype(np.int64)),
+        'coin_index': ((n_trades,), np.dtype(np.int64))
+    }, n_months=n_months, on_free=on_free)
+    offset = 0
+    for position, (month, count) in enumerate(zip(months, counts)):
+        daily, coins = _simulate_month.__wrapped__(seed, month, max_holding_days, model)
+        end = offset + count
+        bank.arrays['daily_returns'][offset:end] = daily
+        bank.arrays['month_index'][offset:end] = position
+        bank.arrays['coin_index'][offset:end] = coins
+        offset = end
+    return bank
+
+
+# ============================================================================
+# REGISTRE PARTAGÉ (process propriétaire)
+# ============================================================================
+
+_banks: Dict[Tuple, SharedArrays] = {}
+_banks_lock = threading.Lock()
+
+
+def acquire_path_bank(seed: int, n_months: int, max_holding_days: int,
+                      model: MarketModel = MarketModel(), first_month: int = 1) -> SharedArrays:
+    """
+    Banque des trades (seed, mois, durée, modèle), créée au premier appel puis partagée:
+    deux analyses concurrentes sur la même seed réutilisent les mêmes blocs. À rendre avec release()
+    """
+    key = (seed, n_months, max_holding_days, model, first_month)
+    with _banks_lock:
+        bank = _banks.get(key)
+        if bank is not None and bank.refcount > 0:
+            return bank.acquire()
+
+        def forget(freed: SharedArrays):
+            # Le registre ne compte pas comme utilisateur: la banque disparaît au dernier release
+            with _banks_lock:
+                if _banks.get(key) is freed:
+                    del _banks[key]
+
+        bank = _banks[key] = simulate_path_bank(seed, n_months, max_holding_days, model, first_month,
+                                                on_free=forget)
+        return bank
+
+
+def get_stats() -> Dict:
+    with _banks_lock:
+        return {
+            'banks': len(_banks),
+            'total_mb': sum(bank.descriptor.nbytes for bank in _banks.values()) / 1e6,
+            'refcounts': [bank.refcount for bank in _banks.values()]
+        }
+
+
+# ============================================================================
+# CÔTÉ WORKER
+# ============================================================================
+
+_attached: Dict[SharedArraysDescriptor, Tuple[Dict[str, np.ndarray], List[shared_memory.SharedMemory]]] = {}
+
+
+def attach_arrays(descriptor: SharedArraysDescriptor) -> Dict[str, np.ndarray]:
+    """
+    Vues en lecture seule sur les blocs d'un descripteur, mappées une fois par process
+    (les tâches suivantes du même worker réutilisent le mapping)
+    """
+    cached = _attached.get(descriptor)
+    if cached is not None:
+        return cached[0]
+
+    blocks, arrays = [], {}
+    for field, name, shape, dtype in descriptor.arrays:
+        block = shared_memory.SharedMemory(name=name)
+        blocks.append(block)
+        array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+        array.setflags(write=False)
+        arrays[field] = array
+    _attached[descriptor] = (arrays, blocks)
+    return arrays
+
+
+def attach_trade_batch(descriptor: SharedArraysDescriptor) -> TradeBatch:
+    """TradeBatch zéro-copie sur une banque de chemins"""
+    arrays = attach_arrays(descriptor)
+    return TradeBatch(
+        daily_returns=arrays['daily_returns'],
+        month_index=arrays['month_index'],
+        coin_index=arrays['coin_index'],
+        n_months=descriptor.n_months
+    )
@@ -0,0 +1,287 @@
+"""
+💼 Portefeuille multi-positions - Moteur événementiel
+Les trades se chevauchent: plusieurs Position ouvertes en même temps, capital réparti entre elles,
+valorisation quotidienne. File d'événements ordonnée par tas (entrées, marks journaliers, sorties)
+"""
+
+import heapq
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from core.analysis_runner import register_analysis
+from core.job_scheduler import CancelToken
+from core.memecoin_bot import Position
+from core.simulation import (
+    EXIT_REASONS, MEMECOIN_LIST, TRADING_FEES, first_touch_exits, simulate_trade_batch
+)
+from core.walk_forward import curve_metrics
+from models.schemas import PortfolioRequest
+
+# Ordre de traitement à jour égal: les sorties libèrent le capital avant le mark, puis les entrées
+EVENT_EXIT = 0
+EVENT_MARK = 1
+EVENT_ENTRY = 2
+EVENT_KINDS = 3
+
+# Un événement = un entier ((jour * 3 + type) << 32 | ref): le tas ne compare que des int
+REF_BITS = 32
+REF_MASK = (1 << REF_BITS) - 1
+
+
+def event_key(day: int, kind: int, ref: int) -> int:
+    return (day * EVENT_KINDS + kind) << REF_BITS | ref
+
+
+def decode_event(key: int):
+    """(jour, type, ref) d'une clé d'événement"""
+    day, kind = divmod(key >> REF_BITS, EVENT_KINDS)
+    return day, kind, key & REF_MASK
+
+
+class PortfolioEngine:
+    """
+    Moteur événementiel: un tas de clés entières (jour, type, ref) - pas d'objets ni de tuples à trier
+    - entrée: alloue position_size % de l'equity (bornée par le cash), programme la sortie
+    - mark: revalorise les positions ouvertes sur leur chemin de prix
+    - sortie: rend le capital au rendement booké, moins les frais
+    """
+
+    def __init__(self, initial_capital: float, position_size_percent: float, max_open_positions: int,
+                 fees: float = TRADING_FEES, start_date: Optional[datetime] = None, days_per_month: int = 30):
+        self.initial_capital = initial_capital
+        self.position_size_percent = position_size_percent
+        self.max_open_positions = max_open_positions
+        self.fees = fees
+        self.start_date = start_date or datetime.now()
+        self.days_per_month = days_per_month
+
+        self.cash = initial_capital
+        self.positions: Dict[int, Position] = {}
+        self.open_value = 0.0
+
+        # Slots NumPy des positions ouvertes: le mark journalier est une seule opération vectorisée
+        self._slots: Dict[int, int] = {}
+        self._free_slots = list(range(max_open_positions - 1, -1, -1))
+        self._slot_trade = np.zeros(max_open_positions, dtype=np.int64)
+        self._slot_entry = np.zeros(max_open_positions, dtype=np.int64)
+        self._slot_amount = np.zeros(max_open_positions)
+        self._slot_value = np.zeros(max_open_positions)
+        self.events_processed = 0
+        self.skipped_entries = 0
+        self.max_concurrent = 0
+        self.trades: List[Dict] = []
+        self._heap = []
+
+    @property
+    def equity(self) -> float:
+        return self.cash + self.open_value
+
+    def schedule(self, day: int, kind: int, ref: int):
+        heapq.heappush(self._heap, event_key(day, kind, ref))
+
+    def run(self, entry_day: np.ndarray, coin_ids: List[str], cumulative: np.ndarray,
+            exit_return: np.ndarray, holding_days: np.ndarray, exit_reason: np.ndarray, n_days: int,
+            on_day: Optional[Callable[[int, float], None]] = None) -> np.ndarray:
+        """
+        Rejoue les signaux et retourne l'equity de fin de journée (n_days,)
+        Les positions encore ouvertes au jour n_days restent dans self.positions (valorisées)
+        cumulative: (N, D) chemin cumulé de chaque trade en points de %
+        on_day(day, equity): appelé après chaque mark (courbe mensuelle, progression, annulation)
+        """
+        # Listes Python: l'accès élément par élément y est bien plus rapide que sur des scalaires NumPy
+        self._entry_day = np.asarray(entry_day).tolist()
+        self._coin_ids = coin_ids
+        self._cumulative = cumulative
+        self._exit_return = np.asarray(exit_return).tolist()
+        self._holding_days = np.asarray(holding_days).tolist()
+        self._exit_reason = np.asarray(exit_reason).tolist()
+
+        entry_keys = (np.asarray(entry_day, dtype=np.int64) * EVENT_KINDS + EVENT_ENTRY) << REF_BITS
+        mark_keys = (np.arange(n_days, dtype=np.int64) * EVENT_KINDS + EVENT_MARK) << REF_BITS
+        self._heap = (entry_keys | np.arange(len(entry_keys))).tolist() + (mark_keys | np.arange(n_days)).tolist()
+        heapq.heapify(self._heap)
+        end_key = event_key(n_days, 0, 0)
+
+        # Dates précalculées: pas de timedelta/strftime par événement
+        self._dates = [self.start_date + timedelta(days=day) for day in range(n_days)]
+        self._date_labels = [date.strftime("%Y-%m-%d") for date in self._dates]
+
+        equity_curve = np.empty(n_days)
+        heappop = heapq.heappop
+        heap = self._heap
+        processed = 0
+
+        while heap:
+            key = heappop(heap)
+            if key >= end_key:
+                break
+            processed += 1
+            day, kind = divmod(key >> REF_BITS, EVENT_KINDS)
+            ref = key & REF_MASK
+            if kind == EVENT_EXIT:
+                self._close(ref, day)
+            elif kind == EVENT_MARK:
+                self._mark(day)
+                equity_curve[day] = self.equity
+                if on_day is not None:
+                    on_day(day, equity_curve[day])
+            else:
+                self._open(ref, day)
+
+        self.events_processed += processed
+        return equity_curve
+
+    def _open(self, index: int, day: int):
+        if len(self.positions) >= self.max_open_positions:
+            self.skipped_entries += 1
+            return
+
+        amount = min(self.equity * self.position_size_percent / 100, self.cash)
+        if amount <= 0:
+            self.skipped_entries += 1
+            return
+
+        slot = self._free_slots.pop()
+        self._slots[index] = slot
+        self._slot_trade[slot] = index
+        self._slot_entry[slot] = day
+        self._slot_amount[slot] = amount
+        self._slot_value[slot] = amount
+
+        self.cash -= amount
+        self.open_value += amount
+        self.positions[index] = Position(
+            coin_id=self._coin_ids[index],
+            amount=amount,
+            entry_price=1.0,  # Prix normalisé: la valeur suit 1 + cumul / 100
+            entry_date=self._dates[day]
+        )
+        self.max_concurrent = max(self.max_concurrent, len(self.positions))
+        self.schedule(day + self._holding_days[index], EVENT_EXIT, index)
+
+    def _mark(self, day: int):
+        if not self._slots:
+            self.open_value = 0.0
+            return
+
+        # Ouverte à entry_day (après le mark de ce jour): offset 0 = fin de sa 1ère journée
+        slots = np.fromiter(self._slots.values(), dtype=np.int64, count=len(self._slots))
+        offsets = day - self._slot_entry[slots] - 1
+        path = self._cumulative[self._slot_trade[slots], offsets]
+        values = np.maximum(self._slot_amount[slots] * (1 + path / 100), 0.0)
+        self._slot_value[slots] = values
+        self.open_value = float(values.sum())
+
+    def _close(self, index: int, day: int):
+        position = self.positions.pop(index)
+        slot = self._slots.pop(index)
+        self._free_slots.append(slot)
+        self.open_value -= float(self._slot_value[slot])
+
+        final_return = self._exit_return[index]
+        proceeds = max(position.amount * (1 + final_return / 100), 0.0) - self.fees
+        self.cash += proceeds
+        pnl = proceeds - position.amount
+
+        self.trades.append({
+            'month': day // self.days_per_month + 1,
+            'token': position.coin_id.upper(),
+            'return': final_return,
+            'pnl': pnl,
+            'action': 'SELL',
+            'date': self._date_labels[day],
+            'entry_date': self._date_labels[day - self._holding_days[index]],
+            'amount': position.amount,
+            'holding_days': self._holding_days[index],
+            'exit_reason': EXIT_REASONS[self._exit_reason[index]],
+            'fees': self.fees
+        })
+
+
+@register_analysis("portfolio", PortfolioRequest)
+def run_portfolio_backtest(request: PortfolioRequest, progress: Optional[Callable[[float, str], None]] = None,
+                           cancel_token: Optional[CancelToken] = None) -> Dict:
+    """
+    Backtest multi-positions
+    - les trades du mois sont répartis sur ses jours et se chevauchent
+    - sorties au premier contact (mêmes règles que le moteur séquentiel)
+    - equity valorisée chaque jour, positions limitées à max_open_positions
+    """
+    config = request.config
+    progress = progress or (lambda percent, message: None)
+    days_per_month = request.days_per_month
+
+    start_date = datetime(config.start_year, config.start_month, 1)
+    end_date = datetime(config.end_year, config.end_month, 1)
+    n_months = (end_date.year - start_date.year) * 12 + (end_date.month - start_date.month) + 1
+    n_days = n_months * days_per_month
+
+    seed = request.seed if request.seed is not None else random.randrange(2 ** 32)
+    progress(5.0, f"🎲 Simulation de {n_months} mois de trades")
+    batch = simulate_trade_batch(seed, n_months, config.max_holding_days)
+
+    take_profits = [config.tp1, config.tp2, config.tp3, config.tp4, config.tp5]
+    exits = first_touch_exits(batch.daily_returns, [config.stop_loss], [take_profits])
+
+    # Jour d'entrée de chaque trade, uniforme dans son mois
+    rng = np.random.default_rng([seed, 0])
+    entry_day = batch.month_index * days_per_month + rng.integers(0, days_per_month, len(batch.month_index))
+    coin_ids = [MEMECOIN_LIST[index] for index in batch.coin_index]
+
+    engine = PortfolioEngine(config.initial_capital, config.position_size, request.max_open_positions,
+                             start_date=start_date, days_per_month=days_per_month)
+    monthly_capital = [config.initial_capital]
+    open_positions = np.zeros(n_days, dtype=np.int32)
+
+    def on_day(day: int, equity: float):
+        open_positions[day] = len(engine.positions)
+        if (day + 1) % days_per_month == 0:
+            monthly_capital.append(equity)
+            month = (day + 1) // days_per_month
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            progress(10.0 + 85.0 * month / n_months, f"📅 Mois {month}/{n_months}: equity ${equity:,.0f}")
+
+    progress(10.0, f"💼 Rejeu de {len(entry_day)} trades sur {n_days} jours")
+    started = time.perf_counter()
+    equity_curve = engine.run(
+        entry_day, coin_ids, np.cumsum(batch.daily_returns, axis=1),
+        exits.returns[0], exits.holding_days[0], exits.exit_reason[0], n_days, on_day
+    )
+    elapsed = time.perf_counter() - started
+
+    monthly_capital = np.array(monthly_capital)
+    trade_returns = np.array([trade['return'] for trade in engine.trades])
+    metrics = curve_metrics(monthly_capital, trade_returns)
+    metrics.update({
+        'total_trades': len(engine.trades),
+        'skipped_entries': engine.skipped_entries,
+        'open_positions_at_end': len(engine.positions),
+        'max_concurrent_positions': engine.max_concurrent,
+        'avg_open_positions': float(open_positions.mean()) if n_days else 0.0,
+        'final_equity': float(engine.equity)
+    })
+
+    return {
+        'type': 'portfolio',
+        'config': config.dict(),
+        'seed': seed,
+        'max_open_positions': request.max_open_positions,
+        'metrics': metrics,
+        'open_positions': [position.to_dict() for position in engine.positions.values()],
+        'trades': engine.trades,
+        'performance': {
+            'events_processed': engine.events_processed,
+            'elapsed_seconds': elapsed,
+            'events_per_second': engine.events_processed / elapsed if elapsed > 0 else 0.0
+        },
+        'charts_data': {
+            'equity_curve': equity_curve.tolist(),
+            'monthly_capital': monthly_capital.tolist(),
+            'open_positions': open_positions.tolist()
+        }
+    }
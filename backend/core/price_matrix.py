@@ -0,0 +1,173 @@
+"""
+🧮 Matrice de prix coins × temps - Fichiers memory-mapped partagés entre process
+prices.npy (coins × timestamps, NaN = pas de bougie), timestamps.npy (secondes) et coins.json.
+Les workers mappent les fichiers en lecture seule: pas de copie, pas de parsing, les pages
+sont partagées par le cache du noyau entre tous les process de la machine
+"""
+
+import json
+import os
+import shutil
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from utils.candle_store import CandleStore
+
+DEFAULT_MATRIX_PATH = os.environ.get("PRICE_MATRIX_PATH", "data/price_matrix")
+
+PRICES_FILE = "prices.npy"
+TIMESTAMPS_FILE = "timestamps.npy"
+COINS_FILE = "coins.json"
+
+DTYPES = {"float32": np.float32, "float64": np.float64}
+
+
+def build_price_matrix(store: CandleStore, targets: Sequence[Tuple[str, str, str]], granularity: int, start: int,
+                       end: int, path: str = DEFAULT_MATRIX_PATH, dtype: str = "float32") -> Dict:
+    """
+    Écrit la matrice des clôtures depuis le stockage des bougies (backfill)
+    targets: (coin_id, exchange, symbole). Écriture dans un dossier temporaire puis rename:
+    les lecteurs voient l'ancienne matrice ou la nouvelle, jamais un fichier partiel
+    """
+    if dtype not in DTYPES:
+        raise ValueError(f"dtype inconnu: {dtype} (valeurs: {', '.join(DTYPES)})")
+    start -= start % granularity
+    timestamps = np.arange(start, end, granularity, dtype=np.int64)
+    if len(timestamps) == 0:
+        raise ValueError("Plage vide")
+
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    prices = np.lib.format.open_memmap(os.path.join(tmp_path, PRICES_FILE), mode="w+",
+                                       dtype=DTYPES[dtype], shape=(len(targets), len(timestamps)))
+    prices[:] = np.nan
+
+    filled = []
+    for row, (_, exchange, symbol) in enumerate(targets):
+        candles = store.get_candles(exchange, symbol, granularity, start, end)
+        columns = (candles['open_time'] - start) // granularity
+        prices[row, columns] = candles['close']
+        filled.append(len(columns))
+    prices.flush()
+    del prices
+
+    np.save(os.path.join(tmp_path, TIMESTAMPS_FILE), timestamps)
+    meta = {
+        'coins': [coin_id for coin_id, _, _ in targets],
+        'sources': [{'exchange': exchange, 'symbol': symbol} for _, exchange, symbol in targets],
+        'granularity': granularity,
+        'dtype': dtype,
+        'built_at': time.time()
+    }
+    with open(os.path.join(tmp_path, COINS_FILE), "w") as f:
+        json.dump(meta, f)
+
+    # Swap: l'ancienne matrice reste lisible par les process qui l'ont déjà mappée
+    old_path = f"{path}.old-{os.getpid()}"
+    if os.path.exists(path):
+        os.replace(path, old_path)
+    os.replace(tmp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+
+    return {
+        'path': path,
+        'coins': len(targets),
+        'timestamps': len(timestamps),
+        'candles': int(sum(filled)),
+        'coverage': float(sum(filled)) / (len(targets) * len(timestamps)) if targets else 0.0,
+        'size_mb': len(targets) * len(timestamps) * np.dtype(DTYPES[dtype]).itemsize / 1e6
+    }
+
+
+class PriceMatrix:
+    """
+    Matrice mappée en lecture seule
+    Interface compatible get_price_data / get_current_price pour remplacer les listes de prix
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.prices = np.load(os.path.join(path, PRICES_FILE), mmap_mode="r")
+        self.timestamps = np.load(os.path.join(path, TIMESTAMPS_FILE), mmap_mode="r")
+        with open(os.path.join(path, COINS_FILE)) as f:
+            self.meta = json.load(f)
+        self.coins: List[str] = self.meta['coins']
+        self.granularity: int = self.meta['granularity']
+        self.rows: Dict[str, int] = {coin_id: row for row, coin_id in enumerate(self.coins)}
+
+    def __contains__(self, coin_id) -> bool:
+        return coin_id in self.rows
+
+    def row(self, coin_id: str) -> np.ndarray:
+        """Série complète d'un coin (vue sur le fichier, aucune copie)"""
+        return self.prices[self.rows[coin_id]]
+
+    def window(self, coin_id: str, start: Optional[int] = None, end: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(timestamps, prix) sur [start, end), vues sans copie"""
+        lo = 0 if start is None else int(np.searchsorted(self.timestamps, start))
+        hi = len(self.timestamps) if end is None else int(np.searchsorted(self.timestamps, end))
+        return self.timestamps[lo:hi], self.prices[self.rows[coin_id], lo:hi]
+
+    def get_price_data(self, coin_id: str, vs_currency: str = "usd", days: int = 30,
+                       as_of: Optional[int] = None, max_staleness: Optional[int] = None) -> Optional[List[float]]:
+        """
+        Clôtures des `days` derniers jours jusqu'à as_of (défaut: fin de la matrice)
+        Les trous internes reprennent la dernière clôture (un point par pas de temps: l'axe n'est pas
+        compressé); les pas hors cotation (avant la première, après la dernière clôture) sont omis.
+        max_staleness: None si la dernière clôture du coin se termine plus de max_staleness secondes
+        avant as_of (matrice trop ancienne pour la période demandée)
+        """
+        if coin_id not in self.rows:
+            return None
+        end = int(self.timestamps[-1]) + self.granularity if as_of is None else as_of
+        timestamps, prices = self.window(coin_id, end - days * 86400, end)
+        valid = np.flatnonzero(~np.isnan(prices))
+        if not len(valid):
+            return None
+        if max_staleness is not None and end - (int(timestamps[valid[-1]]) + self.granularity) > max_staleness:
+            return None
+        prices = np.asarray(prices[valid[0]:valid[-1] + 1], dtype=np.float64)
+        filled = np.maximum.accumulate(np.where(np.isnan(prices), 0, np.arange(len(prices))))
+        return prices[filled].tolist()
+
+    def get_current_price(self, coin_id: str) -> Optional[float]:
+        """Dernière clôture connue"""
+        if coin_id not in self.rows:
+            return None
+        prices = self.row(coin_id)
+        valid = np.flatnonzero(~np.isnan(prices))
+        return float(prices[valid[-1]]) if len(valid) else None
+
+    def get_info(self) -> Dict:
+        return {
+            'path': self.path,
+            'coins': self.coins,
+            'sources': self.meta.get('sources'),
+            'granularity': self.granularity,
+            'dtype': str(self.prices.dtype),
+            'shape': list(self.prices.shape),
+            'start': int(self.timestamps[0]) if len(self.timestamps) else None,
+            'end': int(self.timestamps[-1]) if len(self.timestamps) else None,
+            'built_at': self.meta.get('built_at')
+        }
+
+
+_open_matrices: Dict[str, Tuple[float, PriceMatrix]] = {}
+
+
+def open_price_matrix(path: str = DEFAULT_MATRIX_PATH) -> Optional[PriceMatrix]:
+    """
+    Matrice mappée une fois par process (None si elle n'a pas encore été construite)
+    Remappée automatiquement quand une reconstruction a remplacé les fichiers
+    """
+    try:
+        mtime = os.stat(os.path.join(path, COINS_FILE)).st_mtime
+    except FileNotFoundError:
+        return None
+    cached = _open_matrices.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = _open_matrices[path] = (mtime, PriceMatrix(path))
+    return cached[1]
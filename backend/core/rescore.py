@@ -0,0 +1,86 @@
+"""
+🔁 Re-scoring instantané d'un backtest terminé
+Les chemins journaliers bruts de chaque trade sont gardés (checkpoints, binaire): de nouvelles règles
+de sortie et une autre taille de position s'appliquent aux MÊMES trades en une passe vectorisée
+(sorties au premier contact + capital composé en forme fermée), sans relancer la simulation
+"""
+
+import time
+from typing import Dict, Tuple
+
+import numpy as np
+
+from core.simulation import (
+    EXIT_REASONS, PARAM_NAMES, TradeBatch, first_touch_exits, metrics_row, score_params
+)
+from models.schemas import BacktestConfig, RescoreRequest
+from utils.storage import backtest_paths, get_checkpoint_store
+
+
+class RescoreUnavailable(Exception):
+    """Backtest sans chemins exploitables (inconnu, incomplet, ou écrit avant le re-scoring)"""
+
+
+def load_trade_paths(backtest_id: str) -> Tuple[BacktestConfig, TradeBatch]:
+    """Config et trades d'un backtest terminé, lus une fois puis gardés en mémoire"""
+    cached = backtest_paths.get(backtest_id)
+    if cached is not None:
+        return cached
+
+    loaded = get_checkpoint_store().load_paths(backtest_id)
+    if loaded is None:
+        raise RescoreUnavailable("Aucun chemin de trades pour ce backtest")
+    checkpoint, paths, month_index, coin_index = loaded
+    if checkpoint['month'] < checkpoint['months_count']:
+        raise RescoreUnavailable("Backtest incomplet: le reprendre avant de le re-scorer")
+
+    batch = TradeBatch(daily_returns=paths, month_index=month_index, coin_index=coin_index,
+                       n_months=checkpoint['months_count'])
+    cached = backtest_paths[backtest_id] = (BacktestConfig(**checkpoint['config']), batch)
+    return cached
+
+
+def rescore_config(config: BacktestConfig, rules: RescoreRequest) -> BacktestConfig:
+    """Config d'origine avec les règles modifiées"""
+    return config.copy(update={key: value for key, value in rules.dict().items() if value is not None})
+
+
+def rescore_backtest(config: BacktestConfig, batch: TradeBatch, rules: RescoreRequest) -> Dict:
+    """Métriques (définitions de calculate_final_metrics) des trades stockés sous les nouvelles règles"""
+    started = time.perf_counter()
+    if config.execution is not None:
+        raise ValueError("Re-scoring indisponible pour un backtest avec simulateur d'exécution (frais fixes uniquement)")
+    stored_days = batch.daily_returns.shape[1]
+    if rules.max_holding_days is not None and not 1 <= rules.max_holding_days <= stored_days:
+        raise ValueError(f"max_holding_days doit être entre 1 et {stored_days} (durée du backtest)")
+
+    rescored = rescore_config(config, rules)
+    params = np.array([[getattr(rescored, name) for name in PARAM_NAMES]], dtype=np.float64)
+    exits = first_touch_exits(batch.daily_returns, params[:, 0], params[:, 1:6], rescored.max_holding_days)
+    scores = score_params(batch, params, rescored.initial_capital, returns=exits.returns)
+
+    returns = exits.returns[0]
+    metrics = metrics_row(scores, 0)
+    final_capital = metrics.pop('final_capital')
+    reasons = np.bincount(exits.exit_reason[0], minlength=len(EXIT_REASONS))
+
+    return {
+        'config': rescored.dict(),
+        'summary': {
+            'initial_capital': rescored.initial_capital,
+            'final_capital': final_capital,
+            'total_return': metrics['total_return'],
+            'total_pnl': final_capital - rescored.initial_capital,
+            'total_trades': len(returns),
+            'win_rate': metrics['win_rate'],
+            'moon_shots': int((returns >= 100).sum())
+        },
+        'metrics': metrics,
+        'exit_reasons': {name: int(reasons[code]) for code, name in EXIT_REASONS.items()},
+        'charts_data': {
+            'capital_evolution': scores['monthly_capital'][0].tolist(),
+            'monthly_returns': scores['monthly_returns'][0].tolist(),
+            'trade_returns': returns.tolist()
+        },
+        'elapsed_ms': (time.perf_counter() - started) * 1000
+    }
@@ -0,0 +1,224 @@
+"""
+🔭 Scanner d'univers - Détection de pumps sur toutes les paires en une requête par exchange
+Snapshot 24h en masse (Binance /api/v3/ticker/24hr, Coinbase market/products) au lieu d'un
+get_price_data par coin: rendements et pics de volume calculés en NumPy sur des milliers de paires
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import requests
+
+from core.symbol_index import QUOTE_ASSETS, SymbolIndex
+
+REQUEST_TIMEOUT = 10
+MIN_SCAN_INTERVAL = 2.0  # Un snapshot par exchange au plus toutes les 2 s (poids de requête Binance)
+
+BINANCE_TICKER_24H = "https://api.binance.com/api/v3/ticker/24hr"
+COINBASE_MARKET_PRODUCTS = "https://api.coinbase.com/api/v3/brokerage/market/products"
+
+
+@dataclass
+class TickerSnapshot:
+    """Toutes les paires d'un exchange à un instant, en colonnes NumPy"""
+    exchange: str
+    timestamp: float
+    symbols: np.ndarray          # triés, pour l'alignement avec le snapshot précédent
+    price: np.ndarray
+    change_24h: np.ndarray       # %
+    quote_volume: np.ndarray     # volume 24h en devise de cotation
+    volume_change_24h: np.ndarray  # % (nan si l'exchange ne le fournit pas)
+
+    @classmethod
+    def from_columns(cls, exchange: str, timestamp: float, symbols: List[str], columns: List[List[str]]):
+        order = np.argsort(symbols)
+        # Les APIs renvoient des chaînes: une seule conversion vectorisée par colonne
+        price, change, volume, volume_change = (np.array(column, dtype=np.float64)[order] for column in columns)
+        return cls(exchange, timestamp, np.array(symbols)[order], price, change, volume, volume_change)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+
+def fetch_binance_snapshot(session: requests.Session) -> TickerSnapshot:
+    """Ticker 24h de toutes les paires Binance (une requête, paires USDT conservées)"""
+    response = session.get(BINANCE_TICKER_24H, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    quote = QUOTE_ASSETS['Binance']
+    tickers = [t for t in response.json() if t['symbol'].endswith(quote) and float(t['lastPrice']) > 0]
+    return TickerSnapshot.from_columns('Binance', time.time(), [t['symbol'] for t in tickers], [
+        [t['lastPrice'] for t in tickers],
+        [t['priceChangePercent'] for t in tickers],
+        [t['quoteVolume'] for t in tickers],
+        [np.nan] * len(tickers)
+    ])
+
+
+def fetch_coinbase_snapshot(session: requests.Session) -> TickerSnapshot:
+    """Produits Coinbase avec stats 24h (une requête, paires USD en ligne)"""
+    response = session.get(COINBASE_MARKET_PRODUCTS, params={'product_type': 'SPOT'}, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    quote = QUOTE_ASSETS['Coinbase']
+    products = [
+        p for p in response.json().get('products', [])
+        if p.get('quote_currency_id') == quote and p.get('status') == 'online' and p.get('price')
+        and not p.get('trading_disabled')
+    ]
+    return TickerSnapshot.from_columns('Coinbase', time.time(), [p['product_id'] for p in products], [
+        [p['price'] for p in products],
+        [p.get('price_percentage_change_24h') or 0 for p in products],
+        [float(p.get('volume_24h') or 0) * float(p['price']) for p in products],
+        [p.get('volume_percentage_change_24h') or np.nan for p in products]
+    ])
+
+
+SNAPSHOT_FETCHERS: Dict[str, Callable[[requests.Session], TickerSnapshot]] = {
+    'Binance': fetch_binance_snapshot,
+    'Coinbase': fetch_coinbase_snapshot
+}
+
+
+def align_previous(current: TickerSnapshot, previous: Optional[TickerSnapshot]):
+    """Index de chaque symbole courant dans le snapshot précédent (-1 si absent)"""
+    if previous is None or len(previous) == 0:
+        return np.full(len(current), -1)
+    position = np.searchsorted(previous.symbols, current.symbols)
+    position = np.minimum(position, len(previous) - 1)
+    return np.where(previous.symbols[position] == current.symbols, position, -1)
+
+
+def score_snapshot(current: TickerSnapshot, previous: Optional[TickerSnapshot]) -> Dict[str, np.ndarray]:
+    """
+    Métriques vectorisées par paire
+    - scan_return: variation depuis le scan précédent (%)
+    - volume_spike: rythme du volume entre deux scans / rythme moyen sur 24h
+      (le volume 24h glissant augmente vite quand un pump démarre)
+    """
+    matched = align_previous(current, previous)
+    has_previous = matched >= 0
+    scan_return = np.full(len(current), np.nan)
+    volume_spike = np.full(len(current), np.nan)
+
+    if previous is not None and has_previous.any():
+        prev_index = matched[has_previous]
+        elapsed = max(current.timestamp - previous.timestamp, 1e-9)
+        scan_return[has_previous] = (current.price[has_previous] / previous.price[prev_index] - 1) * 100
+        added = current.quote_volume[has_previous] - previous.quote_volume[prev_index]
+        average_rate = current.quote_volume[has_previous] / 86400
+        with np.errstate(divide='ignore', invalid='ignore'):
+            spike = np.where(average_rate > 0, (added / elapsed) / average_rate, np.nan)
+        volume_spike[has_previous] = spike
+
+    # Sans historique, l'exchange donne parfois la variation du volume sur 24h
+    fallback = np.isnan(volume_spike) & ~np.isnan(current.volume_change_24h)
+    volume_spike[fallback] = 1 + current.volume_change_24h[fallback] / 100
+
+    return {'scan_return': scan_return, 'volume_spike': volume_spike}
+
+
+class UniverseScanner:
+    """
+    Scan de tout l'univers listé: un snapshot par exchange, classement des pumps
+    au-dessus de detection_threshold (variation 24h en %)
+    Partagé entre requêtes (threads): refresh et scoring sous verrou, un seul fetch par snapshot périmé
+    """
+
+    def __init__(self, exchanges: Sequence[str] = tuple(SNAPSHOT_FETCHERS), symbol_index: Optional[SymbolIndex] = None,
+                 session: Optional[requests.Session] = None, min_interval: float = MIN_SCAN_INTERVAL,
+                 fetchers: Optional[Dict[str, Callable[[requests.Session], TickerSnapshot]]] = None):
+        self.fetchers = fetchers or SNAPSHOT_FETCHERS
+        unknown = [exchange for exchange in exchanges if exchange not in self.fetchers]
+        if unknown:
+            raise ValueError(f"Exchange inconnu: {', '.join(unknown)} (valeurs: {', '.join(self.fetchers)})")
+        self.exchanges = list(exchanges)
+        self.symbol_index = symbol_index
+        self.session = session or requests.Session()
+        self.min_interval = min_interval
+        self.snapshots: Dict[str, TickerSnapshot] = {}
+        self.previous: Dict[str, TickerSnapshot] = {}
+        self.errors: Dict[str, str] = {}
+        self.scans = 0
+        self._lock = threading.RLock()
+
+    def refresh(self, force: bool = False) -> Dict[str, TickerSnapshot]:
+        """Met à jour les snapshots trop anciens (un exchange en panne n'empêche pas le scan des autres)"""
+        with self._lock:
+            return self._refresh(force)
+
+    def _refresh(self, force: bool) -> Dict[str, TickerSnapshot]:
+        # Verrou tenu: une requête concurrente attend puis trouve le snapshot frais (pas de double fetch,
+        # et previous n'est jamais remplacé par un snapshot vieux de quelques millisecondes)
+        now = time.time()
+        for exchange in self.exchanges:
+            snapshot = self.snapshots.get(exchange)
+            if not force and snapshot is not None and now - snapshot.timestamp < self.min_interval:
+                continue
+            try:
+                fresh = self.fetchers[exchange](self.session)
+            except Exception as e:
+                self.errors[exchange] = str(e)
+                print(f"⚠️ Scanner {exchange}: {e}")
+                continue
+            self.errors.pop(exchange, None)
+            if snapshot is not None:
+                self.previous[exchange] = snapshot
+            self.snapshots[exchange] = fresh
+        self.scans += 1
+        return self.snapshots
+
+    def scan(self, detection_threshold: float = 30, min_quote_volume: float = 0.0, limit: int = 50,
+             sort_by: str = 'change_24h', force: bool = False) -> Dict:
+        """Candidats classés, toutes paires et tous exchanges confondus"""
+        with self._lock:
+            return self._scan(detection_threshold, min_quote_volume, limit, sort_by, force)
+
+    def _scan(self, detection_threshold: float, min_quote_volume: float, limit: int, sort_by: str,
+              force: bool) -> Dict:
+        self._refresh(force)
+        candidates = []
+        universe = 0
+        for exchange, snapshot in self.snapshots.items():
+            universe += len(snapshot)
+            metrics = score_snapshot(snapshot, self.previous.get(exchange))
+            mask = (snapshot.change_24h >= detection_threshold) & (snapshot.quote_volume >= min_quote_volume)
+            for i in np.flatnonzero(mask):
+                symbol = str(snapshot.symbols[i])
+                candidates.append({
+                    'exchange': exchange,
+                    'symbol': symbol,
+                    'coin_id': self.symbol_index.coin_for(exchange, symbol) if self.symbol_index is not None else None,
+                    'price': float(snapshot.price[i]),
+                    'change_24h': float(snapshot.change_24h[i]),
+                    'quote_volume': float(snapshot.quote_volume[i]),
+                    'scan_return': _optional(metrics['scan_return'][i]),
+                    'volume_spike': _optional(metrics['volume_spike'][i])
+                })
+
+        candidates.sort(key=lambda c: c[sort_by] if c[sort_by] is not None else float('-inf'), reverse=True)
+        return {
+            'timestamp': time.time(),
+            'universe': universe,
+            'detection_threshold': detection_threshold,
+            'total_candidates': len(candidates),
+            'candidates': candidates[:limit],
+            'errors': dict(self.errors)
+        }
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                'exchanges': self.exchanges,
+                'scans': self.scans,
+                'pairs': {exchange: len(snapshot) for exchange, snapshot in self.snapshots.items()},
+                'snapshot_age_seconds': {
+                    exchange: time.time() - snapshot.timestamp for exchange, snapshot in self.snapshots.items()
+                },
+                'errors': dict(self.errors)
+            }
+
+
+def _optional(value) -> Optional[float]:
+    return None if np.isnan(value) else float(value)
@@ -0,0 +1,158 @@
+"""
+📐 Sensibilité des métriques aux paramètres de sortie - Différences centrées
+Chaque paramètre (stop_loss, tp1..tp5, position_size) est décalé de ±h autour de la config,
+et toutes les perturbations sont scorées sur les MÊMES trades (nombres aléatoires communs):
+l'écart entre x+h et x-h ne mesure que l'effet du paramètre, pas le bruit de simulation.
+Plusieurs jeux de trades indépendants (réplications) donnent l'erreur standard des gradients
+"""
+
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.analysis_runner import register_analysis
+from core.job_scheduler import CancelToken, JobCancelled, is_cancel_requested
+from core.path_bank import SharedArraysDescriptor, acquire_path_bank, attach_trade_batch
+from core.simulation import PARAM_NAMES, TradeBatch, params_from_config, score_params, simulate_trade_batch
+from models.schemas import SensitivityRequest
+
+SENSITIVITY_METRICS = ('total_return', 'sharpe_ratio', 'max_drawdown', 'volatility', 'win_rate', 'profit_factor')
+
+
+def perturbation_grid(base: np.ndarray, indices: Sequence[int], relative_step: float,
+                      min_step: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Grille (1 + 2P, n_params): la config, puis x+h et x-h pour chaque paramètre
+    Pas h = relative_step x |x|, au moins min_step (paramètres proches de 0)
+    """
+    steps = np.array([max(abs(base[index]) * relative_step, min_step) for index in indices])
+    rows = [base]
+    for index, step in zip(indices, steps):
+        for sign in (1, -1):
+            row = base.copy()
+            row[index] += sign * step
+            rows.append(row)
+    return np.array(rows), steps
+
+
+def score_grid(batch: TradeBatch, grid: np.ndarray, initial_capital: float,
+               cancel_flag: Optional[str] = None) -> Dict[str, np.ndarray]:
+    """Métriques (K,) de toute la grille sur un jeu de trades, en une passe"""
+    if is_cancel_requested(cancel_flag):
+        raise JobCancelled()
+    scores = score_params(batch, grid, initial_capital)
+    return {metric: scores[metric] for metric in SENSITIVITY_METRICS}
+
+
+def score_grid_on_bank(bank: SharedArraysDescriptor, grid: np.ndarray, initial_capital: float,
+                       cancel_flag: Optional[str] = None) -> Dict[str, np.ndarray]:
+    """score_grid sur une banque partagée (exécuté en worker)"""
+    return score_grid(attach_trade_batch(bank), grid, initial_capital, cancel_flag)
+
+
+def _finite(value) -> Optional[float]:
+    """NaN / inf -> None (JSON)"""
+    value = float(value)
+    return value if np.isfinite(value) else None
+
+
+def central_differences(values: Dict[str, np.ndarray], parameters: List[str], base: np.ndarray,
+                        indices: Sequence[int], steps: np.ndarray) -> Dict[str, Dict]:
+    """
+    Gradients, erreurs standard et élasticités par métrique
+    values: métrique -> (R, 1 + 2P) pour R réplications
+    élasticité = gradient x paramètre / métrique: variation relative de la métrique pour +1% du paramètre
+    """
+    sensitivities = {}
+    for metric, table in values.items():
+        table = np.nan_to_num(table, nan=0.0, posinf=0.0, neginf=0.0)
+        base_value = table[:, 0].mean()
+        gradients = (table[:, 1::2] - table[:, 2::2]) / (2 * steps)       # (R, P)
+        gradient = gradients.mean(axis=0)
+        std_error = gradients.std(axis=0, ddof=1) / np.sqrt(len(gradients)) if len(gradients) > 1 else None
+
+        per_parameter = {}
+        for position, (name, index) in enumerate(zip(parameters, indices)):
+            elasticity = gradient[position] * base[index] / base_value if base_value else np.nan
+            per_parameter[name] = {
+                'gradient': _finite(gradient[position]),
+                'std_error': _finite(std_error[position]) if std_error is not None else None,
+                'elasticity': _finite(elasticity),
+                'step': float(steps[position])
+            }
+        ranked = sorted(per_parameter, key=lambda name: -abs(per_parameter[name]['elasticity'] or 0.0))
+        sensitivities[metric] = {
+            'value': _finite(base_value),
+            'parameters': per_parameter,
+            'most_sensitive': ranked[0] if ranked else None
+        }
+    return sensitivities
+
+
+@register_analysis("sensitivity", SensitivityRequest)
+def run_sensitivity(request: SensitivityRequest, progress: Optional[Callable[[float, str], None]] = None,
+                    cancel_token: Optional[CancelToken] = None) -> Dict:
+    """
+    Sensibilité locale de la config
+    - une réplication = un jeu de trades (banque partagée), scoré pour toutes les perturbations à la fois
+    - les réplications tournent en parallèle dans un pool de process
+    """
+    config = request.config
+    progress = progress or (lambda percent, message: None)
+
+    unknown = [name for name in request.parameters if name not in PARAM_NAMES]
+    if unknown or not request.parameters:
+        raise ValueError(f"Paramètres inconnus: {', '.join(unknown) or 'aucun'} (valeurs: {', '.join(PARAM_NAMES)})")
+    if request.relative_step <= 0 or request.min_step <= 0:
+        raise ValueError("relative_step et min_step doivent être positifs")
+    if request.replications < 1:
+        raise ValueError("replications doit être d'au moins 1")
+
+    start_date = datetime(config.start_year, config.start_month, 1)
+    end_date = datetime(config.end_year, config.end_month, 1)
+    n_months = (end_date.year - start_date.year) * 12 + (end_date.month - start_date.month) + 1
+
+    seed = request.seed if request.seed is not None else random.randrange(2 ** 32)
+    replicate_seeds = [int(s) for s in np.random.SeedSequence(seed).generate_state(request.replications)]
+    base = params_from_config(config)[0]
+    indices = [PARAM_NAMES.index(name) for name in request.parameters]
+    grid, steps = perturbation_grid(base, indices, request.relative_step, request.min_step)
+
+    progress(5.0, f"📐 {len(grid)} configs x {request.replications} jeux de trades ({n_months} mois)")
+    cancel_flag = cancel_token.shared_flag_name() if cancel_token is not None else None
+    max_workers = request.max_workers or min(request.replications, os.cpu_count() or 1)
+    results: List[Dict[str, np.ndarray]] = []
+
+    if max_workers > 1 and request.replications > 1:
+        with ExitStack() as stack:
+            banks = [stack.enter_context(acquire_path_bank(replicate_seed, n_months, config.max_holding_days))
+                     for replicate_seed in replicate_seeds]
+            executor = stack.enter_context(ProcessPoolExecutor(max_workers=max_workers))
+            if cancel_token is not None:
+                cancel_token.add_callback(lambda: executor.shutdown(wait=False, cancel_futures=True))
+            futures = [executor.submit(score_grid_on_bank, bank.descriptor, grid, config.initial_capital, cancel_flag)
+                       for bank in banks]
+            for done, future in enumerate(futures, 1):
+                results.append(future.result())
+                progress(5.0 + 90.0 * done / len(futures), f"📐 Réplication {done}/{len(futures)}")
+    else:
+        for done, replicate_seed in enumerate(replicate_seeds, 1):
+            batch = simulate_trade_batch(replicate_seed, n_months, config.max_holding_days)
+            results.append(score_grid(batch, grid, config.initial_capital, cancel_flag))
+            progress(5.0 + 90.0 * done / len(replicate_seeds), f"📐 Réplication {done}/{len(replicate_seeds)}")
+
+    values = {metric: np.stack([result[metric] for result in results]) for metric in SENSITIVITY_METRICS}
+    return {
+        'type': 'sensitivity',
+        'config': config.dict(),
+        'seed': seed,
+        'months': n_months,
+        'replications': request.replications,
+        'parameters': {name: float(base[index]) for name, index in zip(request.parameters, indices)},
+        'sensitivities': central_differences(values, request.parameters, base, indices, steps)
+    }
@@ -0,0 +1,335 @@
+"""
+⚡ Simulation vectorisée - Même modèle que generate_realistic_performance()
+Génère les trades d'un mois en une passe NumPy et score des centaines de configs de sortie
+sur les MÊMES trades (sweeps, walk-forward, ...) sans relancer la simulation
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+# Paramètres de sortie scorables, dans l'ordre des colonnes des matrices de params
+PARAM_NAMES = ("stop_loss", "tp1", "tp2", "tp3", "tp4", "tp5", "position_size")
+
+TRADING_FEES = 40  # Frais fixes par trade (identiques au GUI)
+
+# Mêmes memecoins que simulate_month_with_coingecko()
+MEMECOIN_LIST = [
+    'dogecoin', 'shiba-inu', 'pepe', 'floki', 'bonk',
+    'wojak', 'mog-coin', 'based-brett', 'book-of-meme',
+    'dogwifcoin', 'cat-in-a-dogs-world', 'memecoin-2'
+]
+
+
+@dataclass(frozen=True)
+class MarketModel:
+    """Paramètres du modèle de marché (vos découvertes)"""
+    base_trend_mean: float = 1.5
+    base_trend_std: float = 3.0
+    volatility_min: float = 40
+    volatility_max: float = 80
+    moon_shot_probability: float = 0.08
+    pump_probability: float = 0.05
+    dump_probability: float = 0.12
+    min_trades: int = 8
+    max_trades: int = 15
+
+    @classmethod
+    def from_dict(cls, values: Dict) -> "MarketModel":
+        return cls(**{key: values[key] for key in cls.__dataclass_fields__ if key in values})
+
+
+@dataclass
+class TradeBatch:
+    """
+    Trades simulés sur une suite de mois
+    daily_returns: (n_trades, max_holding_days) en points de %
+    month_index: index (0..n_months-1) du mois de chaque trade, trié
+    """
+    daily_returns: np.ndarray
+    month_index: np.ndarray
+    coin_index: np.ndarray
+    n_months: int
+
+    @property
+    def performance(self) -> np.ndarray:
+        """Performance cumulée à max_holding_days (ce que voit apply_exit_rules)"""
+        return self.daily_returns.sum(axis=1)
+
+    @property
+    def trades_per_month(self) -> np.ndarray:
+        return np.bincount(self.month_index, minlength=self.n_months)
+
+    def slice_months(self, start: int, end: int) -> "TradeBatch":
+        """Sous-ensemble des mois [start, end) - vue sans copie des trades"""
+        lo, hi = np.searchsorted(self.month_index, [start, end])
+        return TradeBatch(
+            daily_returns=self.daily_returns[lo:hi],
+            month_index=self.month_index[lo:hi] - start,
+            coin_index=self.coin_index[lo:hi],
+            n_months=end - start
+        )
+
+
+def simulate_daily_returns(rng: np.random.Generator, n_trades: int, days: int,
+                           model: MarketModel = MarketModel()) -> np.ndarray:
+    """Rendements journaliers (points de %) de n_trades trades - version vectorisée du modèle GUI"""
+    base_trend = rng.normal(model.base_trend_mean, model.base_trend_std, size=(n_trades, 1))
+    volatility = rng.uniform(model.volatility_min, model.volatility_max, size=(n_trades, 1))
+    daily = rng.normal(base_trend, volatility / 12, size=(n_trades, days))
+
+    # Events spéciaux - même ordre de priorité que la boucle originale
+    random_event = rng.random((n_trades, days))
+    moon = random_event < model.moon_shot_probability
+    pump = ~moon & (random_event < model.pump_probability)
+    dump = ~moon & ~pump & (random_event < model.dump_probability)
+
+    daily[moon] += rng.uniform(200, 800, size=moon.sum())
+    daily[pump] += rng.uniform(50, 150, size=pump.sum())
+    daily[dump] -= rng.uniform(30, 60, size=dump.sum())
+    return daily
+
+
+def _month_trade_count(rng: np.random.Generator, model: MarketModel) -> int:
+    """Premier tirage du mois: nombre de trades (rejouable seul pour dimensionner une banque)"""
+    return int(rng.integers(model.min_trades, model.max_trades + 1))
+
+
+@lru_cache(maxsize=1024)
+def _simulate_month(seed: int, month: int, days: int, model: MarketModel):
+    rng = np.random.default_rng([seed, month, days])
+    n_trades = _month_trade_count(rng, model)
+    daily = simulate_daily_returns(rng, n_trades, days, model)
+    coins = rng.integers(0, len(MEMECOIN_LIST), size=n_trades)
+    daily.setflags(write=False)
+    coins.setflags(write=False)
+    return daily, coins
+
+
+def simulate_trade_batch(seed: int, n_months: int, max_holding_days: int,
+                         model: MarketModel = MarketModel(), first_month: int = 1) -> TradeBatch:
+    """
+    Simule n_months mois de trades, déterministe par (seed, mois)
+    Chaque mois est mis en cache: les sweeps et fenêtres qui se recouvrent le réutilisent
+    """
+    months = [_simulate_month(seed, month, max_holding_days, model)
+              for month in range(first_month, first_month + n_months)]
+
+    daily_returns = np.concatenate([daily for daily, _ in months]) if months else np.empty((0, max_holding_days))
+    coin_index = np.concatenate([coins for _, coins in months]) if months else np.empty(0, dtype=np.int64)
+    month_index = np.repeat(np.arange(n_months), [len(coins) for _, coins in months])
+
+    return TradeBatch(daily_returns=daily_returns, month_index=month_index, coin_index=coin_index, n_months=n_months)
+
+
+# ============================================================================
+# SCORING VECTORISÉ DE CONFIGS DE SORTIE
+# ============================================================================
+
+def params_from_config(config) -> np.ndarray:
+    """Ligne de params (PARAM_NAMES) depuis un BacktestConfig"""
+    return np.array([[getattr(config, name) for name in PARAM_NAMES]], dtype=np.float64)
+
+
+def params_to_dict(row: Sequence[float]) -> Dict[str, float]:
+    return {name: float(value) for name, value in zip(PARAM_NAMES, row)}
+
+
+def apply_exit_rules_vectorized(performance: np.ndarray, stop_loss: np.ndarray, take_profits: np.ndarray) -> np.ndarray:
+    """
+    Règles de sortie du GUI pour K configs x T trades
+    performance: (T,), stop_loss: (K,), take_profits: (K, n_tp) -> (K, T)
+    Stop loss prioritaire, sinon le plus haut TP atteint, sinon la performance brute
+    """
+    take_profits = np.sort(take_profits, axis=1)
+    perf = np.broadcast_to(performance, (len(stop_loss), len(performance)))
+
+    # Nombre de TP <= performance pour chaque (config, trade)
+    reached = (perf[:, :, None] >= take_profits[:, None, :]).sum(axis=2)
+    highest_tp = np.take_along_axis(take_profits, np.maximum(reached - 1, 0), axis=1)
+    returns = np.where(reached > 0, highest_tp, perf)
+
+    return np.where(perf <= stop_loss[:, None], stop_loss[:, None], returns)
+
+
+# Raisons de sortie (codes compacts)
+EXIT_MAX_HOLDING = 0   # Tenu jusqu'à max_holding_days
+EXIT_STOP_LOSS = 1     # Stop loss touché avant tout TP
+EXIT_TP_LOCK = 2       # Retombé sur le dernier TP verrouillé
+EXIT_TOP_TP = 3        # Plus haut TP touché: sortie immédiate
+EXIT_REASONS = {
+    EXIT_MAX_HOLDING: 'max_holding',
+    EXIT_STOP_LOSS: 'stop_loss',
+    EXIT_TP_LOCK: 'take_profit',
+    EXIT_TOP_TP: 'top_take_profit'
+}
+
+# Taille max (éléments) des tableaux intermédiaires K x T x D x n_tp
+FIRST_TOUCH_CHUNK = 8_000_000
+
+
+@dataclass
+class ExitResult:
+    """Sorties path-dépendantes de K configs x T trades"""
+    returns: np.ndarray        # (K, T) rendement comptabilisé (%)
+    holding_days: np.ndarray   # (K, T) jours réellement tenus
+    exit_reason: np.ndarray    # (K, T) code EXIT_*
+
+
+def first_touch_exits(daily_returns: np.ndarray, stop_loss: np.ndarray, take_profits: np.ndarray,
+                      max_holding_days: Optional[int] = None) -> ExitResult:
+    """
+    🎯 Sorties au PREMIER contact, jour par jour, sans boucle Python sur les jours
+    - avant tout TP: sortie au premier jour où le cumul touche le stop loss
+    - chaque TP touché (max courant du cumul) verrouille son niveau: le stop remonte à ce TP
+    - le plus haut TP touché déclenche une sortie immédiate
+    - sinon sortie à max_holding_days avec les règles du GUI sur la performance finale
+    daily_returns: (T, D) en points de %, stop_loss: (K,), take_profits: (K, n_tp)
+    """
+    if max_holding_days is not None:
+        daily_returns = daily_returns[:, :max_holding_days]
+    n_trades, n_days = daily_returns.shape
+    stop_loss = np.atleast_1d(np.asarray(stop_loss, dtype=np.float64))
+    take_profits = np.sort(np.atleast_2d(np.asarray(take_profits, dtype=np.float64)), axis=1)
+    n_configs, n_levels = take_profits.shape
+
+    returns = np.empty((n_configs, n_trades))
+    holding_days = np.empty((n_configs, n_trades), dtype=np.int16)
+    exit_reason = np.empty((n_configs, n_trades), dtype=np.int8)
+    if n_trades == 0 or n_days == 0:
+        return ExitResult(returns, holding_days, exit_reason)
+
+    cumulative = np.cumsum(daily_returns, axis=1)                       # (T, D)
+    running_max = np.maximum.accumulate(cumulative, axis=1)             # (T, D)
+    # Max atteint à la VEILLE de chaque jour: détermine le TP verrouillé ce jour-là
+    previous_max = np.concatenate([np.full((n_trades, 1), -np.inf), running_max[:, :-1]], axis=1)
+    final = cumulative[:, -1]
+
+    chunk = max(1, FIRST_TOUCH_CHUNK // (n_trades * n_days * n_levels))
+    for lo in range(0, n_configs, chunk):
+        hi = min(lo + chunk, n_configs)
+        tps = take_profits[lo:hi]                                       # (k, n)
+        stops = stop_loss[lo:hi, None, None]                            # (k, 1, 1)
+
+        locked = (previous_max[None, :, :, None] >= tps[:, None, None, :]).sum(axis=3)   # (k, T, D)
+        lock_value = np.take_along_axis(tps, np.maximum(locked - 1, 0).reshape(hi - lo, -1), axis=1)
+        lock_value = lock_value.reshape(locked.shape)
+
+        hit_stop = (locked == 0) & (cumulative[None] <= stops)
+        hit_lock = (locked > 0) & (cumulative[None] <= lock_value)
+        hit_top = cumulative[None] >= tps[:, -1, None, None]
+        triggered = hit_stop | hit_lock | hit_top
+
+        # Recherche du premier franchissement: argmax sur le masque booléen
+        first_day = triggered.argmax(axis=2)                            # (k, T)
+        has_exit = triggered.any(axis=2)
+
+        def at_first_day(values):
+            return np.take_along_axis(values, first_day[:, :, None], axis=2)[:, :, 0]
+
+        reason = np.select(
+            [~has_exit, at_first_day(hit_stop), at_first_day(hit_lock)],
+            [EXIT_MAX_HOLDING, EXIT_STOP_LOSS, EXIT_TP_LOCK],
+            default=EXIT_TOP_TP
+        )
+        at_end = apply_exit_rules_vectorized(final, stop_loss[lo:hi], tps)
+        booked = np.select(
+            [reason == EXIT_MAX_HOLDING, reason == EXIT_STOP_LOSS, reason == EXIT_TP_LOCK],
+            [at_end, np.broadcast_to(stop_loss[lo:hi, None], at_end.shape), at_first_day(lock_value)],
+            default=np.broadcast_to(tps[:, -1:], at_end.shape)
+        )
+
+        returns[lo:hi] = booked
+        holding_days[lo:hi] = np.where(has_exit, first_day + 1, n_days)
+        exit_reason[lo:hi] = reason
+
+    return ExitResult(returns, holding_days, exit_reason)
+
+
+def prices_to_daily_returns(prices: Sequence[float], days: int) -> np.ndarray:
+    """Convertit une série de prix réels en incréments journaliers (days,) du cumul (p/p0 - 1) x 100"""
+    prices = np.asarray(prices, dtype=np.float64)
+    cumulative = (prices / prices[0] - 1) * 100
+    # Ré-échantillonne la série (horaire, journalière...) sur la période de holding
+    sample = np.linspace(0, len(prices) - 1, days + 1).round().astype(int)
+    return np.diff(cumulative[sample])
+
+
+def exit_returns(batch: TradeBatch, params: np.ndarray) -> np.ndarray:
+    """Rendements finaux (K, T) des trades du batch sous K configs (sorties path-dépendantes)"""
+    return first_touch_exits(batch.daily_returns, params[:, 0], params[:, 1:6]).returns
+
+
+def compound_capital(initial_capital, trade_returns: np.ndarray, position_size: np.ndarray,
+                     fees: float = TRADING_FEES) -> np.ndarray:
+    """
+    Capital après chaque trade, sans boucle Python
+    Récurrence du GUI: c_k = c_{k-1} * (1 + a_k) - fees, a_k = position% * return%
+    Forme fermée: c_n = G_n * (c_0 - fees * sum_{k<=n} 1/G_k), G = cumprod(1 + a)
+    """
+    growth = 1 + (position_size[:, None] / 100) * (trade_returns / 100)
+    growth = np.maximum(growth, 1e-12)
+    cumulative = np.cumprod(growth, axis=1)
+    initial = np.asarray(initial_capital, dtype=np.float64).reshape(-1, 1)
+    return cumulative * (initial - fees * np.cumsum(1 / cumulative, axis=1))
+
+
+def score_params(batch: TradeBatch, params: np.ndarray, initial_capital: float,
+                 fees: float = TRADING_FEES, returns: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """
+    Métriques de calculate_final_metrics() pour K configs en une passe
+    Retourne un dict de tableaux (K,) + la courbe de capital mensuelle (K, n_months + 1)
+    """
+    params = np.atleast_2d(params)
+    if returns is None:
+        returns = exit_returns(batch, params)
+    n_configs = len(params)
+
+    capital_after = compound_capital(initial_capital, returns, params[:, 6], fees)
+    capital_path = np.concatenate([np.full((n_configs, 1), float(initial_capital)), capital_after], axis=1)
+    month_ends = np.cumsum(batch.trades_per_month)
+    monthly_capital = np.concatenate([capital_path[:, :1], capital_path[:, month_ends]], axis=1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        monthly_returns = np.diff(monthly_capital, axis=1) / monthly_capital[:, :-1] * 100
+        total_return = (monthly_capital[:, -1] - initial_capital) / initial_capital * 100
+
+        volatility = monthly_returns.std(axis=1) if batch.n_months else np.zeros(n_configs)
+        mean_monthly = monthly_returns.mean(axis=1) if batch.n_months else np.zeros(n_configs)
+        sharpe_ratio = np.where(volatility > 0, mean_monthly / volatility, 0.0)
+
+        peaks = np.maximum.accumulate(monthly_capital, axis=1)
+        max_drawdown = ((peaks - monthly_capital) / peaks * 100).max(axis=1)
+
+        wins = returns > 0
+        n_trades = returns.shape[1]
+        n_wins = wins.sum(axis=1)
+        gains = np.where(wins, returns, 0).sum(axis=1)
+        losses = np.where(~wins, returns, 0).sum(axis=1)
+        win_rate = n_wins / n_trades * 100 if n_trades else np.zeros(n_configs)
+        profit_factor = np.where(losses != 0, gains / np.abs(losses), 0.0)
+        avg_gain = np.where(n_wins > 0, gains / np.maximum(n_wins, 1), 0.0)
+        avg_loss = np.where(n_trades - n_wins > 0, losses / np.maximum(n_trades - n_wins, 1), 0.0)
+
+    return {
+        'total_return': total_return,
+        'win_rate': win_rate,
+        'volatility': volatility,
+        'max_drawdown': max_drawdown,
+        'sharpe_ratio': sharpe_ratio,
+        'profit_factor': profit_factor,
+        'best_trade': returns.max(axis=1) if n_trades else np.zeros(n_configs),
+        'worst_trade': returns.min(axis=1) if n_trades else np.zeros(n_configs),
+        'avg_gain': avg_gain,
+        'avg_loss': avg_loss,
+        'final_capital': monthly_capital[:, -1],
+        'monthly_capital': monthly_capital,
+        'monthly_returns': monthly_returns
+    }
+
+
+def metrics_row(scores: Dict[str, np.ndarray], index: int) -> Dict[str, float]:
+    """Métriques scalaires d'une config (sans les courbes)"""
+    return {key: float(values[index]) for key, values in scores.items() if values.ndim == 1}
@@ -0,0 +1,280 @@
+"""
+🗂️ Index des symboles - Découverte automatique des paires listées
+Construit à partir des listings Binance/Coinbase et de la liste des coins CoinGecko,
+mis en cache sur disque avec un TTL. Lookups O(1) coin_id -> symbole d'exchange et inverse
+Les mappings écrits à la main restent prioritaires (overrides)
+"""
+
+import json
+import os
+import threading
+import time
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import requests
+
+DEFAULT_CACHE_PATH = os.environ.get("SYMBOL_INDEX_PATH", "data/symbol_index.json")
+DEFAULT_TTL_SECONDS = float(os.environ.get("SYMBOL_INDEX_TTL", 24 * 3600))
+RETRY_DELAY_SECONDS = 600  # Après un échec réseau, pas de nouvelle tentative avant 10 min
+REQUEST_TIMEOUT = 15
+
+BINANCE_EXCHANGE_INFO = "https://api.binance.com/api/v3/exchangeInfo"
+COINBASE_PRODUCTS = "https://api.exchange.coinbase.com/products"
+COINGECKO_COINS_LIST = "https://api.coingecko.com/api/v3/coins/list"
+
+# Devise de cotation retenue par exchange (même convention que les mappings existants)
+QUOTE_ASSETS = {
+    'Binance': 'USDT',
+    'Coinbase': 'USD'
+}
+
+
+def fetch_binance_pairs(session: requests.Session) -> Dict[str, str]:
+    """Actif de base -> symbole Binance (paires USDT actives)"""
+    response = session.get(BINANCE_EXCHANGE_INFO, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    return {
+        item['baseAsset'].upper(): item['symbol']
+        for item in response.json().get('symbols', [])
+        if item.get('quoteAsset') == QUOTE_ASSETS['Binance'] and item.get('status') == 'TRADING'
+    }
+
+
+def fetch_coinbase_pairs(session: requests.Session) -> Dict[str, str]:
+    """Actif de base -> produit Coinbase (paires USD actives)"""
+    response = session.get(COINBASE_PRODUCTS, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    return {
+        item['base_currency'].upper(): item['id']
+        for item in response.json()
+        if item.get('quote_currency') == QUOTE_ASSETS['Coinbase']
+        and item.get('status') == 'online' and not item.get('trading_disabled')
+    }
+
+
+def fetch_coingecko_coins(session: requests.Session) -> List[Dict[str, str]]:
+    """[{id, symbol, name}] de tous les coins CoinGecko"""
+    response = session.get(COINGECKO_COINS_LIST, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    return response.json()
+
+
+def resolve_base_assets(coins: List[Dict[str, str]], overrides: Dict[str, Dict[str, str]],
+                        tracked: Iterable[str] = ()) -> Dict[str, str]:
+    """
+    Ticker -> coin_id CoinGecko
+    Un ticker est partagé par des dizaines de coins (PEPE, MOG...): les overrides l'emportent,
+    puis le seul coin suivi par le moteur (tracked: "mog-coin" pour MOG, "based-brett" pour BRETT),
+    puis le coin dont l'id ou le nom correspond au ticker; sinon le ticker est ambigu et ignoré.
+    Le symbole n'est retenu ensuite que si un exchange liste réellement la paire
+    """
+    tracked = set(tracked)
+    candidates: Dict[str, List[Dict[str, str]]] = {}
+    for coin in coins:
+        candidates.setdefault(coin['symbol'].upper(), []).append(coin)
+
+    resolved = {}
+    for ticker, options in candidates.items():
+        if len(options) == 1:
+            resolved[ticker] = options[0]['id']
+            continue
+        followed = [coin for coin in options if coin['id'] in tracked]
+        if len(followed) == 1:
+            resolved[ticker] = followed[0]['id']
+            continue
+        lowered = ticker.lower()
+        exact = [coin for coin in options if coin['id'] == lowered or coin['name'].lower() == lowered]
+        if len(exact) == 1:
+            resolved[ticker] = exact[0]['id']
+
+    # Overrides: les symboles connus fixent le coin de leur ticker
+    for coin_id, symbols in overrides.items():
+        for exchange, symbol in symbols.items():
+            quote = QUOTE_ASSETS.get(exchange, '')
+            base = symbol.replace('-', '')
+            base = base[:-len(quote)] if quote and base.endswith(quote) else base
+            resolved[base.upper()] = coin_id
+    return resolved
+
+
+class SymbolIndex(Mapping):
+    """
+    coin_id -> {exchange: symbole}, utilisable comme l'ancien dict symbol_mappings
+    Chargé paresseusement au premier accès depuis le cache disque. Un index périmé (ou absent) reste
+    servi pendant sa reconstruction en arrière-plan: aucun lookup n'attend le réseau
+    (cache périmé, puis overrides seuls tant que la reconstruction n'a pas abouti)
+    """
+
+    def __init__(self, overrides: Optional[Dict[str, Dict[str, str]]] = None,
+                 cache_path: str = DEFAULT_CACHE_PATH, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 session: Optional[requests.Session] = None, tracked: Iterable[str] = ()):
+        self.overrides = overrides or {}
+        self.tracked = tuple(tracked)  # Coins du moteur: départagent les tickers ambigus
+        self.cache_path = cache_path
+        self.ttl = ttl_seconds
+        self.session = session or requests.Session()
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()  # Une seule reconstruction à la fois (écriture du cache)
+        self._refreshing = False
+        self._coin_to_symbols: Dict[str, Dict[str, str]] = {}
+        self._symbol_to_coin: Dict[str, Dict[str, str]] = {}
+        self.built_at: Optional[float] = None
+        self.source = "overrides"
+        self._loaded = False
+        self._last_failure = 0.0
+
+    def __getstate__(self):
+        # Le verrou et la session HTTP ne passent pas aux process pools
+        state = self.__dict__.copy()
+        state.pop('_lock')
+        state.pop('_refresh_lock')
+        state.pop('session')
+        state['_refreshing'] = False
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self.session = requests.Session()
+
+    # ----- interface Mapping (compatibilité symbol_mappings) -----
+
+    def __getitem__(self, coin_id: str) -> Dict[str, str]:
+        self._ensure_fresh()
+        return self._coin_to_symbols[coin_id]
+
+    def __contains__(self, coin_id) -> bool:
+        self._ensure_fresh()
+        return coin_id in self._coin_to_symbols
+
+    def __iter__(self) -> Iterator[str]:
+        self._ensure_fresh()
+        return iter(self._coin_to_symbols)
+
+    def __len__(self) -> int:
+        self._ensure_fresh()
+        return len(self._coin_to_symbols)
+
+    # ----- lookups -----
+
+    def symbol_for(self, coin_id: str, exchange: str) -> Optional[str]:
+        """Symbole du coin sur l'exchange ('Binance', 'Coinbase'), None s'il n'y est pas listé"""
+        self._ensure_fresh()
+        return self._coin_to_symbols.get(coin_id, {}).get(exchange)
+
+    def coin_for(self, exchange: str, symbol: str) -> Optional[str]:
+        """coin_id correspondant à un symbole d'exchange"""
+        self._ensure_fresh()
+        return self._symbol_to_coin.get(exchange, {}).get(symbol.upper())
+
+    def coins_on(self, exchange: str) -> List[str]:
+        self._ensure_fresh()
+        return list(self._symbol_to_coin.get(exchange, {}).values())
+
+    # ----- construction et cache -----
+
+    @property
+    def is_stale(self) -> bool:
+        return self.built_at is None or time.time() - self.built_at > self.ttl
+
+    def _ensure_fresh(self):
+        """Charge le cache disque au premier accès; index périmé: reconstruction lancée en arrière-plan"""
+        if self._loaded and not self.is_stale:
+            return
+        with self._lock:
+            if not self._loaded:
+                self._load_cache()
+                self._loaded = True
+            if self.is_stale and not self._refreshing and time.time() - self._last_failure > RETRY_DELAY_SECONDS:
+                self._refreshing = True
+                threading.Thread(target=self._background_refresh, name="symbol-index-refresh", daemon=True).start()
+
+    def _background_refresh(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            self._last_failure = time.time()
+            print(f"⚠️ Index des symboles: reconstruction impossible ({e}) - {self.source} utilisé")
+        finally:
+            self._refreshing = False
+
+    def _load_cache(self):
+        if os.path.exists(self.cache_path):
+            try:
+                with open(self.cache_path) as f:
+                    cached = json.load(f)
+                self._set_mappings(cached['coins'], cached['built_at'], "cache")
+                return
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️ Cache d'index illisible ({e}), ignoré")
+        self._set_mappings({}, None, "overrides")
+
+    def _set_mappings(self, coins: Dict[str, Dict[str, str]], built_at: Optional[float], source: str):
+        mappings = {coin_id: dict(symbols) for coin_id, symbols in coins.items()}
+        for coin_id, symbols in self.overrides.items():
+            mappings.setdefault(coin_id, {}).update(symbols)
+
+        reverse: Dict[str, Dict[str, str]] = {}
+        for coin_id, symbols in mappings.items():
+            for exchange, symbol in symbols.items():
+                reverse.setdefault(exchange, {})[symbol.upper()] = coin_id
+
+        # Swap atomique des deux dicts: les lecteurs voient l'ancien ou le nouvel index, jamais un mélange
+        self._coin_to_symbols, self._symbol_to_coin = mappings, reverse
+        self.built_at = built_at
+        self.source = source
+
+    def refresh(self) -> Dict[str, int]:
+        """Reconstruit l'index depuis les exchanges et CoinGecko, puis l'écrit sur disque (bloquant)"""
+        with self._refresh_lock:
+            return self._rebuild()
+
+    def _rebuild(self) -> Dict[str, int]:
+        print("🗂️ Reconstruction de l'index des symboles...")
+        listings = {
+            'Binance': fetch_binance_pairs(self.session),
+            'Coinbase': fetch_coinbase_pairs(self.session)
+        }
+        base_to_coin = resolve_base_assets(fetch_coingecko_coins(self.session), self.overrides, self.tracked)
+
+        coins: Dict[str, Dict[str, str]] = {}
+        unresolved = 0
+        for exchange, pairs in listings.items():
+            for base, symbol in pairs.items():
+                coin_id = base_to_coin.get(base)
+                if coin_id is None:
+                    unresolved += 1
+                    continue
+                coins.setdefault(coin_id, {})[exchange] = symbol
+
+        built_at = time.time()
+        self._write_cache(coins, built_at)
+        self._set_mappings(coins, built_at, "exchanges")
+
+        stats = {exchange: len(pairs) for exchange, pairs in listings.items()}
+        stats.update({'coins': len(self._coin_to_symbols), 'unresolved': unresolved})
+        print(f"✅ Index des symboles: {stats['coins']} coins ({unresolved} paires non résolues)")
+        return stats
+
+    def _write_cache(self, coins: Dict[str, Dict[str, str]], built_at: float):
+        directory = os.path.dirname(self.cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({'built_at': built_at, 'coins': coins}, f)
+        os.replace(tmp_path, self.cache_path)
+
+    def get_stats(self) -> Dict:
+        self._ensure_fresh()
+        return {
+            'source': self.source,
+            'coins': len(self._coin_to_symbols),
+            'exchanges': {exchange: len(symbols) for exchange, symbols in self._symbol_to_coin.items()},
+            'built_at': self.built_at,
+            'stale': self.is_stale,
+            'refreshing': self._refreshing,
+            'ttl_seconds': self.ttl
+        }
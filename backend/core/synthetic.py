@@ -0,0 +1,143 @@
+"""
+🎲 Générateur de prix synthétiques - Fallback commun des APIs
+Remplace les boucles jour par jour de MultiCryptoAPI, CoinGeckoAPI et MockCoinGeckoAPI:
+rendements et events (moon shots, pumps, dumps) tirés en une passe, chemin par produit cumulé,
+plancher de prix appliqué en log (marche réfléchie). Mémoïsé par (coin, jours, seed) quand une seed est donnée
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class CoinClass:
+    """
+    Paramètres d'une famille de coins
+    Probabilités d'events exclusives par jour (moon shot, puis pump, puis dump),
+    amplitudes en fraction du prix (tirage uniforme dans l'intervalle)
+    """
+    daily_vol: float
+    moon_prob: float = 0.0
+    moon_range: Tuple[float, float] = (0.0, 0.0)
+    pump_prob: float = 0.0
+    pump_range: Tuple[float, float] = (0.0, 0.0)
+    dump_prob: float = 0.0
+    dump_range: Tuple[float, float] = (0.0, 0.0)
+    weekly_amplitude: float = 0.0  # Cycle de 7 jours ajouté au rendement
+    floor_ratio: float = 0.0  # Plancher relatif au prix initial
+    floor_price: float = 0.0  # Plancher absolu
+    base_price_range: Tuple[float, float] = (0.00001, 0.01)  # Prix initial des coins inconnus
+
+
+# Mêmes distributions que les anciennes boucles (probabilités effectives des if/elif)
+COIN_CLASSES: Dict[str, CoinClass] = {
+    # MultiCryptoAPI: bitcoin / ethereum
+    'major': CoinClass(daily_vol=0.05, moon_prob=0.005, moon_range=(0.3, 1.5), pump_prob=0.015,
+                       pump_range=(0.1, 0.4), weekly_amplitude=0.02, floor_ratio=0.01),
+    # MultiCryptoAPI: memecoins
+    'memecoin': CoinClass(daily_vol=0.12, moon_prob=0.02, moon_range=(0.3, 1.5), pump_prob=0.03,
+                          pump_range=(0.1, 0.4), dump_prob=0.03, dump_range=(0.15, 0.5),
+                          weekly_amplitude=0.02, floor_ratio=0.01),
+    # CoinGeckoAPI: 5% de chances de +60% ou -40%
+    'volatile': CoinClass(daily_vol=0.15, pump_prob=0.025, pump_range=(0.6, 0.6), dump_prob=0.025,
+                          dump_range=(0.4, 0.4), floor_price=0.00001, base_price_range=(0.00001, 0.1)),
+    # MockCoinGeckoAPI: moon shots fréquents, dumps violents
+    'mock': CoinClass(daily_vol=0.12, moon_prob=0.08, moon_range=(0.5, 2.0), dump_prob=0.92 * 0.12,
+                      dump_range=(0.3, 0.8), floor_price=0.00001, base_price_range=(0.00001, 0.001))
+}
+
+MAJOR_COINS = frozenset({'bitcoin', 'ethereum'})
+
+# Prix de base des coins connus (ordre de grandeur réel)
+BASE_PRICES = {
+    'bitcoin': 45000,
+    'ethereum': 2500,
+    'dogecoin': 0.08,
+    'shiba-inu': 0.000015,
+    'pepe': 0.000002,
+    'floki': 0.00005,
+    'bonk': 0.00001,
+    'wojak': 0.00008,
+    'dogwifcoin': 2.5,
+    'cat-in-a-dogs-world': 0.008
+}
+
+
+def coin_class_for(coin_id: str) -> str:
+    return 'major' if coin_id in MAJOR_COINS else 'memecoin'
+
+
+def synthetic_returns(rng: np.random.Generator, days: int, coin_class: CoinClass) -> np.ndarray:
+    """Rendements journaliers (fraction) avec events, en une passe"""
+    changes = rng.normal(0, coin_class.daily_vol, days)
+    event = rng.random(days)
+    magnitude = rng.random(days)
+
+    moon = event < coin_class.moon_prob
+    pump = ~moon & (event < coin_class.moon_prob + coin_class.pump_prob)
+    dump = ~moon & ~pump & (event < coin_class.moon_prob + coin_class.pump_prob + coin_class.dump_prob)
+
+    for mask, (low, high), sign in ((moon, coin_class.moon_range, 1), (pump, coin_class.pump_range, 1),
+                                    (dump, coin_class.dump_range, -1)):
+        changes[mask] += sign * (low + magnitude[mask] * (high - low))
+
+    if coin_class.weekly_amplitude:
+        changes += np.sin(2 * np.pi * np.arange(days) / 7) * coin_class.weekly_amplitude
+    return changes
+
+
+def apply_floor_path(base_price: float, changes: np.ndarray, floor: float) -> np.ndarray:
+    """
+    p[t] = max(p[t-1] * (1 + r[t]), floor) sans boucle
+    En log: L[t] = S[t] + max(0, max_{k<=t}(log floor - S[k])) avec S la somme cumulée (Skorokhod)
+    """
+    growth = np.log(np.maximum(1 + changes, 1e-12))
+    path = np.log(base_price) + np.cumsum(growth)
+    if floor > 0:
+        path += np.maximum(np.maximum.accumulate(np.log(floor) - path), 0)
+    return np.exp(path)
+
+
+def _generate_prices(rng: np.random.Generator, days: int, class_name: str, base_price: Optional[float]) -> np.ndarray:
+    coin_class = COIN_CLASSES[class_name]
+    drawn = rng.uniform(*coin_class.base_price_range)
+    base = base_price if base_price is not None else drawn
+
+    changes = synthetic_returns(rng, days, coin_class)
+    floor = max(base * coin_class.floor_ratio, coin_class.floor_price)
+    return apply_floor_path(base, changes, floor)
+
+
+@lru_cache(maxsize=2048)
+def _cached_prices(coin_id: str, days: int, seed: int, class_name: str, base_price: Optional[float]) -> np.ndarray:
+    prices = _generate_prices(np.random.default_rng(seed), days, class_name, base_price)
+    prices.setflags(write=False)  # Partagé par tous les appelants du cache
+    return prices
+
+
+def synthetic_prices(coin_id: str, days: int, seed: Optional[int] = None, coin_class: Optional[str] = None,
+                     base_price: Optional[float] = None) -> np.ndarray:
+    """
+    Série de `days` prix synthétiques
+    seed donnée: série reproductible, mémoïsée (lecture seule); seed None: nouveau tirage à chaque appel
+    (les Monte Carlo ne rejouent pas le même chemin d'un mois à l'autre)
+    coin_class None = 'major' ou 'memecoin' selon le coin;
+    base_price None = BASE_PRICES, sinon tiré dans base_price_range de la classe
+    """
+    if days <= 0:
+        return np.empty(0)
+    class_name = coin_class or coin_class_for(coin_id)
+    if class_name not in COIN_CLASSES:
+        raise ValueError(f"Classe de coin inconnue: {class_name} (valeurs: {', '.join(COIN_CLASSES)})")
+    if base_price is None:
+        base_price = BASE_PRICES.get(coin_id)
+    if seed is None:
+        return _generate_prices(np.random.default_rng(), int(days), class_name, base_price)
+    return _cached_prices(coin_id, int(days), int(seed), class_name, base_price)
+
+
+def cache_info():
+    return _cached_prices.cache_info()
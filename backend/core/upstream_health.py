@@ -0,0 +1,186 @@
+"""
+🩺 Santé des upstreams (exchanges) - Sélection dynamique et circuit breakers
+Latence EWMA, taux d'erreur EWMA et disjoncteur par upstream: un exchange en panne
+est sauté pendant un cooldown au lieu de coûter son timeout à chaque appel,
+et les upstreams disponibles sont essayés du plus rapide au plus lent
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional
+
+import numpy as np
+
+EWMA_ALPHA = 0.2
+FAILURE_THRESHOLD = 3  # Échecs consécutifs avant ouverture du circuit
+COOLDOWN_SECONDS = 30.0
+MAX_COOLDOWN_SECONDS = 300.0  # Cooldown doublé à chaque réouverture, plafonné
+LATENCY_SAMPLES = 256
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+class UpstreamHealth:
+    """État d'un upstream (appelé sous le verrou de UpstreamSelector)"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.ewma_latency: Optional[float] = None  # secondes
+        self.error_rate = 0.0
+        self.consecutive_failures = 0
+        self.state = CIRCUIT_CLOSED
+        self.open_until = 0.0
+        self.cooldown = COOLDOWN_SECONDS
+        self.probe_in_flight = False
+        self.requests = 0
+        self.failures = 0
+        self.skipped = 0
+        self.trips = 0
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+    def available(self, now: float) -> bool:
+        """Circuit fermé, ou cooldown écoulé: une seule requête de test passe (half-open)"""
+        if self.state == CIRCUIT_CLOSED:
+            return True
+        if self.state == CIRCUIT_OPEN and now >= self.open_until:
+            self.state = CIRCUIT_HALF_OPEN
+        return self.state == CIRCUIT_HALF_OPEN and not self.probe_in_flight
+
+    def would_be_available(self, now: float) -> bool:
+        """Même décision que available(), sans faire passer le circuit en half-open"""
+        if self.state == CIRCUIT_CLOSED:
+            return True
+        if self.state == CIRCUIT_OPEN and now < self.open_until:
+            return False
+        return not self.probe_in_flight
+
+    def score(self) -> float:
+        """Coût attendu d'un essai: latence gonflée par le risque d'échec (plus petit = mieux)"""
+        latency = self.ewma_latency if self.ewma_latency is not None else 0.0  # Inconnu = à essayer
+        return latency / max(1.0 - self.error_rate, 0.05)
+
+    def record(self, ok: bool, latency: float, now: float):
+        self.requests += 1
+        self.latencies.append(latency)
+        self.ewma_latency = latency if self.ewma_latency is None else (
+            EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * self.ewma_latency
+        )
+        self.error_rate = EWMA_ALPHA * (0.0 if ok else 1.0) + (1 - EWMA_ALPHA) * self.error_rate
+        self.probe_in_flight = False
+
+        if ok:
+            self.consecutive_failures = 0
+            if self.state != CIRCUIT_CLOSED:
+                print(f"✅ Circuit {self.name} refermé")
+            self.state = CIRCUIT_CLOSED
+            self.cooldown = COOLDOWN_SECONDS
+            return
+
+        self.failures += 1
+        self.consecutive_failures += 1
+        if self.state == CIRCUIT_HALF_OPEN or self.consecutive_failures >= FAILURE_THRESHOLD:
+            if self.state == CIRCUIT_HALF_OPEN:
+                self.cooldown = min(self.cooldown * 2, MAX_COOLDOWN_SECONDS)
+            self.state = CIRCUIT_OPEN
+            self.open_until = now + self.cooldown
+            self.trips += 1
+            print(f"🔌 Circuit {self.name} ouvert pour {self.cooldown:.0f}s ({self.consecutive_failures} échecs)")
+
+    def latency_quantile(self, q: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        return float(np.quantile(np.fromiter(self.latencies, dtype=np.float64), q))
+
+    def to_dict(self, now: float) -> Dict:
+        p95 = self.latency_quantile(0.95)
+        return {
+            'state': self.state,
+            'ewma_latency_ms': self.ewma_latency * 1000 if self.ewma_latency is not None else None,
+            'p95_latency_ms': p95 * 1000 if p95 is not None else None,
+            'error_rate': self.error_rate,
+            'consecutive_failures': self.consecutive_failures,
+            'reopens_in_seconds': max(self.open_until - now, 0.0) if self.state == CIRCUIT_OPEN else 0.0,
+            'requests': self.requests,
+            'failures': self.failures,
+            'skipped': self.skipped,
+            'trips': self.trips,
+            'score': self.score()
+        }
+
+
+class UpstreamSelector:
+    """Santé de tous les upstreams, partagée par les threads et les instances de MultiCryptoAPI"""
+
+    def __init__(self, names: Iterable[str] = ()):
+        self._lock = threading.Lock()
+        self.upstreams: Dict[str, UpstreamHealth] = {name: UpstreamHealth(name) for name in names}
+        # Requêtes couvertes (hedging): lancées, gagnées par la requête de secours, refusées faute de budget
+        self.hedges = {'launched': 0, 'won': 0, 'skipped_budget': 0}
+
+    def _get(self, name: str) -> UpstreamHealth:
+        health = self.upstreams.get(name)
+        if health is None:
+            health = self.upstreams[name] = UpstreamHealth(name)
+        return health
+
+    def order(self, names: Iterable[str]) -> List[str]:
+        """Upstreams à essayer, du meilleur score au pire; circuits ouverts exclus"""
+        now = time.time()
+        with self._lock:
+            candidates = []
+            for position, name in enumerate(names):
+                health = self._get(name)
+                if health.available(now):
+                    candidates.append((health.score(), position, name))
+                else:
+                    health.skipped += 1
+            candidates.sort()
+            return [name for _, _, name in candidates]
+
+    def peek_order(self, names: Iterable[str]) -> List[str]:
+        """Ordre que donnerait order(), en lecture seule (monitoring: ni skipped ni transition d'état)"""
+        now = time.time()
+        with self._lock:
+            candidates = []
+            for position, name in enumerate(names):
+                health = self.upstreams.get(name)
+                if health is None:
+                    candidates.append((0.0, position, name))  # Inconnu = à essayer, comme dans order()
+                elif health.would_be_available(now):
+                    candidates.append((health.score(), position, name))
+            candidates.sort()
+            return [name for _, _, name in candidates]
+
+    def begin(self, name: str) -> bool:
+        """
+        À appeler juste avant la requête: False si le circuit s'est ouvert entre-temps,
+        ou si la requête de test d'un circuit half-open est déjà partie
+        """
+        with self._lock:
+            health = self._get(name)
+            if not health.available(time.time()):
+                health.skipped += 1
+                return False
+            if health.state == CIRCUIT_HALF_OPEN:
+                health.probe_in_flight = True
+            return True
+
+    def record(self, name: str, ok: bool, latency: float):
+        with self._lock:
+            self._get(name).record(ok, latency, time.time())
+
+    def record_hedge(self, event: str):
+        with self._lock:
+            self.hedges[event] += 1
+
+    def latency_quantile(self, name: str, q: float) -> Optional[float]:
+        with self._lock:
+            return self._get(name).latency_quantile(q)
+
+    def get_stats(self) -> Dict[str, Dict]:
+        now = time.time()
+        with self._lock:
+            return {name: health.to_dict(now) for name, health in self.upstreams.items()}
@@ -0,0 +1,217 @@
+"""
+🔁 Walk-Forward - Optimisation glissante des règles de sortie
+Optimise sur N mois in-sample, évalue sur les M mois suivants (out-of-sample),
+puis recolle les courbes out-of-sample: la seule mesure honnête avant de passer en live
+"""
+
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.analysis_runner import register_analysis
+from core.job_scheduler import CancelToken, JobCancelled, is_cancel_requested
+from core.path_bank import SharedArraysDescriptor, acquire_path_bank, attach_trade_batch, bank_trade_batch
+from core.simulation import (
+    TradeBatch, exit_returns, metrics_row, params_from_config, params_to_dict,
+    score_params, simulate_trade_batch
+)
+from models.schemas import WalkForwardRequest
+
+# Objectifs possibles et sens d'optimisation (+1 maximiser, -1 minimiser)
+OBJECTIVES = {
+    'sharpe_ratio': 1,
+    'total_return': 1,
+    'profit_factor': 1,
+    'win_rate': 1,
+    'max_drawdown': -1,
+    'volatility': -1
+}
+
+
+def build_windows(n_months: int, in_sample: int, out_of_sample: int) -> List[Tuple[int, int, int]]:
+    """Fenêtres (début IS, fin IS = début OOS, fin OOS), avancées de la taille OOS"""
+    windows = []
+    start = 0
+    while start + in_sample + out_of_sample <= n_months:
+        windows.append((start, start + in_sample, start + in_sample + out_of_sample))
+        start += out_of_sample
+    return windows
+
+
+def build_param_grid(config, stop_loss_values: List[float], tp_scale_values: List[float]) -> np.ndarray:
+    """Grille stop loss x échelle de TP autour de la config (position fixe)"""
+    base = params_from_config(config)[0]
+    grid = []
+    for stop_loss in stop_loss_values:
+        for scale in tp_scale_values:
+            row = base.copy()
+            row[0] = stop_loss
+            row[1:6] = base[1:6] * scale
+            grid.append(row)
+    return np.array(grid)
+
+
+def best_params_index(batch: TradeBatch, grid: np.ndarray, initial_capital: float,
+                      objective: str, cancel_flag: Optional[str] = None) -> Tuple[int, Dict[str, float]]:
+    """Score toute la grille sur le batch in-sample et retourne la meilleure config (exécuté en worker)"""
+    if is_cancel_requested(cancel_flag):
+        raise JobCancelled()
+
+    scores = score_params(batch, grid, initial_capital)
+    objective_values = OBJECTIVES[objective] * np.nan_to_num(scores[objective], nan=-np.inf)
+    best = int(np.argmax(objective_values))
+    return best, metrics_row(scores, best)
+
+
+def best_params_for_window(bank: SharedArraysDescriptor, is_start: int, is_end: int, grid: np.ndarray,
+                           initial_capital: float, objective: str,
+                           cancel_flag: Optional[str] = None) -> Tuple[int, Dict[str, float]]:
+    """best_params_index sur une fenêtre de la banque partagée: seul le descripteur traverse le pool"""
+    return best_params_index(attach_trade_batch(bank).slice_months(is_start, is_end), grid, initial_capital,
+                             objective, cancel_flag)
+
+
+def curve_metrics(monthly_capital: np.ndarray, trade_returns: np.ndarray) -> Dict[str, float]:
+    """Métriques d'une courbe recollée (mêmes définitions que calculate_final_metrics)"""
+    initial_capital = monthly_capital[0]
+    monthly_returns = np.diff(monthly_capital) / monthly_capital[:-1] * 100
+    volatility = float(np.std(monthly_returns)) if len(monthly_returns) else 0.0
+    peaks = np.maximum.accumulate(monthly_capital)
+    wins = trade_returns[trade_returns > 0]
+    losses = trade_returns[trade_returns <= 0]
+
+    return {
+        'total_return': float((monthly_capital[-1] - initial_capital) / initial_capital * 100),
+        'win_rate': float(len(wins) / len(trade_returns) * 100) if len(trade_returns) else 0.0,
+        'volatility': volatility,
+        'max_drawdown': float(((peaks - monthly_capital) / peaks * 100).max()),
+        'sharpe_ratio': float(np.mean(monthly_returns) / volatility) if volatility > 0 else 0.0,
+        'profit_factor': float(wins.sum() / abs(losses.sum())) if losses.sum() != 0 else 0.0,
+        'final_capital': float(monthly_capital[-1])
+    }
+
+
+@register_analysis("walk_forward", WalkForwardRequest)
+def run_walk_forward(request: WalkForwardRequest, progress: Optional[Callable[[float, str], None]] = None,
+                     cancel_token: Optional[CancelToken] = None) -> Dict:
+    """
+    Walk-forward complet
+    - les trades de toute la période sont simulés une fois (banque partagée en parallèle) puis découpés par fenêtre
+    - les optimisations in-sample tournent en parallèle dans un pool de process
+    - l'out-of-sample est évalué séquentiellement en reportant le capital d'une fenêtre à l'autre
+    """
+    config = request.config
+    progress = progress or (lambda percent, message: None)
+
+    if request.objective not in OBJECTIVES:
+        raise ValueError(f"Objectif inconnu: {request.objective} (valeurs: {', '.join(OBJECTIVES)})")
+
+    start_date = datetime(config.start_year, config.start_month, 1)
+    end_date = datetime(config.end_year, config.end_month, 1)
+    n_months = (end_date.year - start_date.year) * 12 + (end_date.month - start_date.month) + 1
+
+    windows = build_windows(n_months, request.in_sample_months, request.out_of_sample_months)
+    if not windows:
+        raise ValueError(
+            f"Période trop courte: {n_months} mois < {request.in_sample_months} IS + {request.out_of_sample_months} OOS"
+        )
+
+    seed = request.seed if request.seed is not None else random.randrange(2 ** 32)
+    grid = build_param_grid(config, request.stop_loss_values, request.tp_scale_values)
+    baseline = params_from_config(config)
+
+    progress(5.0, f"🎲 Simulation de {n_months} mois de trades")
+    cancel_flag = cancel_token.shared_flag_name() if cancel_token is not None else None
+    max_workers = request.max_workers or min(len(windows), os.cpu_count() or 1)
+
+    with ExitStack() as stack:
+        if max_workers > 1:
+            # Trades en mémoire partagée: les workers mappent la banque au lieu de recevoir chaque fenêtre
+            # picklée, et l'out-of-sample lit les mêmes blocs (pas de seconde copie dans ce process)
+            bank = stack.enter_context(acquire_path_bank(seed, n_months, config.max_holding_days))
+            batch = bank_trade_batch(bank)
+        else:
+            batch = simulate_trade_batch(seed, n_months, config.max_holding_days)
+
+        # Optimisations in-sample en parallèle
+        progress(15.0, f"🔍 Optimisation de {len(windows)} fenêtres ({len(grid)} configs chacune)")
+        if max_workers > 1:
+            executor = stack.enter_context(ProcessPoolExecutor(max_workers=max_workers))
+            if cancel_token is not None:
+                cancel_token.add_callback(lambda: executor.shutdown(wait=False, cancel_futures=True))
+            futures = [
+                executor.submit(best_params_for_window, bank.descriptor, is_start, is_end, grid,
+                                config.initial_capital, request.objective, cancel_flag)
+                for is_start, is_end, _ in windows
+            ]
+            optimized = [future.result() for future in futures]
+        else:
+            optimized = [best_params_index(batch.slice_months(is_start, is_end), grid, config.initial_capital,
+                                           request.objective, cancel_flag)
+                         for is_start, is_end, _ in windows]
+
+        # Évaluation out-of-sample recollée
+        progress(80.0, "🧵 Recollage des fenêtres out-of-sample")
+        capital = config.initial_capital
+        baseline_capital = config.initial_capital
+        stitched_capital = [capital]
+        baseline_curve = [baseline_capital]
+        stitched_returns = []
+        baseline_returns = []
+        windows_report = []
+
+        for index, ((is_start, is_end, oos_end), (best, in_sample_metrics)) in enumerate(zip(windows, optimized)):
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+
+            out_of_sample = batch.slice_months(is_end, oos_end)
+            best_params = grid[best:best + 1]
+            oos_scores = score_params(out_of_sample, best_params, capital)
+            baseline_scores = score_params(out_of_sample, baseline, baseline_capital)
+
+            stitched_capital.extend(oos_scores['monthly_capital'][0, 1:].tolist())
+            baseline_curve.extend(baseline_scores['monthly_capital'][0, 1:].tolist())
+            stitched_returns.append(exit_returns(out_of_sample, best_params)[0])
+            baseline_returns.append(exit_returns(out_of_sample, baseline)[0])
+            capital = stitched_capital[-1]
+            baseline_capital = baseline_curve[-1]
+
+            windows_report.append({
+                'window': index + 1,
+                'in_sample_months': [is_start + 1, is_end],
+                'out_of_sample_months': [is_end + 1, oos_end],
+                'best_params': params_to_dict(grid[best]),
+                'in_sample_metrics': in_sample_metrics,
+                'out_of_sample_metrics': metrics_row(oos_scores, 0),
+                'baseline_out_of_sample_metrics': metrics_row(baseline_scores, 0)
+            })
+
+    stitched_capital = np.array(stitched_capital)
+    oos_metrics = curve_metrics(stitched_capital, np.concatenate(stitched_returns))
+    baseline_metrics = curve_metrics(np.array(baseline_curve), np.concatenate(baseline_returns))
+
+    # Efficacité walk-forward: objectif OOS moyen / objectif IS moyen (proche de 1 = peu de sur-optimisation)
+    in_sample_objective = np.mean([window['in_sample_metrics'][request.objective] for window in windows_report])
+    out_sample_objective = np.mean([window['out_of_sample_metrics'][request.objective] for window in windows_report])
+    efficiency = float(out_sample_objective / in_sample_objective) if in_sample_objective else 0.0
+
+    return {
+        'type': 'walk_forward',
+        'config': config.dict(),
+        'seed': seed,
+        'objective': request.objective,
+        'grid_size': len(grid),
+        'windows': windows_report,
+        'out_of_sample_metrics': oos_metrics,
+        'baseline_metrics': baseline_metrics,
+        'walk_forward_efficiency': efficiency,
+        'charts_data': {
+            'out_of_sample_capital': stitched_capital.tolist(),
+            'baseline_capital': baseline_curve
+        }
+    }
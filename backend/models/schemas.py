@@ -2,6 +2,20 @@ from pydantic import BaseModel
 from typing import Optional, Dict, List, Any
 from datetime import datetime
 
+class ExecutionConfig(BaseModel):
+    """Modèle d'exécution: latence, slippage selon la taille, spread, frais en %, fills partiels"""
+    latency_ms: float = 300  # Latence décision -> fill
+    latency_jitter_ms: float = 100  # Jitter (exponentiel) ajouté à la latence
+    spread_bps: float = 50
+    impact_bps: float = 100  # Slippage d'un ordre égal à liquidity_usd
+    impact_exponent: float = 0.5  # Impact en racine carrée de la taille
+    liquidity_usd: float = 50000  # Profondeur de carnet de référence
+    max_participation: float = 0.25  # Part max de la liquidité servie (fill partiel au-delà)
+    fee_percent: float = 0.1  # Frais par côté
+    fixed_fee: float = 0.0  # Frais fixes par côté
+    entry_momentum_pct_per_second: float = 0.05  # Dérive du prix pendant la latence à l'entrée (pump)
+    exit_momentum_pct_per_second: float = -0.02  # Dérive à la sortie (vente dans un marché qui baisse)
+
 class BacktestConfig(BaseModel):
     """Configuration du backtest - IDENTIQUE à votre GUI"""
     initial_capital: float = 10000
@@ -18,11 +32,12 @@ class BacktestConfig(BaseModel):
     tp3: float = 200
     tp4: float = 500
     tp5: float = 1200
+    execution: Optional[ExecutionConfig] = None  # None = frais fixes de 40$ par trade (GUI)
 
 class BacktestStatus(BaseModel):
     """Status du backtest en temps réel"""
     id: str
-    status: str  # "running", "completed", "failed"
+    status: str  # "queued", "running", "completed", "failed", "stopped", "timeout"
     progress: float
     message: str
     started_at: datetime
@@ -41,8 +56,118 @@ class BacktestResult(BaseModel):
     metrics: Dict[str, float]
     charts_data: Dict[str, Any]
 
+class RescoreRequest(BaseModel):
+    """Re-scoring d'un backtest terminé sous d'autres règles de sortie (None = valeur d'origine)"""
+    stop_loss: Optional[float] = None
+    tp1: Optional[float] = None
+    tp2: Optional[float] = None
+    tp3: Optional[float] = None
+    tp4: Optional[float] = None
+    tp5: Optional[float] = None
+    position_size: Optional[float] = None
+    max_holding_days: Optional[int] = None  # <= durée du backtest: chemins tronqués
+    initial_capital: Optional[float] = None
+
 class ConfigSave(BaseModel):
     """Configuration à sauvegarder"""
     name: str
     config: BacktestConfig
-    description: Optional[str] = None
\ No newline at end of file
+    description: Optional[str] = None
+
+class WalkForwardRequest(BaseModel):
+    """Walk-forward: optimisation in-sample glissante, évaluation out-of-sample"""
+    config: BacktestConfig = BacktestConfig()
+    in_sample_months: int = 6
+    out_of_sample_months: int = 2
+    stop_loss_values: List[float] = [-10, -15, -20, -25, -30]
+    tp_scale_values: List[float] = [0.5, 0.75, 1.0, 1.5, 2.0]  # Multiplicateurs de l'échelle tp1..tp5
+    objective: str = "sharpe_ratio"
+    seed: Optional[int] = None
+    max_workers: Optional[int] = None
+
+class PortfolioRequest(BaseModel):
+    """Backtest multi-positions: trades chevauchants, capital réparti, valorisation quotidienne"""
+    config: BacktestConfig = BacktestConfig()
+    max_open_positions: int = 20
+    days_per_month: int = 30
+    seed: Optional[int] = None
+
+class SensitivityRequest(BaseModel):
+    """Sensibilité locale des métriques aux paramètres de sortie (différences centrées, trades communs)"""
+    config: BacktestConfig = BacktestConfig()
+    parameters: List[str] = ["stop_loss", "tp1", "tp2", "tp3", "tp4", "tp5", "position_size"]
+    relative_step: float = 0.05  # Pas = 5% de la valeur du paramètre
+    min_step: float = 0.1  # Pas minimal (paramètres proches de 0)
+    replications: int = 8  # Jeux de trades indépendants (erreur standard des gradients)
+    seed: Optional[int] = None
+    max_workers: Optional[int] = None
+
+class HyperbandRequest(BaseModel):
+    """Recherche adaptative (successive halving / Hyperband) des règles de sortie"""
+    config: BacktestConfig = BacktestConfig()
+    search_space: Dict[str, List[float]] = {  # [min, max] par paramètre exploré
+        "stop_loss": [-40, -5],
+        "tp1": [10, 80],
+        "tp2": [40, 200],
+        "tp3": [100, 500],
+        "tp4": [200, 1500],
+        "tp5": [500, 3000],
+        "max_holding_days": [3, 15]
+    }
+    objective: str = "sharpe_ratio"
+    n_configs: int = 243  # Configs proposées au premier rung du bracket le plus exploratoire
+    min_months: int = 1  # Horizon du premier rung
+    max_months: Optional[int] = None  # None = période de la config
+    eta: int = 3  # 1/eta des configs promues, horizon x eta
+    brackets: Optional[int] = None  # None = Hyperband complet, 1 = successive halving simple
+    leaderboard_size: int = 10
+    pareto_objectives: List[str] = ["total_return", "max_drawdown"]  # Front publié au fil des rungs complets
+    seed: Optional[int] = None
+    max_workers: Optional[int] = None
+
+class ParetoRequest(BaseModel):
+    """Front de Pareto de configs évaluées (métriques à plat ou sous 'metrics')"""
+    objectives: List[str] = ["total_return", "max_drawdown"]
+    points: List[Dict[str, Any]] = []
+    max_fronts: Optional[int] = None  # Rangs des fronts suivants (1 = Pareto, 2, ...) pour les N premiers
+
+class ParetoSessionRequest(BaseModel):
+    """Front incrémental: les lots de résultats d'un sweep y sont ajoutés au fil de l'eau"""
+    objectives: List[str] = ["total_return", "max_drawdown"]
+
+class ParetoPointsRequest(BaseModel):
+    points: List[Dict[str, Any]]
+
+class BackfillRequest(BaseModel):
+    """Backfill historique paginé (bougies Coinbase / klines Binance) vers le stockage local"""
+    coins: List[str] = []  # Vide = MEMECOIN_LIST
+    start: datetime
+    end: Optional[datetime] = None  # None = maintenant
+    granularity: str = "1h"  # 1m, 5m, 15m, 1h, 6h, 1d
+    exchange: Optional[str] = None  # None = premier exchange qui liste le coin (Binance, puis Coinbase)
+    concurrency: int = 8
+
+class PriceMatrixRequest(BaseModel):
+    """Matrice coins × temps memory-mapped, construite depuis les bougies du backfill"""
+    coins: List[str] = []  # Vide = MEMECOIN_LIST
+    start: datetime
+    end: Optional[datetime] = None  # None = maintenant
+    granularity: str = "1h"
+    exchange: Optional[str] = None  # None = Binance si listé, sinon Coinbase
+    dtype: str = "float32"  # float32 (moitié moins de mémoire) ou float64
+
+class LiveSniperRequest(BaseModel):
+    """Session sniper live en paper trading"""
+    config: BacktestConfig = BacktestConfig()
+    coins: Optional[List[str]] = None  # Défaut: memecoins de la stratégie
+    feed: str = "fake"  # "fake" (flux local reproductible), "stream" (WebSocket) ou "poll" (REST)
+    max_open_positions: int = 10
+    detection_window_seconds: float = 3600
+    queue_size: int = 1000
+    poll_interval: float = 10.0
+    hedged: bool = True  # Flux "poll": requête de secours vers un 2e exchange si le 1er tarde
+    exchange: str = "binance"  # Flux "stream": "binance" ou "coinbase"
+    stream_url: Optional[str] = None  # Surcharge de l'URL WebSocket (ex: serveur de replay local)
+    seed: Optional[int] = None
+    fake_interval: float = 0.05  # Secondes réelles entre deux rounds du flux fake
+    fake_time_step: float = 60.0  # Secondes de marché simulées par round
@@ -0,0 +1,121 @@
+"""
+🕯️ Stockage local des bougies historiques (SQLite)
+Clé (exchange, symbol, granularity, open_time): les pages re-téléchargées sont dédupliquées
+La table des pages terminées permet de reprendre un backfill interrompu
+"""
+
+import os
+import sqlite3
+import time
+from contextlib import closing
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+import numpy as np
+
+DEFAULT_CANDLE_DB = os.environ.get("CANDLE_DB_PATH", "data/candles.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS candles (
+    exchange TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    granularity INTEGER NOT NULL,
+    open_time INTEGER NOT NULL,
+    open REAL NOT NULL,
+    high REAL NOT NULL,
+    low REAL NOT NULL,
+    close REAL NOT NULL,
+    volume REAL NOT NULL,
+    PRIMARY KEY (exchange, symbol, granularity, open_time)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS backfill_pages (
+    exchange TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    granularity INTEGER NOT NULL,
+    page_start INTEGER NOT NULL,
+    candles INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (exchange, symbol, granularity, page_start)
+) WITHOUT ROWID;
+"""
+
+# (open_time s, open, high, low, close, volume)
+Candle = Tuple[int, float, float, float, float, float]
+
+
+class CandleStore:
+    """Bougies OHLCV persistantes, une écriture = une transaction (page + marqueur de reprise)"""
+
+    def __init__(self, path: str = DEFAULT_CANDLE_DB):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def write_page(self, exchange: str, symbol: str, granularity: int, page_start: int, candles: Iterable[Candle],
+                   complete: bool = True):
+        """
+        Insère une page de bougies et la marque terminée dans la même transaction
+        (une reprise ne voit jamais de page à moitié écrite). Une page qui touche le présent
+        n'est pas marquée: elle sera complétée au prochain backfill
+        """
+        rows = [(exchange, symbol, granularity, *candle) for candle in candles]
+        with closing(self._connect()) as conn, conn:
+            conn.executemany("INSERT OR REPLACE INTO candles VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            if not complete:
+                return
+            conn.execute(
+                "INSERT OR REPLACE INTO backfill_pages VALUES (?, ?, ?, ?, ?, ?)",
+                (exchange, symbol, granularity, page_start, len(rows), time.time())
+            )
+
+    def completed_pages(self, exchange: str, symbol: str, granularity: int) -> Set[int]:
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT page_start FROM backfill_pages WHERE exchange = ? AND symbol = ? AND granularity = ?",
+                (exchange, symbol, granularity)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def get_candles(self, exchange: str, symbol: str, granularity: int, start: Optional[int] = None,
+                    end: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Bougies triées par date, en colonnes NumPy"""
+        query = "SELECT open_time, open, high, low, close, volume FROM candles WHERE exchange = ? AND symbol = ? AND granularity = ?"
+        params = [exchange, symbol, granularity]
+        if start is not None:
+            query += " AND open_time >= ?"
+            params.append(start)
+        if end is not None:
+            query += " AND open_time < ?"
+            params.append(end)
+        with closing(self._connect()) as conn:
+            rows = conn.execute(query + " ORDER BY open_time", params).fetchall()
+
+        data = np.array(rows, dtype=np.float64).reshape(-1, 6)
+        return {
+            'open_time': data[:, 0].astype(np.int64),
+            'open': data[:, 1],
+            'high': data[:, 2],
+            'low': data[:, 3],
+            'close': data[:, 4],
+            'volume': data[:, 5]
+        }
+
+    def coverage(self, exchange: Optional[str] = None):
+        """Séries stockées: nombre de bougies et plage couverte"""
+        query = ("SELECT exchange, symbol, granularity, COUNT(*), MIN(open_time), MAX(open_time) FROM candles"
+                 + (" WHERE exchange = ?" if exchange else "")
+                 + " GROUP BY exchange, symbol, granularity")
+        with closing(self._connect()) as conn:
+            rows = conn.execute(query, (exchange,) if exchange else ()).fetchall()
+        return [
+            {'exchange': row[0], 'symbol': row[1], 'granularity': row[2], 'candles': row[3],
+             'first_open_time': row[4], 'last_open_time': row[5]}
+            for row in rows
+        ]
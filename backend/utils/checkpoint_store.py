@@ -0,0 +1,188 @@
+"""
+💾 Checkpoints mensuels des backtests (SQLite)
+Après chaque mois: capital, compteurs, curseur du journal de trades et état du générateur aléatoire.
+Seul le mois écoulé est écrit (une ligne + l'en-tête, une transaction): le coût ne grandit pas
+avec la durée du backtest. Un backtest interrompu ou terminé reprend au dernier mois, à l'identique.
+Les chemins journaliers bruts des trades sont gardés en binaire pour le re-scoring sans re-simulation
+"""
+
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_CHECKPOINT_DB = os.environ.get("BACKTEST_CHECKPOINT_PATH", "data/backtests/checkpoints.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    backtest_id TEXT PRIMARY KEY,
+    config TEXT NOT NULL,
+    seed INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    months_count INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS checkpoint_months (
+    backtest_id TEXT NOT NULL,
+    month INTEGER NOT NULL,
+    capital REAL NOT NULL,
+    return_pct REAL NOT NULL,
+    trades TEXT NOT NULL,
+    stats TEXT NOT NULL,
+    paths BLOB,
+    coins BLOB,
+    PRIMARY KEY (backtest_id, month)
+) WITHOUT ROWID;
+"""
+
+
+# Chemins des trades: float64 (trades x jours), coins: index dans MEMECOIN_LIST (uint8)
+PATH_DTYPE = np.float64
+COIN_DTYPE = np.uint8
+
+
+def _json_default(value):
+    """Scalaires NumPy (compteurs, rendements)"""
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+def _decode_paths(paths: Optional[bytes], coins: Optional[bytes], days: int) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    if paths is None or coins is None:
+        return None
+    coin_index = np.frombuffer(coins, dtype=COIN_DTYPE)
+    return np.frombuffer(paths, dtype=PATH_DTYPE).reshape(len(coin_index), days), coin_index
+
+
+class CheckpointStore:
+    """
+    Un en-tête par backtest (dernier mois terminé, état courant) et une ligne par mois
+    state: capital, compteurs, trade_cursor (trades déjà journalisés) et rng_state (bit_generator.state)
+    """
+
+    def __init__(self, path: str = DEFAULT_CHECKPOINT_DB):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(checkpoint_months)")}
+            for column in ("paths", "coins"):
+                if column not in columns:  # Bases créées avant le re-scoring
+                    conn.execute(f"ALTER TABLE checkpoint_months ADD COLUMN {column} BLOB")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def save_month(self, backtest_id: str, config: Dict[str, Any], seed: int, month: int, months_count: int,
+                   state: Dict[str, Any], capital: float, return_pct: float, trades: List[Dict], stats: Dict,
+                   paths: Optional[np.ndarray] = None, coins: Optional[np.ndarray] = None):
+        """
+        Mois terminé et nouvel état, dans la même transaction (une reprise ne voit jamais un mois à moitié)
+        paths: rendements journaliers bruts des trades du mois (trades x jours), coins: index des coins
+        """
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "INSERT OR REPLACE INTO checkpoint_months VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (backtest_id, month, capital, return_pct, json.dumps(trades, default=_json_default),
+                 json.dumps(stats, default=_json_default),
+                 np.ascontiguousarray(paths, dtype=PATH_DTYPE).tobytes() if paths is not None else None,
+                 np.asarray(coins, dtype=COIN_DTYPE).tobytes() if coins is not None else None)
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (backtest_id, json.dumps(config, default=_json_default), seed, month, months_count,
+                 json.dumps(state, default=_json_default), time.time())
+            )
+
+    def get(self, backtest_id: str) -> Optional[Dict[str, Any]]:
+        """En-tête du dernier checkpoint (sans l'historique des mois)"""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT config, seed, month, months_count, state, updated_at FROM checkpoints WHERE backtest_id = ?",
+                (backtest_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            'backtest_id': backtest_id,
+            'config': json.loads(row[0]),
+            'seed': row[1],
+            'month': row[2],
+            'months_count': row[3],
+            'state': json.loads(row[4]),
+            'updated_at': row[5]
+        }
+
+    def load(self, backtest_id: str) -> Optional[Dict[str, Any]]:
+        """Checkpoint complet: en-tête + mois terminés (dans l'ordre), pour reconstruire les résultats"""
+        checkpoint = self.get(backtest_id)
+        if checkpoint is None:
+            return None
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT capital, return_pct, trades, stats FROM checkpoint_months "
+                "WHERE backtest_id = ? AND month <= ? ORDER BY month",
+                (backtest_id, checkpoint['month'])
+            ).fetchall()
+        checkpoint['months'] = [
+            {'capital': row[0], 'return_pct': row[1], 'trades': json.loads(row[2]), 'stats': json.loads(row[3])}
+            for row in rows
+        ]
+        return checkpoint
+
+    def load_paths(self, backtest_id: str) -> Optional[Tuple[Dict[str, Any], np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        (checkpoint, chemins (T, jours), index de mois (T,), index de coins (T,)) de tous les mois terminés
+        None si le backtest est inconnu ou si un mois n'a pas de chemins (écrit avant le re-scoring)
+        """
+        checkpoint = self.get(backtest_id)
+        if checkpoint is None:
+            return None
+        days = checkpoint['config']['max_holding_days']
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT paths, coins FROM checkpoint_months WHERE backtest_id = ? AND month <= ? ORDER BY month",
+                (backtest_id, checkpoint['month'])
+            ).fetchall()
+        months = [_decode_paths(row[0], row[1], days) for row in rows]
+        if any(month is None for month in months):
+            return None
+        paths = np.concatenate([daily for daily, _ in months]) if months else np.empty((0, days))
+        coins = np.concatenate([coins for _, coins in months]) if months else np.empty(0, dtype=COIN_DTYPE)
+        month_index = np.repeat(np.arange(len(months)), [len(coins) for _, coins in months])
+        return checkpoint, paths, month_index, coins
+
+    def fork(self, source_id: str, backtest_id: str) -> bool:
+        """Copie le checkpoint d'un backtest sous un nouvel id (extension sans toucher à l'original)"""
+        with closing(self._connect()) as conn, conn:
+            copied = conn.execute(
+                "INSERT OR REPLACE INTO checkpoints "
+                "SELECT ?, config, seed, month, months_count, state, ? FROM checkpoints WHERE backtest_id = ?",
+                (backtest_id, time.time(), source_id)
+            ).rowcount
+            if not copied:
+                return False
+            conn.execute("DELETE FROM checkpoint_months WHERE backtest_id = ?", (backtest_id,))
+            conn.execute(
+                "INSERT INTO checkpoint_months "
+                "SELECT ?, month, capital, return_pct, trades, stats, paths, coins FROM checkpoint_months "
+                "WHERE backtest_id = ?",
+                (backtest_id, source_id)
+            )
+        return True
+
+    def delete(self, backtest_id: str):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM checkpoint_months WHERE backtest_id = ?", (backtest_id,))
+            conn.execute("DELETE FROM checkpoints WHERE backtest_id = ?", (backtest_id,))
@@ -0,0 +1,138 @@
+"""
+⚙️ Config active partagée entre les process workers de l'API (SQLite)
+Une seule ligne versionnée: chaque modification incrémente la version dans une transaction
+BEGIN IMMEDIATE (lecture-modification-écriture atomique entre process, pas de mise à jour perdue).
+Chaque process garde la config en cache et ne la relit que si la version a changé: une lecture
+coûte une requête sur la clé primaire. wait_for_change() sert de notification (long-polling HTTP)
+"""
+
+import asyncio
+import copy
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from typing import Any, Callable, Dict, Optional, Tuple
+
+DEFAULT_ACTIVE_CONFIG_DB = os.environ.get("ACTIVE_CONFIG_PATH", "data/active_config.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS active_config (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+ACTIVE_KEY = "active"
+
+
+class VersionConflict(Exception):
+    """La config a changé depuis la version lue par l'appelant"""
+
+    def __init__(self, expected: int, current: int):
+        super().__init__(f"Version {expected} attendue, version courante {current}")
+        self.expected = expected
+        self.current = current
+
+
+class ConfigStateStore:
+    """
+    Config active (dict JSON) + version, initialisée avec la config par défaut au premier accès
+    Le cache local (version, config) est partagé par les threads du process
+    """
+
+    def __init__(self, default: Dict[str, Any], path: str = DEFAULT_ACTIVE_CONFIG_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self._cached: Optional[Tuple[int, Dict[str, Any]]] = None
+        self._local = threading.local()  # Connexion de lecture par thread (vérification de version)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            # Premier worker démarré: config par défaut (les suivants trouvent la ligne existante)
+            conn.execute(
+                "INSERT OR IGNORE INTO active_config VALUES (?, ?, 1, ?)",
+                (ACTIVE_KEY, json.dumps(default), time.time())
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def version(self) -> int:
+        return self._reader().execute("SELECT version FROM active_config WHERE key = ?", (ACTIVE_KEY,)).fetchone()[0]
+
+    def get(self) -> Tuple[int, Dict[str, Any]]:
+        """(version, copie de la config); relue seulement si un process l'a modifiée depuis"""
+        version = self.version()
+        with self._lock:
+            cached = self._cached
+        if cached is None or cached[0] != version:
+            row = self._reader().execute(
+                "SELECT version, value FROM active_config WHERE key = ?", (ACTIVE_KEY,)
+            ).fetchone()
+            cached = (row[0], json.loads(row[1]))
+            with self._lock:
+                self._cached = cached
+        return cached[0], copy.deepcopy(cached[1])  # Le cache ne doit pas être modifié par l'appelant
+
+    def modify(self, change: Callable[[Dict[str, Any]], Dict[str, Any]],
+               expected_version: Optional[int] = None) -> Tuple[int, Dict[str, Any]]:
+        """
+        Applique change(config courante) -> nouvelle config et incrémente la version, atomiquement
+        expected_version: refuse (VersionConflict) si la config a changé depuis cette version
+        """
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                version, value = conn.execute(
+                    "SELECT version, value FROM active_config WHERE key = ?", (ACTIVE_KEY,)
+                ).fetchone()
+                if expected_version is not None and expected_version != version:
+                    raise VersionConflict(expected_version, version)
+                config = change(json.loads(value))
+                conn.execute(
+                    "UPDATE active_config SET value = ?, version = ?, updated_at = ? WHERE key = ?",
+                    (json.dumps(config), version + 1, time.time(), ACTIVE_KEY)
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+        with self._lock:
+            self._cached = (version + 1, config)
+        return version + 1, copy.deepcopy(config)
+
+    def update(self, fields: Dict[str, Any], expected_version: Optional[int] = None) -> Tuple[int, Dict[str, Any]]:
+        """Fusionne des champs dans la config active"""
+        return self.modify(lambda config: {**config, **fields}, expected_version)
+
+    def replace(self, config: Dict[str, Any], expected_version: Optional[int] = None) -> Tuple[int, Dict[str, Any]]:
+        """Remplace toute la config active (reset)"""
+        return self.modify(lambda _: dict(config), expected_version)
+
+    async def wait_for_change(self, since_version: int, timeout: float = 30.0,
+                              poll_interval: float = 0.25) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """Attend une version > since_version (retournée avec la config), None au timeout"""
+        deadline = time.monotonic() + timeout
+        while True:
+            # Requêtes SQLite hors de la boucle d'événements (verrou d'écriture d'un autre worker)
+            if await asyncio.to_thread(self.version) > since_version:
+                return await asyncio.to_thread(self.get)
+            if time.monotonic() >= deadline:
+                return None
+            await asyncio.sleep(poll_interval)
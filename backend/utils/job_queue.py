@@ -0,0 +1,245 @@
+"""
+📬 File de jobs partagée (SQLite) pour le mode worker distribué
+Le nœud FastAPI enfile, les workers (sur n'importe quelle machine montant le fichier) consomment
+"""
+
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+from typing import Any, Dict, List, Optional
+
+# États d'un job dans la file partagée
+QUEUE_PENDING = "queued"
+QUEUE_RUNNING = "running"
+QUEUE_COMPLETED = "completed"
+QUEUE_FAILED = "failed"
+QUEUE_CANCELLED = "stopped"
+
+# Priorités numériques (plus petit = plus urgent)
+QUEUE_PRIORITIES = {"interactive": 0, "batch": 10}
+
+def _json_default(value):
+    """Sérialise les scalaires NumPy et les dates"""
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL,
+    worker_id TEXT,
+    lease_until REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    progress TEXT,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs (status, priority, created_at);
+"""
+
+
+class SQLiteJobQueue:
+    """
+    File de jobs persistante avec baux (leases)
+    - claim() atomique (BEGIN IMMEDIATE): un job n'est pris que par un seul worker
+    - un worker qui disparaît laisse expirer son bail et le job est repris
+    - la progression et les résultats sont écrits dans la même base
+    """
+
+    def __init__(self, path: str, max_attempts: int = 3):
+        self.path = path
+        self.max_attempts = max_attempts
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    # ------------------------------------------------------------------
+    # Côté API (ordonnancement)
+    # ------------------------------------------------------------------
+
+    def enqueue(self, job_id: str, kind: str, payload: Dict[str, Any], priority: str = "interactive",
+                progress: Optional[Dict[str, Any]] = None):
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, payload, priority, status, progress, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(payload, default=_json_default), QUEUE_PRIORITIES.get(priority, 0), QUEUE_PENDING,
+                 json.dumps(progress, default=_json_default) if progress is not None else None, now, now)
+            )
+
+    def request_cancel(self, job_id: str) -> bool:
+        """Annule un job en attente, ou demande l'arrêt au worker qui l'exécute"""
+        now = time.time()
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, cancel_requested = 1, updated_at = ? WHERE id = ? AND status = ?",
+                (QUEUE_CANCELLED, now, job_id, QUEUE_PENDING)
+            )
+            if cursor.rowcount:
+                return True
+            cursor = conn.execute(
+                "UPDATE jobs SET cancel_requested = 1, updated_at = ? WHERE id = ? AND status = ?",
+                (now, job_id, QUEUE_RUNNING)
+            )
+            return cursor.rowcount > 0
+
+    def requeue(self, job_id: str, payload: Dict[str, Any], priority: str = "interactive",
+                progress: Optional[Dict[str, Any]] = None) -> bool:
+        """Remet en file un job terminé, arrêté ou en échec (reprise depuis son checkpoint)"""
+        now = time.time()
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET payload = ?, priority = ?, status = ?, worker_id = NULL, lease_until = NULL, "
+                "attempts = 0, cancel_requested = 0, progress = COALESCE(?, progress), result = NULL, error = NULL, "
+                "updated_at = ? WHERE id = ? AND status NOT IN (?, ?)",
+                (json.dumps(payload, default=_json_default), QUEUE_PRIORITIES.get(priority, 0), QUEUE_PENDING,
+                 json.dumps(progress, default=_json_default) if progress is not None else None, now, job_id,
+                 QUEUE_PENDING, QUEUE_RUNNING)
+            )
+            return cursor.rowcount > 0
+
+    def pending_count(self) -> int:
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (QUEUE_PENDING,)).fetchone()
+        return row[0]
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_dict(row) if row else None
+
+    def list_jobs(self, status: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        with closing(self._connect()) as conn:
+            if status:
+                rows = conn.execute(
+                    "SELECT * FROM jobs WHERE status = ? ORDER BY created_at DESC LIMIT ?", (status, limit)
+                ).fetchall()
+            else:
+                rows = conn.execute("SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    # ------------------------------------------------------------------
+    # Côté worker (exécution)
+    # ------------------------------------------------------------------
+
+    def claim(self, worker_id: str, lease_seconds: float = 60, kinds: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """Réserve le prochain job (priorité puis ancienneté), y compris ceux dont le bail a expiré"""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            # Annulation demandée puis worker disparu: personne ne confirmera l'arrêt, le job est clos ici
+            conn.execute(
+                "UPDATE jobs SET status = ?, lease_until = NULL, updated_at = ? "
+                "WHERE status = ? AND lease_until < ? AND cancel_requested = 1",
+                (QUEUE_CANCELLED, now, QUEUE_RUNNING, now)
+            )
+            query = (
+                "SELECT * FROM jobs WHERE (status = ? OR (status = ? AND lease_until < ?)) "
+                "AND cancel_requested = 0"
+            )
+            params: list = [QUEUE_PENDING, QUEUE_RUNNING, now]
+            if kinds:
+                query += f" AND kind IN ({','.join('?' * len(kinds))})"
+                params.extend(kinds)
+            query += " ORDER BY priority, created_at LIMIT 1"
+
+            row = conn.execute(query, params).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+
+            if row["attempts"] >= self.max_attempts:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ?",
+                    (QUEUE_FAILED, "Nombre maximum de tentatives atteint", now, row["id"])
+                )
+                conn.execute("COMMIT")
+                return self.claim(worker_id, lease_seconds, kinds)
+
+            conn.execute(
+                "UPDATE jobs SET status = ?, worker_id = ?, lease_until = ?, attempts = attempts + 1, "
+                "updated_at = ? WHERE id = ?",
+                (QUEUE_RUNNING, worker_id, now + lease_seconds, now, row["id"])
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+        job = self._row_to_dict(row)
+        job["status"] = QUEUE_RUNNING
+        job["worker_id"] = worker_id
+        return job
+
+    def heartbeat(self, job_id: str, worker_id: str, progress: Optional[Dict[str, Any]] = None,
+                  lease_seconds: float = 60) -> bool:
+        """
+        Prolonge le bail et publie la progression
+        Retourne True si l'annulation a été demandée (ou si le job a été repris par un autre worker)
+        """
+        now = time.time()
+        with closing(self._connect()) as conn:
+            if progress is not None:
+                conn.execute(
+                    "UPDATE jobs SET lease_until = ?, progress = ?, updated_at = ? WHERE id = ? AND worker_id = ?",
+                    (now + lease_seconds, json.dumps(progress, default=_json_default), now, job_id, worker_id)
+                )
+            else:
+                conn.execute(
+                    "UPDATE jobs SET lease_until = ?, updated_at = ? WHERE id = ? AND worker_id = ?",
+                    (now + lease_seconds, now, job_id, worker_id)
+                )
+            row = conn.execute("SELECT cancel_requested, worker_id FROM jobs WHERE id = ?", (job_id,)).fetchone()
+
+        return row is None or bool(row["cancel_requested"]) or row["worker_id"] != worker_id
+
+    def complete(self, job_id: str, worker_id: str, result: Any, progress: Optional[Dict[str, Any]] = None):
+        self._finish(job_id, worker_id, QUEUE_COMPLETED, result=result, progress=progress)
+
+    def fail(self, job_id: str, worker_id: str, error: str, progress: Optional[Dict[str, Any]] = None):
+        self._finish(job_id, worker_id, QUEUE_FAILED, error=error, progress=progress)
+
+    def mark_cancelled(self, job_id: str, worker_id: str, progress: Optional[Dict[str, Any]] = None):
+        self._finish(job_id, worker_id, QUEUE_CANCELLED, progress=progress)
+
+    def _finish(self, job_id: str, worker_id: str, status: str, result: Any = None,
+                error: Optional[str] = None, progress: Optional[Dict[str, Any]] = None):
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, progress = COALESCE(?, progress), "
+                "lease_until = NULL, updated_at = ? WHERE id = ? AND worker_id = ?",
+                (status, json.dumps(result, default=_json_default) if result is not None else None, error,
+                 json.dumps(progress, default=_json_default) if progress is not None else None, now, job_id, worker_id)
+            )
+
+    @staticmethod
+    def _row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        for key in ("payload", "progress", "result"):
+            if job.get(key):
+                job[key] = json.loads(job[key])
+        return job
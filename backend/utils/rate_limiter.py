@@ -0,0 +1,90 @@
+"""
+🪣 Limiteur de débit partagé (token bucket)
+Un seau par exchange, commun à tous les clients et threads du process:
+les requêtes concurrentes (backfill, scanner, prix) restent sous la limite de l'exchange
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+# Requêtes/seconde et rafale tolérée par exchange (limites publiques, avec marge)
+EXCHANGE_RATE_LIMITS = {
+    'Coinbase': (10.0, 10),
+    'Binance': (20.0, 20)
+}
+
+
+class TokenBucket:
+    """
+    Seau de jetons thread-safe
+    rate jetons/s, au plus capacity jetons accumulés (taille de rafale)
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.waited_seconds = 0.0
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Prend les jetons s'ils sont disponibles, sans attendre"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def available(self) -> float:
+        """Jetons disponibles maintenant (sans les prendre)"""
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """Attend que les jetons soient disponibles (False si timeout dépassé)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                wait = (tokens - self._tokens) / self.rate
+            if deadline is not None and now + wait > deadline:
+                return False
+            # Attente hors verrou: les autres threads continuent de consommer/recharger
+            time.sleep(wait)
+            self.waited_seconds += wait
+
+    def get_stats(self) -> Dict[str, float]:
+        with self._lock:
+            self._refill(time.monotonic())
+            return {
+                'rate': self.rate,
+                'capacity': self.capacity,
+                'available': self._tokens,
+                'waited_seconds': self.waited_seconds
+            }
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str) -> TokenBucket:
+    """Seau partagé d'un exchange (créé au premier appel)"""
+    with _buckets_lock:
+        bucket = _buckets.get(name)
+        if bucket is None:
+            rate, capacity = EXCHANGE_RATE_LIMITS.get(name, (5.0, 5))
+            bucket = _buckets[name] = TokenBucket(rate, capacity)
+        return bucket
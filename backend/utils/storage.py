@@ -1,6 +1,59 @@
+import os
+
 # Global storage for active backtests and results
 active_backtests = {}
 backtest_results_cache = {}
+analysis_results = {}  # Résultats des analyses (walk-forward, ...) par job id
+backtest_paths = {}  # Chemins bruts des trades (checkpoint, TradeBatch) par backtest, pour le re-scoring
+live_sessions = {}  # Sessions sniper live (LiveSniper) par id
+pareto_sessions = {}  # Fronts de Pareto incrémentaux (ParetoArchive) par id
+
+# File partagée pour le mode worker distribué (désactivée si BACKTEST_QUEUE_PATH absent)
+_job_queue = None
+
+def get_job_queue():
+    """Retourne la file SQLite partagée, ou None en mode mono-process"""
+    global _job_queue
+    queue_path = os.environ.get("BACKTEST_QUEUE_PATH")
+    if not queue_path:
+        return None
+    if _job_queue is None or _job_queue.path != queue_path:
+        from utils.job_queue import SQLiteJobQueue
+        _job_queue = SQLiteJobQueue(queue_path)
+    return _job_queue
+
+# Checkpoints mensuels des backtests (reprise / extension)
+_checkpoint_store = None
+
+def get_checkpoint_store():
+    """Retourne le stockage SQLite des checkpoints (BACKTEST_CHECKPOINT_PATH)"""
+    global _checkpoint_store
+    if _checkpoint_store is None:
+        from utils.checkpoint_store import CheckpointStore
+        _checkpoint_store = CheckpointStore()
+    return _checkpoint_store
+
+# Index en mémoire des stratégies sauvegardées (data/configs)
+_strategy_store = None
+
+def get_strategy_store(directory: str = "data/configs"):
+    """Retourne l'index nom -> fichier des stratégies (rafraîchi sur les mtime)"""
+    global _strategy_store
+    if _strategy_store is None or _strategy_store.directory != directory:
+        from utils.strategy_store import StrategyStore
+        _strategy_store = StrategyStore(directory)
+    return _strategy_store
+
+# Config active partagée entre les workers de l'API (ACTIVE_CONFIG_PATH)
+_config_state = None
+
+def get_config_state(default: dict):
+    """Retourne la config active versionnée (SQLite), initialisée avec default au premier accès"""
+    global _config_state
+    if _config_state is None:
+        from utils.config_store import ConfigStateStore
+        _config_state = ConfigStateStore(default)
+    return _config_state
 
 def clear_old_backtests():
     """Nettoie les anciens backtests (plus de 24h)"""
@@ -17,4 +70,6 @@ def clear_old_backtests():
     for backtest_id in to_remove:
         del active_backtests[backtest_id]
         if backtest_id in backtest_results_cache:
-            del backtest_results_cache[backtest_id]
\ No newline at end of file
+            del backtest_results_cache[backtest_id]
+        analysis_results.pop(backtest_id, None)
+        backtest_paths.pop(backtest_id, None)
\ No newline at end of file
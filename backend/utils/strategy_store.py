@@ -0,0 +1,184 @@
+"""
+📂 Index des stratégies sauvegardées (data/configs)
+Index nom -> fichier en mémoire, construit au démarrage: une recherche par nom ne relit plus tout
+le dossier. La fraîcheur repose sur les mtime: celle du dossier (création, suppression, renommage)
+déclenche un rescan incrémental (seuls les fichiers dont mtime/taille ont changé sont relus),
+celle du fichier vérifie qu'une stratégie lue n'a pas été réécrite sur place.
+Les sauvegardes sont atomiques (fichier temporaire + os.replace): un lecteur ne voit jamais un JSON tronqué
+"""
+
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class StrategyStore:
+    """
+    Fichiers JSON {name, description, config, created_at, type} d'un dossier
+    files: fichier -> (mtime_ns, taille, contenu); names: nom -> fichier (premier fichier par ordre alphabétique)
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.RLock()
+        self._dir_mtime: Optional[int] = None
+        self.files: Dict[str, Tuple[int, int, Dict[str, Any]]] = {}
+        self.names: Dict[str, str] = {}
+
+    def _path(self, filename: str) -> str:
+        return os.path.join(self.directory, filename)
+
+    def _read(self, filename: str) -> Optional[Tuple[int, int, Dict[str, Any]]]:
+        """(mtime_ns, taille, contenu) d'un fichier, None s'il a disparu ou n'est pas un JSON valide"""
+        try:
+            with open(self._path(filename), 'r') as f:
+                stat = os.fstat(f.fileno())
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return (stat.st_mtime_ns, stat.st_size, data) if isinstance(data, dict) else None
+
+    def _index(self, filename: str, loaded: Tuple[int, int, Dict[str, Any]]):
+        """Ajoute / remplace un fichier dans l'index sans rescanner le dossier"""
+        self._unindex(filename)
+        self.files[filename] = loaded
+        name = loaded[2].get("name")
+        if name is not None and (name not in self.names or filename < self.names[name]):
+            self.names[name] = filename
+
+    def _unindex(self, filename: str):
+        previous = self.files.pop(filename, None)
+        name = previous[2].get("name") if previous is not None else None
+        if name is not None and self.names.get(name) == filename:
+            # Autre fichier du même nom (rare): parcours limité à ce cas
+            others = sorted(other for other, (_, _, data) in self.files.items() if data.get("name") == name)
+            if others:
+                self.names[name] = others[0]
+            else:
+                del self.names[name]
+
+    def _rebuild_names(self):
+        names = {}
+        for filename in sorted(self.files):
+            name = self.files[filename][2].get("name")
+            if name is not None:
+                names.setdefault(name, filename)
+        self.names = names
+
+    def refresh(self, force: bool = False):
+        """Rescan si le dossier a changé depuis le dernier passage (un seul stat sinon)"""
+        with self._lock:
+            try:
+                dir_mtime = os.stat(self.directory).st_mtime_ns
+            except FileNotFoundError:
+                self._dir_mtime, self.files, self.names = None, {}, {}
+                return
+            if not force and dir_mtime == self._dir_mtime:
+                return
+
+            files = {}
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if not entry.name.endswith('.json') or not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                    cached = self.files.get(entry.name)
+                    if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+                        files[entry.name] = cached
+                        continue
+                    loaded = self._read(entry.name)
+                    if loaded is not None:
+                        files[entry.name] = loaded
+            self.files = files
+            self._dir_mtime = dir_mtime
+            self._rebuild_names()
+
+    def _fresh(self, filename: str) -> Optional[Dict[str, Any]]:
+        """Contenu indexé d'un fichier, relu s'il a été réécrit sur place (un stat)"""
+        cached = self.files.get(filename)
+        if cached is None:
+            return None
+        try:
+            stat = os.stat(self._path(filename))
+        except FileNotFoundError:
+            self.refresh(force=True)
+            return None
+        if cached[:2] != (stat.st_mtime_ns, stat.st_size):
+            loaded = self._read(filename)
+            if loaded is None:
+                return None
+            self._index(filename, loaded)
+            cached = loaded
+        return cached[2]
+
+    def get(self, name: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """(fichier, contenu) de la stratégie nommée, None si inconnue"""
+        with self._lock:
+            self.refresh()
+            filename = self.names.get(name)
+            if filename is None:
+                return None
+            data = self._fresh(filename)
+            if data is None or data.get("name") != name:
+                filename = self.names.get(name)  # Fichier renommé ou réécrit sous un autre nom
+                data = self._fresh(filename) if filename is not None else None
+            return (filename, data) if data is not None else None
+
+    def list(self, type: Optional[str] = None) -> List[Tuple[str, Dict[str, Any]]]:
+        """(fichier, contenu) de tous les fichiers indexés, filtrés sur "type" si demandé"""
+        with self._lock:
+            self.refresh()
+            return [(filename, data) for filename, (_, _, data) in sorted(self.files.items())
+                    if type is None or data.get("type") == type]
+
+    def _index_is_current(self) -> bool:
+        try:
+            return self._dir_mtime == os.stat(self.directory).st_mtime_ns
+        except FileNotFoundError:
+            return False
+
+    def _mark_current(self, was_current: bool):
+        """Après une écriture de ce process: l'index reste à jour sans rescan (s'il l'était avant)"""
+        if was_current:
+            self._dir_mtime = os.stat(self.directory).st_mtime_ns
+
+    def save(self, filename: str, data: Dict[str, Any]) -> str:
+        """Écriture atomique (temporaire dans le même dossier + os.replace), puis mise à jour de l'index"""
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            was_current = self._index_is_current()
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".", suffix=".tmp")
+            try:
+                os.chmod(tmp_path, 0o644)  # mkstemp crée en 0600
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(data, f, indent=4)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self._path(filename))
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            loaded = self._read(filename)
+            if loaded is not None:
+                self._index(filename, loaded)
+            self._mark_current(was_current)
+            return self._path(filename)
+
+    def delete(self, name: str) -> Optional[str]:
+        """Supprime le fichier de la stratégie nommée; retourne le nom du fichier, None si inconnue"""
+        with self._lock:
+            found = self.get(name)
+            if found is None:
+                return None
+            filename = found[0]
+            was_current = self._index_is_current()
+            try:
+                os.remove(self._path(filename))
+            except FileNotFoundError:
+                pass
+            self._unindex(filename)
+            self._mark_current(was_current)
+            return filename
@@ -0,0 +1,181 @@
+"""
+👷 Worker distribué - Exécute les backtests depuis la file partagée
+Lancement: BACKTEST_QUEUE_PATH=/mnt/shared/jobs.db python worker.py --concurrency 4
+Autant de workers que voulu, sur autant de machines que voulu: le nœud FastAPI ne fait qu'ordonnancer
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+from datetime import datetime
+from typing import Awaitable, Callable, Dict
+
+from models.schemas import BacktestConfig, BacktestStatus
+from utils.job_queue import SQLiteJobQueue
+from utils.storage import active_backtests, backtest_results_cache, analysis_results, get_checkpoint_store
+from core.backtest_engine import run_real_backtest
+from core.analysis_runner import ANALYSIS_RUNNERS, run_analysis
+from core.job_scheduler import CancelToken
+import core.walk_forward  # noqa: F401 - enregistre l'analyse "walk_forward"
+import core.portfolio  # noqa: F401 - enregistre l'analyse "portfolio"
+import core.backfill  # noqa: F401 - enregistre l'analyse "backfill"
+import core.sensitivity  # noqa: F401 - enregistre l'analyse "sensitivity"
+import core.hyperband  # noqa: F401 - enregistre l'analyse "hyperband"
+
+HEARTBEAT_INTERVAL = 2.0
+LEASE_SECONDS = 60.0
+
+# Registre des types de jobs exécutables: kind -> handler(job, queue, worker_id)
+JOB_HANDLERS: Dict[str, Callable[[dict, SQLiteJobQueue, str], Awaitable[None]]] = {}
+
+
+def register_job_handler(kind: str):
+    """Décorateur pour ajouter un type de job (backtest, sweep, ...)"""
+    def decorator(handler):
+        JOB_HANDLERS[kind] = handler
+        return handler
+    return decorator
+
+
+def local_status(job: dict, worker_id: str) -> BacktestStatus:
+    """Status local du job, initialisé depuis celui publié par l'API"""
+    if job.get("progress"):
+        status = BacktestStatus(**job["progress"])
+    else:
+        status = BacktestStatus(id=job["id"], status="running", progress=0.0,
+                                message="", started_at=datetime.now())
+    status.status = "running"
+    status.message = f"🚀 Pris en charge par {worker_id}"
+    active_backtests[job["id"]] = status
+    return status
+
+
+async def execute_with_heartbeat(job: dict, queue: SQLiteJobQueue, worker_id: str,
+                                 job_factory: Callable[[CancelToken], Awaitable], results: dict):
+    """
+    Exécute le job en local et synchronise status/résultats avec la file
+    results: dictionnaire où le job dépose son résultat (backtest_results_cache, analysis_results)
+    """
+    job_id = job["id"]
+    status = local_status(job, worker_id)
+    token = CancelToken()
+    task = asyncio.create_task(job_factory(token))
+
+    try:
+        while not task.done():
+            await asyncio.wait({task}, timeout=HEARTBEAT_INTERVAL)
+            cancel_requested = await asyncio.to_thread(
+                queue.heartbeat, job_id, worker_id, status.dict(), LEASE_SECONDS
+            )
+            if cancel_requested and not token.cancelled:
+                status.status = "stopped"
+                status.message = "⏹️ Arrêté par l'utilisateur"
+                token.cancel()
+
+        if not task.cancelled():
+            task.exception()  # Erreur déjà reportée dans status.message par le job, marquée comme récupérée
+
+        progress = status.dict()
+        if job_id in results:
+            result = results[job_id]
+            result = result.dict() if hasattr(result, "dict") else result
+            await asyncio.to_thread(queue.complete, job_id, worker_id, result, progress)
+        elif status.status == "stopped":
+            await asyncio.to_thread(queue.mark_cancelled, job_id, worker_id, progress)
+        else:
+            await asyncio.to_thread(queue.fail, job_id, worker_id, status.message, progress)
+    finally:
+        token.close()
+        active_backtests.pop(job_id, None)
+        results.pop(job_id, None)
+
+
+@register_job_handler("backtest")
+async def handle_backtest(job: dict, queue: SQLiteJobQueue, worker_id: str):
+    """
+    Exécute run_real_backtest
+    Dès que le job a son propre checkpoint, il le reprend: un job repris après expiration du bail
+    (worker perdu, machine préemptée) continue au dernier mois terminé au lieu de tout recommencer.
+    resume_from du payload (backtest source d'une extension) ne sert qu'au premier démarrage:
+    re-forker la source effacerait les mois déjà faits par l'extension
+    """
+    payload = job["payload"]
+    config = BacktestConfig(**payload["config"])
+    own_checkpoint = await asyncio.to_thread(get_checkpoint_store().get, job["id"])
+    resume_from = job["id"] if own_checkpoint is not None else payload.get("resume_from", job["id"])
+    await execute_with_heartbeat(
+        job, queue, worker_id,
+        lambda token: run_real_backtest(job["id"], config, token, seed=payload.get("seed"),
+                                        resume_from=resume_from),
+        backtest_results_cache
+    )
+
+
+async def handle_analysis(job: dict, queue: SQLiteJobQueue, worker_id: str):
+    """Exécute une analyse enregistrée (walk-forward, ...)"""
+    schema, _ = ANALYSIS_RUNNERS[job["kind"]]
+    analysis_request = schema(**job["payload"])
+    await execute_with_heartbeat(
+        job, queue, worker_id,
+        lambda token: run_analysis(job["id"], job["kind"], analysis_request, token),
+        analysis_results
+    )
+
+
+for analysis_kind in ANALYSIS_RUNNERS:
+    register_job_handler(analysis_kind)(handle_analysis)
+
+
+async def run_job(job: dict, queue: SQLiteJobQueue, worker_id: str):
+    handler = JOB_HANDLERS.get(job["kind"])
+    try:
+        if handler is None:
+            raise ValueError(f"Type de job inconnu: {job['kind']}")
+        print(f"▶️ [{worker_id}] Job {job['id']} ({job['kind']})")
+        await handler(job, queue, worker_id)
+        print(f"✅ [{worker_id}] Job {job['id']} terminé")
+    except Exception as e:
+        print(f"❌ [{worker_id}] Job {job['id']} en erreur: {e}")
+        await asyncio.to_thread(queue.fail, job["id"], worker_id, str(e))
+
+
+async def worker_loop(queue: SQLiteJobQueue, worker_id: str, concurrency: int, poll_interval: float):
+    """Boucle principale: réserve des jobs tant qu'il reste des slots libres"""
+    running = set()
+    kinds = list(JOB_HANDLERS)
+
+    print(f"👷 Worker {worker_id} prêt ({concurrency} slots) - file: {queue.path}")
+
+    while True:
+        running = {task for task in running if not task.done()}
+
+        job = None
+        if len(running) < concurrency:
+            job = await asyncio.to_thread(queue.claim, worker_id, LEASE_SECONDS, kinds)
+
+        if job is not None:
+            running.add(asyncio.create_task(run_job(job, queue, worker_id)))
+            continue
+
+        await asyncio.sleep(poll_interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker de backtests distribué")
+    parser.add_argument("--queue", default=os.environ.get("BACKTEST_QUEUE_PATH", "data/jobs.db"),
+                        help="Chemin de la file SQLite partagée")
+    parser.add_argument("--concurrency", type=int, default=2, help="Jobs simultanés par worker")
+    parser.add_argument("--worker-id", default=f"{socket.gethostname()}-{os.getpid()}")
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    args = parser.parse_args()
+
+    queue = SQLiteJobQueue(args.queue)
+    try:
+        asyncio.run(worker_loop(queue, args.worker_id, args.concurrency, args.poll_interval))
+    except KeyboardInterrupt:
+        print(f"👋 Worker {args.worker_id} arrêté")
+
+
+if __name__ == "__main__":
+    main()